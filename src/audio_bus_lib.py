@@ -0,0 +1,415 @@
+import asyncio
+import threading
+import time as time_lib
+import numpy as np
+from typing import Any, Dict, Optional, Set, Union
+from audio_source_lib import AudioSource, MicrophoneSource
+from resampler_lib import Resampler
+
+
+def write_ring(ring: np.ndarray, position: int, pcm: np.ndarray) -> int:
+    """
+    Copy samples into a ring buffer at an absolute stream position.
+
+    Args:
+        ring (np.ndarray): The int16 ring buffer
+        position (int): Total samples written to the ring so far
+        pcm (np.ndarray): int16 samples to append
+
+    Returns:
+        int: The new position
+    """
+    capacity = len(ring)
+    n = len(pcm)
+    if n > capacity:
+        # Only the most recent `capacity` samples can be kept.
+        position += n - capacity
+        pcm = pcm[-capacity:]
+        n = capacity
+
+    start = position % capacity
+    end = start + n
+    if end <= capacity:
+        ring[start:end] = pcm
+    else:
+        split = capacity - start
+        ring[start:] = pcm[:split]
+        ring[: end - capacity] = pcm[split:]
+    return position + n
+
+
+class AudioBus:
+    """A single capture stream that fans audio out to several consumers.
+
+    The bus owns the input device and writes every captured block into a ring
+    buffer. Each consumer gets its own `AudioBusReader` with an independent
+    read cursor, so the wake word detector, cloud STT and Vosk can all share
+    one native stream instead of opening the microphone separately.
+
+    Audio comes from an `AudioSource`, a microphone by default. Sources that
+    run at a different rate than the bus, e.g. a microphone opened at its
+    native 48 kHz, are resampled once on the way in. Lossless
+    sources such as files read flat out are held back until every reader has
+    room, so no audio is dropped however fast the source runs. Their blocks
+    are published piece by piece as room frees up, so a block larger than the
+    free space cannot keep a reader waiting for a full read.
+    """
+
+    def __init__(
+        self,
+        device: Optional[Union[int, str, Dict[str, Any]]] = None,
+        sample_rate: int = 16000,
+        blocksize: int = 512,
+        latency: float = 0.1,
+        capacity: float = 10.0,
+        source: Optional[AudioSource] = None,
+        capture_rate: Optional[int] = None,
+        adaptive_latency: bool = False,
+    ):
+        """
+        Initialize the audio bus.
+
+        Args:
+            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
+            sample_rate (int): Sample rate delivered to readers in Hz
+            blocksize (int): Frames per capture callback, at `sample_rate`
+            latency (float): Audio stream latency in seconds
+            capacity (float): Length of the shared ring buffer in seconds. With a
+                lossless source it must hold at least two of the largest reads;
+                larger reads raise ValueError.
+            source (AudioSource, optional): Where audio comes from; defaults to a
+                `MicrophoneSource` built from the device arguments
+            capture_rate (int, optional): Rate to open the microphone at, usually
+                the device's native rate. By default the microphone is opened at
+                `sample_rate` and any conversion is left to PortAudio/ALSA.
+            adaptive_latency (bool): Let the microphone tune its latency and
+                blocksize from overflow statistics
+        """
+        if source is None:
+            capture_rate = capture_rate or sample_rate
+            source = MicrophoneSource(
+                device=device,
+                sample_rate=capture_rate,
+                blocksize=blocksize * capture_rate // sample_rate,
+                latency=latency,
+                adaptive_latency=adaptive_latency,
+            )
+
+        self.source = source
+        self.device = source.device
+        self.sample_rate = sample_rate
+        self.blocksize = source.blocksize
+        self.resampler = (
+            Resampler(source.sample_rate, sample_rate)
+            if source.sample_rate != sample_rate
+            else None
+        )
+        self.capacity = int(capacity * sample_rate)
+        self.lossless = source.lossless
+
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._position = 0
+        self._write_time: Optional[float] = None
+        self._init_readers()
+
+    def _init_readers(self) -> None:
+        """Set up the reader and lifecycle state shared by every kind of bus."""
+        self._condition = threading.Condition()
+        self._readers: Set["AudioBusReader"] = set()
+        self._closed = False
+        self._running = False
+        self._ended = threading.Event()
+
+    @property
+    def position(self) -> int:
+        """Total number of samples written to the bus since it was created."""
+        return self._position
+
+    @property
+    def running(self) -> bool:
+        """Whether the bus has been started and not stopped since."""
+        return self._running
+
+    @property
+    def closed(self) -> bool:
+        """Whether the bus has been stopped."""
+        return self._closed
+
+    def write(self, pcm: np.ndarray) -> None:
+        """Append int16 samples to the ring buffer and wake up waiting readers."""
+        if self.resampler is not None:
+            pcm = self.resampler.process(pcm)
+        if self.lossless:
+            while len(pcm):
+                room = self._wait_for_room()
+                self._publish(pcm[:room])
+                pcm = pcm[room:]
+            return
+        if len(pcm):
+            self._publish(pcm)
+
+    def _publish(self, pcm: np.ndarray) -> None:
+        position = write_ring(self._buffer, self._position, pcm)
+        now = time_lib.monotonic()
+        with self._condition:
+            self._position = position
+            self._write_time = now
+            self._condition.notify_all()
+
+    def capture_time(self, position: int) -> Optional[float]:
+        """
+        Estimate when the sample at a bus position was captured.
+
+        The estimate counts back from the time of the latest write at the bus
+        sample rate, so it is only meaningful for live sources.
+
+        Args:
+            position (int): Absolute bus position, e.g. a reader's cursor
+
+        Returns:
+            float or None: `time.monotonic()` timestamp, or None for sources
+            that run faster than real time or before anything was written.
+        """
+        with self._condition:
+            written, write_time = self._position, self._write_time
+        if self.lossless or write_time is None:
+            return None
+        return write_time - (written - position) / self.sample_rate
+
+    def _room(self) -> int:
+        """Samples every reader has room for; called with the condition held."""
+        if not self._readers:
+            return 0
+        oldest = min(reader.cursor - reader.held for reader in self._readers)
+        return oldest + self.capacity - self._position
+
+    def _wait_for_room(self) -> int:
+        """
+        Block until every reader has made room for more samples.
+
+        A reader waiting for a full read holds at most that many samples, so
+        with a capacity of two of the largest reads there is always room for
+        at least one sample once every reader waits.
+
+        Returns:
+            int: How many samples fit, or the whole capacity once the bus
+            is closed.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._room() > 0)
+            return self.capacity if self._closed else self._room()
+
+    def _on_source_end(self) -> None:
+        """Close the bus once the source runs out, letting readers drain it."""
+        self._ended.set()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the source has delivered all of its audio.
+
+        Returns:
+            bool: True if the source ended, False on timeout.
+        """
+        return self._ended.wait(timeout)
+
+    def reader(self, start: Optional[int] = None) -> "AudioBusReader":
+        """
+        Create a consumer of the bus.
+
+        Args:
+            start (int, optional): Absolute bus position to start reading from.
+                Positions in the past replay audio still held in the ring buffer;
+                by default the reader starts at the current position.
+        """
+        with self._condition:
+            position = self.position
+            if start is None:
+                start = position
+            start = min(max(start, position - self.capacity, 0), position)
+            reader = AudioBusReader(self, start)
+            self._readers.add(reader)
+            self._condition.notify_all()
+        return reader
+
+    def _remove_reader(self, reader: "AudioBusReader") -> None:
+        with self._condition:
+            self._readers.discard(reader)
+            self._condition.notify_all()
+
+    def _wait_readable(
+        self,
+        reader: "AudioBusReader",
+        frames: int,
+        timeout: Optional[float],
+        partial: bool = False,
+    ) -> Optional[int]:
+        """
+        Wait for `frames` samples past the reader's cursor; returns the bus position.
+
+        With `partial`, a closed bus with fewer samples left also returns.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: reader.closed
+                or self._closed
+                or self._position - reader.cursor >= frames,
+                timeout=timeout,
+            ):
+                return None
+            available = self._position - reader.cursor
+            if reader.closed or (
+                available < frames and not (partial and available > 0)
+            ):
+                return None
+            return self._position
+
+    def _read(
+        self,
+        reader: "AudioBusReader",
+        frames: int,
+        timeout: Optional[float],
+        partial: bool = False,
+    ) -> Optional[np.ndarray]:
+        """Return `frames` samples from the reader's cursor, waiting if needed."""
+        if self.lossless and 2 * frames > self.capacity:
+            raise ValueError(
+                f"Reads of {frames} samples need a lossless bus capacity of at "
+                f"least {2 * frames} samples, not {self.capacity}"
+            )
+        position = self._wait_readable(reader, frames, timeout, partial)
+        if position is None:
+            return None
+
+        if position - reader.cursor > self.capacity:
+            # The reader fell behind by more than the ring size; skip ahead.
+            reader.overruns += 1
+            reader.cursor = position - self.capacity
+        # Only less than `frames` once a closed bus is drained with `partial`.
+        frames = min(frames, position - reader.cursor)
+
+        start = reader.cursor % self.capacity
+        end = start + frames
+        if end <= self.capacity:
+            data = self._buffer[start:end]
+        else:
+            data = np.concatenate(
+                (self._buffer[start:], self._buffer[: end - self.capacity])
+            )
+        reader.cursor += frames
+        reader.held = frames
+        if self.lossless:
+            # The source may be waiting for this reader to make room.
+            with self._condition:
+                self._condition.notify_all()
+        return data
+
+    def start(self):
+        """Start capturing audio."""
+        self._closed = False
+        self._running = True
+        self._ended.clear()
+        if self.resampler is not None:
+            self.resampler.reset()
+        self.source.start(self.write, self._on_source_end)
+
+    def stop(self):
+        """Stop capturing audio and release any blocked readers."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._running = False
+        self.source.stop()
+
+    def close(self) -> None:
+        """Stop capturing and release the input device; the bus cannot be restarted."""
+        self.stop()
+        self.source.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class AudioBusReader:
+    """A consumer of an `AudioBus` with its own read cursor."""
+
+    def __init__(self, bus: AudioBus, cursor: int):
+        self.bus = bus
+        self.cursor = cursor
+        self.overruns = 0
+        self.held = 0
+        self.closed = False
+
+    @property
+    def sample_rate(self) -> int:
+        return self.bus.sample_rate
+
+    def read(
+        self, frames: int, timeout: Optional[float] = None, partial: bool = False
+    ) -> Optional[np.ndarray]:
+        """
+        Read the next `frames` int16 samples.
+
+        The returned array may be a view into the shared ring buffer. With a
+        lossless source it stays valid until the next `read`; otherwise until
+        the bus wraps around, so consumers that keep audio for longer than the
+        bus capacity must copy it.
+
+        Args:
+            frames (int): Number of samples to read
+            timeout (float, optional): Seconds to wait for them
+            partial (bool): Once the bus is closed, return the remaining
+                samples even if they are fewer than `frames`, so the end of
+                the audio is not lost
+
+        Returns:
+            np.ndarray or None: The samples, or None on timeout or once the
+            reader or bus has been closed and drained.
+        """
+        return self.bus._read(self, frames, timeout, partial)
+
+    async def read_async(
+        self, frames: int, poll_interval: float = 0.005, partial: bool = False
+    ) -> Optional[np.ndarray]:
+        """
+        Read the next `frames` int16 samples without blocking the event loop.
+
+        While too little audio is buffered, sleeps on the event loop until the
+        missing samples should have been captured, then checks again. See
+        `read` for how long the returned array stays valid.
+
+        Args:
+            frames (int): Number of samples to read
+            poll_interval (float): Shortest sleep between checks, in seconds
+            partial (bool): Once the bus is closed, return the remaining
+                samples even if they are fewer than `frames`, as `read` does
+
+        Returns:
+            np.ndarray or None: The samples, or None once the reader or bus has
+            been closed and drained.
+        """
+        while True:
+            data = self.bus._read(self, frames, 0, partial)
+            if data is not None:
+                return data
+            if self.closed or self.bus.closed:
+                return None
+            missing = frames - (self.bus.position - self.cursor)
+            await asyncio.sleep(max(missing / self.sample_rate, poll_interval))
+
+    def close(self) -> None:
+        """Stop reading and release any blocked `read` call."""
+        self.closed = True
+        self.bus._remove_reader(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
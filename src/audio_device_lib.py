@@ -0,0 +1,268 @@
+import os
+import threading
+import sounddevice as sd
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+STANDARD_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000, 96000)
+
+
+class DeviceInfo(NamedTuple):
+    """Capabilities of one audio device as reported by PortAudio."""
+
+    index: int
+    name: str
+    hostapi: int
+    max_input_channels: int
+    max_output_channels: int
+    default_samplerate: float
+    default_low_input_latency: float
+    default_high_input_latency: float
+    default_low_output_latency: float
+    default_high_output_latency: float
+
+
+class AudioDeviceRegistry:
+    """Process-wide cache of the audio devices known to PortAudio.
+
+    Devices are enumerated once and reused by every engine, instead of each
+    constructor calling `sd.query_devices()` several times. The cache is
+    dropped when a device is plugged in or removed (see `watch`), or when
+    `invalidate` is called after a stream fails to open.
+
+    PortAudio itself only sees added or removed hardware after a restart,
+    which is unsafe while any stream is open. Owners of streams therefore
+    register a listener with `add_listener`. On a hotplug event every
+    listener closes its streams, PortAudio is restarted, and `wait_ready`
+    returns, so the owners can reopen their streams on the devices as
+    enumerated now.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._devices: Optional[List[DeviceInfo]] = None
+        self._input_rates: Dict[int, Tuple[int, ...]] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+        self._ready = threading.Event()
+        self._ready.set()
+        self._fingerprint = self._hotplug_fingerprint()
+
+    def devices(self) -> List[DeviceInfo]:
+        """All devices, enumerated on first use and cached afterwards."""
+        with self._lock:
+            if self._devices is None:
+                self._devices = [
+                    DeviceInfo(
+                        index=i,
+                        name=dev["name"],
+                        hostapi=dev["hostapi"],
+                        max_input_channels=dev["max_input_channels"],
+                        max_output_channels=dev["max_output_channels"],
+                        default_samplerate=dev["default_samplerate"],
+                        default_low_input_latency=dev["default_low_input_latency"],
+                        default_high_input_latency=dev["default_high_input_latency"],
+                        default_low_output_latency=dev["default_low_output_latency"],
+                        default_high_output_latency=dev["default_high_output_latency"],
+                    )
+                    for i, dev in enumerate(sd.query_devices())
+                ]
+            return self._devices
+
+    def input_devices(self) -> List[DeviceInfo]:
+        """Devices with at least one input channel."""
+        return [dev for dev in self.devices() if dev.max_input_channels > 0]
+
+    def output_devices(self) -> List[DeviceInfo]:
+        """Devices with at least one output channel."""
+        return [dev for dev in self.devices() if dev.max_output_channels > 0]
+
+    def get(self, device: Union[int, str]) -> DeviceInfo:
+        """
+        Look up a device by index or by a case-insensitive substring of its name.
+
+        Raises:
+            ValueError: If no device, or more than one device, matches.
+        """
+        devices = self.devices()
+        if isinstance(device, int):
+            if not 0 <= device < len(devices):
+                raise ValueError(f"No audio device with index {device}")
+            return devices[device]
+
+        matches = [dev for dev in devices if device.lower() in dev.name.lower()]
+        if len(matches) != 1:
+            found = "No" if not matches else "Multiple"
+            raise ValueError(f"{found} audio devices matching {device!r}")
+        return matches[0]
+
+    def index_of(self, name: str, output: bool = False) -> int:
+        """
+        Index of the input (or output) device with exactly this name, as
+        currently enumerated. Indexes can change when PortAudio restarts.
+
+        Raises:
+            ValueError: If no such device is connected.
+        """
+        devices = self.output_devices() if output else self.input_devices()
+        for dev in devices:
+            if dev.name == name:
+                return dev.index
+        raise ValueError(f"Audio device {name!r} is not connected")
+
+    def resolve_input(
+        self, device: Optional[Union[int, str, Dict[str, Any]]] = None
+    ) -> int:
+        """Get the device ID for the audio input device."""
+        try:
+            if device is None:
+                # Try to find a working input device
+                inputs = self.input_devices()
+                if not inputs:
+                    raise RuntimeError("No working input device found")
+                print(f"Selected input device {inputs[0].index}: {inputs[0].name}")
+                return inputs[0].index
+            elif isinstance(device, (int, str)):
+                return self.get(device).index
+            elif isinstance(device, dict):
+                return device.get("index", 0)
+            else:
+                raise ValueError(f"Invalid device specification: {device}")
+        except Exception as e:
+            print(f"Error selecting audio device: {e}")
+            print("Available devices:")
+            print(sd.query_devices())
+            raise
+
+    def supported_input_rates(self, index: int) -> Tuple[int, ...]:
+        """Standard sample rates the input device accepts for mono int16 capture."""
+        with self._lock:
+            if index not in self._input_rates:
+                rates = []
+                for rate in STANDARD_RATES:
+                    try:
+                        sd.check_input_settings(
+                            device=index, channels=1, dtype="int16", samplerate=rate
+                        )
+                        rates.append(rate)
+                    except Exception:
+                        pass
+                self._input_rates[index] = tuple(rates)
+            return self._input_rates[index]
+
+    def invalidate(self, reinitialize: bool = False) -> None:
+        """
+        Drop the cached device list.
+
+        Args:
+            reinitialize (bool): Also restart PortAudio so it re-enumerates the
+                hardware. PortAudio only sees added or removed devices after a
+                restart, which must not happen while any stream is open. This
+                uses `sd._terminate` and `sd._initialize`, which sounddevice
+                documents for exactly this purpose.
+        """
+        with self._lock:
+            self._devices = None
+            self._input_rates.clear()
+            if reinitialize:
+                sd._terminate()
+                sd._initialize()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a function called on a hotplug event, before PortAudio is
+        restarted. It must close every stream its owner has open before it
+        returns; the owner reopens them once `wait_ready` returns.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        """Unregister a function added with `add_listener`."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block while PortAudio is restarting after a hotplug event.
+
+        Returns:
+            bool: True once devices can be opened again, False on timeout.
+        """
+        return self._ready.wait(timeout)
+
+    @staticmethod
+    def _hotplug_fingerprint() -> Optional[str]:
+        """A cheap summary of the attached sound hardware, where the OS offers one."""
+        try:
+            with open("/proc/asound/cards") as cards:
+                fingerprint = cards.read()
+            return fingerprint + ",".join(sorted(os.listdir("/dev/snd")))
+        except OSError:
+            return None
+
+    def _watch(self, interval: float) -> None:
+        while not self._watch_stop.wait(interval):
+            fingerprint = self._hotplug_fingerprint()
+            if fingerprint == self._fingerprint:
+                continue
+            self._fingerprint = fingerprint
+            print("Audio devices changed, refreshing device list")
+            with self._lock:
+                listeners = list(self._listeners)
+            if not listeners:
+                # Streams nobody closes for us may be open; only drop the cache.
+                self.invalidate()
+                continue
+            self._ready.clear()
+            try:
+                for listener in listeners:
+                    try:
+                        listener()
+                    except Exception as e:
+                        print(f"Error in audio device listener: {e}")
+                self.invalidate(reinitialize=True)
+            finally:
+                self._ready.set()
+
+    def watch(self, interval: float = 2.0) -> None:
+        """
+        Poll for hotplug events in the background and invalidate the cache on change.
+
+        If listeners are registered, they close their streams and PortAudio is
+        restarted, so re-plugged devices can be opened again. Detection uses
+        /proc/asound and /dev/snd, so it is only available on Linux.
+        Elsewhere the watcher never fires and `invalidate` must be called
+        explicitly.
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch, args=(interval,), daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        """Stop the hotplug watcher."""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    def print_input_devices(self) -> List[int]:
+        """List all available audio input devices with detailed information."""
+        input_devices = []
+        print("\nAvailable Audio Input Devices:")
+        for dev in self.input_devices():
+            print(f"\nDevice {dev.index}: {dev.name}")
+            print(f"  Channels: {dev.max_input_channels}")
+            print(f"  Sample rates: {dev.default_samplerate}")
+            print(f"  Supported rates: {self.supported_input_rates(dev.index)}")
+            input_devices.append(dev.index)
+        return input_devices
+
+
+device_registry = AudioDeviceRegistry()
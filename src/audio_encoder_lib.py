@@ -0,0 +1,115 @@
+import numpy as np
+
+
+# libsndfile command that sets the target duration of an Ogg page, from sndfile.h.
+SFC_SET_OGG_PAGE_LATENCY_MS = 0x1302
+
+# Google Cloud Speech encoding name -> libsndfile (format, subtype).
+FORMATS = {
+    "FLAC": ("FLAC", "PCM_16"),
+    "OGG_OPUS": ("OGG", "OPUS"),
+}
+
+
+class _ByteSink:
+    """Writable file object that hands out each encoded byte once.
+
+    libsndfile seeks back when the file is closed to rewrite the header
+    with the final length. Those bytes were already taken, so rewrites are
+    dropped; a streaming decoder does not need them.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.position = 0
+        self.taken = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        end = self.position + len(data)
+        if end > self.taken:
+            start = max(self.position, self.taken)
+            new = data[start - self.position :]
+            self.data[start - self.taken : end - self.taken] = new
+        self.position = end
+        return len(data)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self.position
+        elif whence == 2:
+            offset += self.taken + len(self.data)
+        self.position = offset
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        return b""
+
+    def take(self) -> bytes:
+        data = bytes(self.data)
+        self.taken += len(data)
+        self.data.clear()
+        return data
+
+
+class StreamEncoder:
+    """Encodes int16 mono audio into one FLAC or Ogg Opus byte stream, chunk by chunk.
+
+    Each call to `encode` returns the bytes that became available, which may
+    be empty: FLAC frames hold 4096 samples, and Ogg pages are written every
+    `page_latency` seconds. The concatenated output is a valid stream for a
+    `RecognitionConfig` with the same encoding. Requires the soundfile package.
+    """
+
+    def __init__(self, encoding: str, sample_rate: int, page_latency: float = 0.1):
+        """
+        Initialize the encoder.
+
+        Args:
+            encoding (str): "FLAC" or "OGG_OPUS"
+            sample_rate (int): Sample rate in Hz; Opus needs 8, 12, 16, 24 or 48 kHz
+            page_latency (float): Seconds of Opus audio per Ogg page
+        """
+        if encoding not in FORMATS:
+            raise ValueError(
+                f"Unsupported encoding {encoding}, expected one of {', '.join(FORMATS)}"
+            )
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self._sink = _ByteSink()
+        try:
+            import soundfile
+
+            format, subtype = FORMATS[encoding]
+            self._file = soundfile.SoundFile(
+                self._sink,
+                mode="w",
+                samplerate=sample_rate,
+                channels=1,
+                subtype=subtype,
+                format=format,
+            )
+            if format == "OGG":
+                latency = soundfile._ffi.new("double*", page_latency * 1000)
+                soundfile._snd.sf_command(
+                    self._file._file,
+                    SFC_SET_OGG_PAGE_LATENCY_MS,
+                    latency,
+                    soundfile._ffi.sizeof("double"),
+                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create {encoding} encoder: {str(e)}")
+
+    def encode(self, pcm: np.ndarray) -> bytes:
+        """Encode int16 samples; returns the newly available stream bytes."""
+        self._file.write(pcm)
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        """Flush the last, partial frame and end the stream."""
+        if not self._file.closed:
+            self._file.close()
+        return self._sink.take()
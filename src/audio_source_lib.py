@@ -0,0 +1,307 @@
+import threading
+import wave
+import sounddevice as sd
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Union
+import time as time_lib
+from audio_device_lib import device_registry
+from latency_controller_lib import AdaptiveLatencyController
+
+
+class AudioSource(ABC):
+    """Produces blocks of mono int16 audio for an `AudioBus`.
+
+    Attributes:
+        sample_rate (int): Sample rate of the produced audio in Hz
+        blocksize (int): Number of samples per block
+        device: Input device the audio comes from, or None for non-device sources
+        lossless (bool): Whether consumers must see every sample. A lossless
+            source is allowed to run faster than real time, so the bus holds it
+            back instead of dropping audio that readers have not consumed yet.
+    """
+
+    sample_rate: int
+    blocksize: int
+    device: Optional[int] = None
+    lossless: bool = False
+
+    @abstractmethod
+    def start(
+        self,
+        callback: Callable[[np.ndarray], None],
+        on_end: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Start producing audio.
+
+        Args:
+            callback (Callable[[np.ndarray], None]): Called with each int16 block
+            on_end (Callable[[], None], optional): Called once the source has no
+                more audio to deliver
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop producing audio."""
+
+    def close(self) -> None:
+        """Release the device behind the source; it cannot be started again."""
+
+
+class MicrophoneSource(AudioSource):
+    """Live capture from an input device through a `sounddevice.InputStream`."""
+
+    def __init__(
+        self,
+        device: Optional[Union[int, str, Dict[str, Any]]] = None,
+        sample_rate: Optional[int] = 16000,
+        blocksize: int = 512,
+        latency: float = 0.1,
+        adaptive_latency: bool = False,
+    ):
+        """
+        Initialize the microphone source.
+
+        Args:
+            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
+            sample_rate (int, optional): Capture sample rate in Hz; None uses the
+                device's native default rate
+            blocksize (int): Frames per capture callback
+            latency (float): Audio stream latency in seconds
+            adaptive_latency (bool): Tune latency and blocksize at runtime from
+                overflow statistics, starting from the given values
+        """
+        if isinstance(device, dict):
+            device = device.get("index")
+
+        if sample_rate is None:
+            index = device_registry.resolve_input(device)
+            sample_rate = int(device_registry.get(index).default_samplerate)
+
+        self.device = device
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.latency = latency
+        self.error_count = 0
+        self.last_error_time = 0
+        self.MAX_ERRORS = 5
+        self.ERROR_RESET_TIME = 60  # seconds
+        self._callback: Optional[Callable[[np.ndarray], None]] = None
+        self._stream_lock = threading.Lock()
+        self._running = False
+
+        self.controller: Optional[AdaptiveLatencyController] = None
+        if adaptive_latency:
+            self.controller = AdaptiveLatencyController(
+                self._restart,
+                sample_rate=self.sample_rate,
+                latency=self.latency,
+                blocksize=self.blocksize,
+                device_key=f"input:{device}:{self.sample_rate}",
+            )
+            self.latency = self.controller.latency
+            self.blocksize = self.controller.blocksize
+
+        self._open_stream()
+
+    def _open_stream(self) -> None:
+        """Create the input stream with the current latency and blocksize."""
+        try:
+            self.audio_stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                device=self.device,
+                channels=1,
+                dtype=np.int16,
+                blocksize=self.blocksize,
+                callback=self._audio_callback,
+                latency=self.latency,
+            )
+        except Exception as e:
+            # The device may have been unplugged or re-enumerated.
+            device_registry.invalidate()
+            raise RuntimeError(f"Failed to open microphone: {str(e)}")
+
+    def _restart(self, latency: float, blocksize: int) -> None:
+        """Reopen the stream with new settings chosen by the latency controller."""
+        with self._stream_lock:
+            if self.audio_stream is None:
+                return
+            self.latency = latency
+            self.blocksize = blocksize
+            self.audio_stream.stop()
+            self.audio_stream.close()
+            self._open_stream()
+            if self._running:
+                self.audio_stream.start()
+
+    def _audio_callback(self, indata, frames, time, status):
+        """Forward captured audio to the consumer."""
+        current_time = time_lib.time()
+        started = time_lib.perf_counter()
+
+        if status:
+            if status.input_overflow:
+                self.error_count += 1
+                if current_time - self.last_error_time > self.ERROR_RESET_TIME:
+                    self.error_count = 1
+                self.last_error_time = current_time
+
+                if self.error_count >= self.MAX_ERRORS:
+                    print(
+                        "\nToo many input overflows. Try increasing latency or using a different audio device."
+                    )
+            print(f"Microphone callback status: {status}")
+
+        try:
+            if self._callback is not None:
+                self._callback(indata[:, 0])
+        except Exception as e:
+            print(f"Error forwarding microphone audio: {e}")
+
+        if self.controller is not None:
+            self.controller.record(status, time_lib.perf_counter() - started)
+
+    def start(self, callback, on_end=None):
+        """Start capturing audio."""
+        self._callback = callback
+        with self._stream_lock:
+            self._running = True
+            self.audio_stream.start()
+        if self.controller is not None:
+            self.controller.start()
+
+    def stop(self):
+        """Stop capturing audio."""
+        if self.controller is not None:
+            self.controller.stop()
+        with self._stream_lock:
+            self._running = False
+            if self.audio_stream is None:
+                return
+            try:
+                self.audio_stream.stop()
+            except Exception as e:
+                print(f"Error stopping microphone stream: {e}")
+
+    def close(self):
+        """Stop capturing and close the input stream; closing again does nothing."""
+        self.stop()
+        with self._stream_lock:
+            if self.audio_stream is None:
+                return
+            try:
+                self.audio_stream.close()
+            except Exception as e:
+                print(f"Error closing microphone stream: {e}")
+            self.audio_stream = None
+
+
+class FileSource(AudioSource):
+    """Audio read from a WAV or raw 16-bit PCM file.
+
+    The file can be paced in real time, behaving like a microphone, or read as
+    fast as the consumers can keep up for benchmarks and batch processing.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: Optional[int] = None,
+        blocksize: int = 512,
+        realtime: bool = True,
+    ):
+        """
+        Initialize the file source.
+
+        Args:
+            path (str): Path to a .wav file, or a headerless little-endian int16
+                mono file for any other extension
+            sample_rate (int, optional): Sample rate of raw PCM files; WAV files
+                use the rate from their header
+            blocksize (int): Samples per delivered block
+            realtime (bool): Pace delivery to the audio duration instead of
+                running flat out
+        """
+        self.path = path
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self.lossless = not realtime
+        self.is_wav = path.lower().endswith(".wav")
+
+        if self.is_wav:
+            with wave.open(path, "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+                self.channels = wav.getnchannels()
+                self.sample_rate = wav.getframerate()
+                self.frames = wav.getnframes()
+        else:
+            if sample_rate is None:
+                raise ValueError(f"{path}: sample_rate is required for raw PCM files")
+            self.channels = 1
+            self.sample_rate = sample_rate
+            self.frames = len(np.memmap(path, dtype="<i2", mode="r"))
+
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def duration(self) -> float:
+        """Length of the file in seconds."""
+        return self.frames / self.sample_rate
+
+    def _blocks(self):
+        """Yield int16 mono blocks from the file."""
+        if not self.is_wav:
+            pcm = np.memmap(self.path, dtype="<i2", mode="r")
+            for start in range(0, len(pcm), self.blocksize):
+                yield np.asarray(pcm[start : start + self.blocksize], dtype=np.int16)
+            return
+
+        with wave.open(self.path, "rb") as wav:
+            while True:
+                data = wav.readframes(self.blocksize)
+                if not data:
+                    return
+                block = np.frombuffer(data, dtype="<i2")
+                if self.channels > 1:
+                    block = (
+                        block.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+                    )
+                yield block
+
+    def _run(self, callback, on_end):
+        """Deliver the file block by block, optionally paced to real time."""
+        started = time_lib.monotonic()
+        delivered = 0
+        try:
+            for block in self._blocks():
+                if self._stopped.is_set():
+                    break
+                if self.realtime:
+                    delay = started + delivered / self.sample_rate - time_lib.monotonic()
+                    if delay > 0 and self._stopped.wait(delay):
+                        break
+                callback(block)
+                delivered += len(block)
+        except Exception as e:
+            print(f"Error reading audio file {self.path}: {e}")
+        finally:
+            if on_end is not None:
+                on_end()
+
+    def start(self, callback, on_end=None):
+        """Start delivering audio from the beginning of the file."""
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(callback, on_end), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop delivering audio."""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,76 @@
+"""
+Local fake of the Google Cloud Speech streaming API.
+
+Serves StreamingRecognize on localhost until interrupted, so the speech
+CLIs and the companion can run offline with --endpoint/--speech_endpoint.
+
+Example usage:
+    python src/fake_speech_server_cli.py --port 50051
+    python src/fake_speech_server_cli.py --script "what time is it" "thank you" --delay 0.3 --jitter 0.1
+
+    # Recognizing the audio with a local Vosk model, failing some streams:
+    python src/fake_speech_server_cli.py --vosk_model model --failure_rate 0.2
+"""
+
+import argparse
+import time
+from fake_speech_server_lib import FakeSpeechServer
+from vosk_model_lib import vosk_models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Speech-to-Text server")
+    parser.add_argument("--port", type=int, default=50051, help="Port to listen on")
+    parser.add_argument(
+        "--script",
+        type=str,
+        nargs="+",
+        help="Utterances recognized in order in every stream",
+    )
+    parser.add_argument(
+        "--vosk_model",
+        type=str,
+        help="Recognize the received audio with this Vosk model instead of a script",
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.1, help="Seconds each response is delayed"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Largest random change of the delay"
+    )
+    parser.add_argument(
+        "--failure_rate",
+        type=float,
+        default=0.0,
+        help="Share of streams that fail with UNAVAILABLE",
+    )
+    parser.add_argument(
+        "--max_stream_duration",
+        type=float,
+        default=305.0,
+        help="Seconds of audio after which a stream fails with OUT_OF_RANGE",
+    )
+    args = parser.parse_args()
+
+    model = vosk_models.get(args.vosk_model) if args.vosk_model else None
+
+    server = FakeSpeechServer(
+        script=args.script,
+        model=model,
+        port=args.port,
+        delay=args.delay,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        max_stream_duration=args.max_stream_duration,
+    )
+    with server:
+        print(f"Fake speech server listening on {server.endpoint}. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            print(f"\nServed {server.streams} streams, injected {server.failures} failures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import datetime
+import json
+import queue
+import random
+import threading
+import time
+from concurrent import futures
+from typing import List, Optional
+import grpc
+from google.cloud import speech
+
+
+SERVICE = "google.cloud.speech.v1.Speech"
+
+
+class _Session:
+    """One StreamingRecognize call: turns received audio into scheduled responses."""
+
+    def __init__(self, server: "FakeSpeechServer", context: grpc.ServicerContext):
+        self.server = server
+        self.context = context
+        self.rate = 16000
+        self.interim_results = False
+        self.received = 0.0
+        self.recognizer = None
+        self.script = list(server.script or [])
+        self.words: List[str] = []
+        self.said = 0
+        self.utterance_start = 0.0
+        self.last_partial = ""
+        self.last_due = 0.0
+        self.events: queue.Queue = queue.Queue()
+        self.fail_at: Optional[float] = None
+        if server._random.random() < server.failure_rate:
+            self.fail_at = server._random.uniform(0.0, server.fail_within)
+
+    def _schedule(self, event) -> None:
+        """Queue a response or abort after the server delay, keeping the order."""
+        server = self.server
+        delay = max(0.0, server.delay + server._random.uniform(-server.jitter, server.jitter))
+        self.last_due = max(self.last_due, time.monotonic() + delay)
+        self.events.put((self.last_due, event))
+
+    def _respond(self, transcript: str, is_final: bool) -> None:
+        if not is_final and not self.interim_results:
+            return
+        alternative = speech.SpeechRecognitionAlternative(
+            transcript=transcript, confidence=0.9 if is_final else 0.0
+        )
+        result = speech.StreamingRecognitionResult(
+            alternatives=[alternative],
+            is_final=is_final,
+            stability=0.0 if is_final else 0.9,
+        )
+        result.result_end_time = datetime.timedelta(seconds=self.received)
+        self._schedule(speech.StreamingRecognizeResponse(results=[result]))
+
+    def _configure(self, streaming_config) -> None:
+        config = streaming_config.config
+        if config.encoding != speech.RecognitionConfig.AudioEncoding.LINEAR16:
+            raise ValueError("The fake speech server only accepts LINEAR16 audio")
+        self.rate = config.sample_rate_hertz or 16000
+        self.interim_results = streaming_config.interim_results
+        if self.server.model is not None:
+            from vosk import KaldiRecognizer
+
+            self.recognizer = KaldiRecognizer(self.server.model, self.rate)
+
+    def _hear_script(self) -> None:
+        """Reveal the scripted utterances word by word as audio arrives."""
+        while self.script or self.words:
+            if not self.words:
+                self.words = self.script.pop(0).split()
+                self.said = 0
+                self.utterance_start = self.received
+            elapsed = self.received - self.utterance_start
+            spoken = elapsed * self.server.words_per_second
+            due = min(len(self.words), int(spoken))
+            if due > self.said:
+                self.said = due
+                self._respond(" ".join(self.words[:due]), False)
+            if spoken < len(self.words) + self.server.final_after * self.server.words_per_second:
+                return
+            self._respond(" ".join(self.words), True)
+            self.words = []
+
+    def _hear_vosk(self, audio: bytes) -> None:
+        if self.recognizer.AcceptWaveform(audio):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            self.last_partial = ""
+            if text:
+                self._respond(text, True)
+            return
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            self._respond(partial, False)
+
+    def _finish(self) -> None:
+        """The client half-closed: finalize what was heard."""
+        if self.recognizer is not None:
+            text = json.loads(self.recognizer.FinalResult()).get("text", "")
+            if text:
+                self._respond(text, True)
+        elif self.words and self.said:
+            self._respond(" ".join(self.words[: self.said]), True)
+
+    def consume(self, requests) -> None:
+        """Read the client's requests; runs on its own thread."""
+        try:
+            for request in requests:
+                if "streaming_config" in request:
+                    self._configure(request.streaming_config)
+                    continue
+                self.received += len(request.audio_content) / 2 / self.rate
+                if self.fail_at is not None and self.received >= self.fail_at:
+                    self.server.failures += 1
+                    self._schedule(
+                        (grpc.StatusCode.UNAVAILABLE, "Injected failure of the fake server")
+                    )
+                    return
+                if self.received > self.server.max_stream_duration:
+                    self._schedule(
+                        (
+                            grpc.StatusCode.OUT_OF_RANGE,
+                            "Exceeded maximum allowed stream duration of "
+                            f"{self.server.max_stream_duration:g} seconds.",
+                        )
+                    )
+                    return
+                if self.recognizer is not None:
+                    self._hear_vosk(request.audio_content)
+                else:
+                    self._hear_script()
+            self._finish()
+            self._schedule(None)
+        except grpc.RpcError:
+            # Cancelled by the client.
+            self.events.put((0.0, None))
+        except Exception as e:
+            self._schedule((grpc.StatusCode.INVALID_ARGUMENT, str(e)))
+
+    def responses(self):
+        """Yield the scheduled responses at their due times."""
+        while True:
+            due, event = self.events.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if event is None:
+                return
+            if isinstance(event, tuple):
+                self.context.abort(*event)
+            yield event
+
+
+class FakeSpeechServer:
+    """A local stand-in for the Google Cloud Speech streaming API.
+
+    Serves `StreamingRecognize` over plain gRPC, so `SpeechRecognizer` can be
+    tested and benchmarked offline by passing `endpoint=server.endpoint`.
+    Results either follow a `script` of utterances, revealed word by word at
+    `words_per_second` of received audio and finalized `final_after` seconds
+    later, or come from a Vosk `model` run on the received audio. Finals are
+    also sent when the client half-closes the stream.
+
+    Every response is held back by `delay` seconds, plus or minus up to
+    `jitter`. With probability `failure_rate`, a stream fails with
+    UNAVAILABLE somewhere in its first `fail_within` seconds of audio, and
+    streams longer than `max_stream_duration` fail with OUT_OF_RANGE, as on
+    the real service.
+    """
+
+    def __init__(
+        self,
+        script: Optional[List[str]] = None,
+        model=None,
+        port: int = 0,
+        delay: float = 0.1,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        fail_within: float = 3.0,
+        max_stream_duration: float = 305.0,
+        words_per_second: float = 2.5,
+        final_after: float = 0.8,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the server. It is started by `start`.
+
+        Args:
+            script (List[str], optional): Utterances recognized in order in every
+                stream; by default "hello world"
+            model (vosk.Model, optional): Recognize the received audio with Vosk
+                instead of following the script
+            port (int): Port to listen on; by default a free one is picked
+            delay (float): Seconds each response is delayed
+            jitter (float): Largest random change of the delay, in seconds
+            failure_rate (float): Share of streams that fail with UNAVAILABLE
+            fail_within (float): Seconds of audio within which such a stream fails
+            max_stream_duration (float): Seconds of audio after which a stream fails
+            words_per_second (float): Speed at which scripted words are revealed
+            final_after (float): Seconds after the last scripted word until the
+                utterance is final
+            seed (int, optional): Seed for the delay and failure randomness
+        """
+        self.script = script if script is not None or model is not None else ["hello world"]
+        self.model = model
+        self.port = port
+        self.delay = delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.fail_within = fail_within
+        self.max_stream_duration = max_stream_duration
+        self.words_per_second = words_per_second
+        self.final_after = final_after
+        self.streams = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._server: Optional[grpc.Server] = None
+
+    @property
+    def endpoint(self) -> str:
+        """The host:port to pass as `SpeechRecognizer(endpoint=...)`."""
+        return f"localhost:{self.port}"
+
+    def _streaming_recognize(self, requests, context):
+        self.streams += 1
+        session = _Session(self, context)
+        threading.Thread(target=session.consume, args=(requests,), daemon=True).start()
+        return session.responses()
+
+    def start(self) -> str:
+        """Start serving; returns the endpoint."""
+        handler = grpc.method_handlers_generic_handler(
+            SERVICE,
+            {
+                "StreamingRecognize": grpc.stream_stream_rpc_method_handler(
+                    self._streaming_recognize,
+                    request_deserializer=speech.StreamingRecognizeRequest.deserialize,
+                    response_serializer=speech.StreamingRecognizeResponse.serialize,
+                )
+            },
+        )
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=16))
+        self._server.add_generic_rpc_handlers((handler,))
+        self.port = self._server.add_insecure_port(f"localhost:{self.port}")
+        self._server.start()
+        return self.endpoint
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        """Stop serving, cancelling open streams after `grace` seconds."""
+        if self._server is not None:
+            self._server.stop(grace).wait()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
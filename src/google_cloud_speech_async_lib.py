@@ -0,0 +1,191 @@
+import asyncio
+import grpc
+import numpy as np
+from google.cloud import speech
+from google.cloud.speech_v1.services.speech.transports import (
+    SpeechGrpcAsyncIOTransport,
+)
+from audio_bus_lib import AudioBus
+from audio_encoder_lib import StreamEncoder
+from audio_source_lib import AudioSource
+from google_cloud_speech_lib import (
+    RecognitionResult,
+    SpeechRecognizer,
+    is_local_endpoint,
+)
+
+
+class AsyncSpeechRecognizer(SpeechRecognizer):
+    """An asyncio counterpart of `SpeechRecognizer`.
+
+    Uses the async Speech client, and reads audio from an audio bus with
+    `AudioBusReader.read_async`, so recognition runs on the event loop
+    without helper threads:
+
+        async with AsyncSpeechRecognizer(audio_bus=bus) as recognizer:
+            async for transcript, is_final in recognizer.stream():
+                ...
+
+    Cancelling the task consuming `stream()`, closing the generator, or
+    leaving the `async with` block cancels the gRPC call at once. (Breaking
+    out of `async for` alone only closes the generator once it is garbage
+    collected.) Each stream is limited to Google's five minutes; there is no
+    rollover or reconnection.
+    """
+
+    def __init__(
+        self,
+        rate: int = 16000,
+        audio_bus: AudioBus | None = None,
+        source: AudioSource | None = None,
+        device_index: int | None = None,
+        capture_rate: int | None = None,
+        client: speech.SpeechAsyncClient | None = None,
+        **kwargs,
+    ):
+        """Initializes the recognizer.
+
+        Without `audio_bus` or `source`, the microphone `device_index` is
+        captured through a private audio bus, at `capture_rate` if given.
+        `client` is an async Speech client to share. The other arguments are
+        those of `SpeechRecognizer`.
+        """
+        owns_bus = audio_bus is None and source is None
+        if owns_bus:
+            audio_bus = AudioBus(
+                device=device_index, sample_rate=rate, capture_rate=capture_rate
+            )
+        super().__init__(
+            rate=rate,
+            audio_bus=audio_bus,
+            source=source,
+            device_index=device_index,
+            capture_rate=capture_rate,
+            client=client,
+            **kwargs,
+        )
+        self.owns_bus = self.owns_bus or owns_bus
+        self._warm_task: asyncio.Task | None = None
+        self._call = None
+
+    def _create_client(self):
+        if self.endpoint is None:
+            return speech.SpeechAsyncClient()
+        if is_local_endpoint(self.endpoint):
+            return speech.SpeechAsyncClient(
+                transport=SpeechGrpcAsyncIOTransport(
+                    channel=grpc.aio.insecure_channel(self.endpoint)
+                )
+            )
+        return speech.SpeechAsyncClient(client_options={"api_endpoint": self.endpoint})
+
+    def _warm_channel(self) -> None:
+        """Connect the client's gRPC channel on the event loop, ahead of the first stream."""
+        channel = getattr(getattr(self.client, "transport", None), "grpc_channel", None)
+        if channel is None or not hasattr(channel, "channel_ready"):
+            return
+
+        async def connect():
+            try:
+                await asyncio.wait_for(channel.channel_ready(), timeout=10.0)
+            except Exception as e:
+                print(f"Could not warm up the speech channel: {e}")
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Opened outside the event loop; the channel connects with the
+            # first stream instead.
+            return
+        self._warm_task = loop.create_task(connect())
+
+    def prewarm(self) -> None:
+        """
+        Create the client and start connecting its channel, e.g. on the wake
+        word. Unlike `SpeechRecognizer.prewarm`, no stream is opened ahead of
+        time; the call starts with `stream()`.
+        """
+        self.open()
+
+    async def __aenter__(self):
+        """Sets up the async speech client and starts reading the audio bus."""
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Cancels the active call and stops reading the audio bus, or tears
+        everything down if not persistent."""
+        if self._call is not None:
+            self._call.cancel()
+        self.__exit__(exc_type, exc_value, traceback)
+
+    async def _audio_chunks(self):
+        """An async generator of audio chunks from the bus, ending at an endpoint."""
+        reader = self.reader
+        while not reader.closed:
+            data = await reader.read_async(self.chunk, partial=True)
+            if data is None:
+                return
+            yield data.tobytes()
+            if self.endpointing and self._end_of_utterance(data):
+                return
+
+    async def _requests(self, turn):
+        """The streaming config, then the audio of this turn as requests."""
+        yield speech.StreamingRecognizeRequest(streaming_config=self.streaming_config)
+        encoder = None
+        if self.encoding != "LINEAR16":
+            encoder = StreamEncoder(
+                self.encoding,
+                self.rate,
+                page_latency=self.chunks_per_request * self.chunk / self.rate,
+            )
+        pending = []
+        samples = 0
+
+        async for content in self._audio_chunks():
+            pending.append(content)
+            samples += len(content) // 2
+            if len(pending) < self.chunks_per_request:
+                continue
+            content = b"".join(pending)
+            pending.clear()
+            if encoder is not None:
+                content = encoder.encode(np.frombuffer(content, dtype=np.int16))
+            if content:
+                turn["bytes_sent"] += len(content)
+                turn["audio_seconds"] = samples / self.rate
+                yield speech.StreamingRecognizeRequest(audio_content=content)
+
+        content = b"".join(pending)
+        if encoder is not None:
+            content = encoder.encode(np.frombuffer(content, dtype=np.int16))
+            content += encoder.finish()
+        if content:
+            turn["bytes_sent"] += len(content)
+            turn["audio_seconds"] = samples / self.rate
+            yield speech.StreamingRecognizeRequest(audio_content=content)
+
+    async def stream(self):
+        """
+        Recognizes speech from the audio bus and yields transcripts.
+        Yields:
+            RecognitionResult: The transcript, whether it is final, and its
+                stability, confidence, end time and word timings. Unpacks
+                as a (transcript, is_final) tuple.
+        """
+        self._start_turn()
+        turn = {"bytes_sent": 0, "audio_seconds": 0.0}
+        call = await self.client.streaming_recognize(requests=self._requests(turn))
+        self._call = call
+        try:
+            async for response in call:
+                result = RecognitionResult.from_response(response)
+                if result is None:
+                    continue
+                self._track_result(result)
+                yield result
+        finally:
+            call.cancel()
+            if self._call is call:
+                self._call = None
+            self.last_upload = turn
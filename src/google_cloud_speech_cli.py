@@ -3,22 +3,128 @@ Google Cloud Speech-to-Text command-line interface.
 
 Example usage:
     python src/google_cloud_speech_cli.py
+
+    # Transcribing a recording instead of the microphone:
+    python src/google_cloud_speech_cli.py --input_file recording.wav
+
+    # Ending each utterance locally as soon as the speaker stops:
+    python src/google_cloud_speech_cli.py --endpointing
+
+    # Recognizing on an asyncio event loop with the async client:
+    python src/google_cloud_speech_cli.py --asyncio
+
+    # Against a local fake server (see fake_speech_server_cli.py):
+    python src/google_cloud_speech_cli.py --endpoint localhost:50051
+
+    # With Vosk partials, using the Vosk final if Google's is 300 ms late:
+    python src/google_cloud_speech_cli.py --vosk_model vosk-model-small-en-us-0.15 --latency_budget 0.3
 """
 
+import argparse
+import asyncio
+from audio_source_lib import FileSource
+from google_cloud_speech_async_lib import AsyncSpeechRecognizer
 from google_cloud_speech_lib import SpeechRecognizer
+from hybrid_speech_lib import HybridRecognizer
+
+
+def print_transcript(recognizer: SpeechRecognizer, transcript: str, is_final: bool) -> None:
+    if is_final:
+        print(f"Final: {transcript}")
+        if isinstance(recognizer, HybridRecognizer):
+            print(
+                f"From {recognizer.last_final['source']}, "
+                f"{recognizer.last_final['after_local_final'] * 1000:.0f} ms after the Vosk final"
+            )
+        if recognizer.last_endpoint is not None:
+            print(
+                "Endpoint decided "
+                f"{recognizer.last_endpoint['decision_latency'] * 1000:.0f} ms "
+                "after speech ended, final result "
+                f"{recognizer.last_endpoint['final_latency'] * 1000:.0f} ms later"
+            )
+    else:
+        # Use a carriage return to overwrite the previous interim result.
+        print(f"Interim: {transcript}\r", end="")
+
+
+async def recognize_async(source, endpointing: bool, endpoint: str | None) -> None:
+    """Streams audio through `AsyncSpeechRecognizer` on the event loop."""
+    async with AsyncSpeechRecognizer(
+        source=source, endpointing=endpointing, endpoint=endpoint
+    ) as recognizer:
+        print("Listening... Press Ctrl+C to stop.")
+        async for transcript, is_final in recognizer.stream():
+            print_transcript(recognizer, transcript, is_final)
 
 
 def main():
     """Streams audio from the microphone and prints real-time transcriptions."""
+    parser = argparse.ArgumentParser(description="Google Cloud streaming speech-to-text")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        help="WAV or raw 16 kHz PCM file to read instead of the microphone",
+    )
+    parser.add_argument(
+        "--flat_out",
+        action="store_true",
+        help="Send the input file as fast as possible instead of in real time",
+    )
+    parser.add_argument(
+        "--endpointing",
+        action="store_true",
+        help="Detect the end of each utterance locally and finalize it right away",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Recognize on an asyncio event loop with the async Speech client",
+    )
+    parser.add_argument(
+        "--endpoint",
+        type=str,
+        help="host:port of the Speech service, e.g. a local fake server",
+    )
+    parser.add_argument(
+        "--vosk_model",
+        type=str,
+        help="Vosk model for instant partials and a fallback for late finals",
+    )
+    parser.add_argument(
+        "--latency_budget",
+        type=float,
+        default=0.5,
+        help="Seconds to wait for the Google final after the Vosk final",
+    )
+    args = parser.parse_args()
+    if args.asyncio and args.vosk_model:
+        parser.error("--vosk_model is not supported with --asyncio")
+
+    source = None
+    if args.input_file:
+        source = FileSource(
+            args.input_file, sample_rate=16000, realtime=not args.flat_out
+        )
+
     try:
-        with SpeechRecognizer() as recognizer:
+        if args.asyncio:
+            asyncio.run(recognize_async(source, args.endpointing, args.endpoint))
+            return
+        options = dict(
+            source=source, endpointing=args.endpointing, endpoint=args.endpoint
+        )
+        recognizer = (
+            HybridRecognizer(
+                model=args.vosk_model, latency_budget=args.latency_budget, **options
+            )
+            if args.vosk_model
+            else SpeechRecognizer(**options)
+        )
+        with recognizer:
             print("Listening... Press Ctrl+C to stop.")
             for transcript, is_final in recognizer.recognize_stream():
-                if is_final:
-                    print(f"Final: {transcript}")
-                else:
-                    # Use a carriage return to overwrite the previous interim result.
-                    print(f"Interim: {transcript}\r", end="")
+                print_transcript(recognizer, transcript, is_final)
 
     except KeyboardInterrupt:
         print("\nStopping...")
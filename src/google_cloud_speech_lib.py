@@ -1,6 +1,243 @@
+import collections
+import queue
+import threading
+import time
+from typing import Dict
+import grpc
+import numpy as np
 import pyaudio
 from google.cloud import speech
+from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
 from dotenv import load_dotenv
+from audio_bus_lib import AudioBus, AudioBusReader
+from audio_encoder_lib import StreamEncoder
+from audio_source_lib import AudioSource
+from resampler_lib import Resampler
+from vad_lib import EnergyGate
+
+
+# Unfinalized audio replayed into the next stream on rollover. When more is
+# pending, the old stream is half-closed to finalize it instead.
+MAX_REPLAY_SECONDS = 30.0
+
+# Stream errors after which the stream is reopened and its audio replayed.
+RETRYABLE_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.ABORTED,
+    # Google's per-stream duration limit.
+    grpc.StatusCode.OUT_OF_RANGE,
+}
+
+
+def is_local_endpoint(endpoint: str) -> bool:
+    """Whether `endpoint` (host:port) is on this machine, so plain gRPC is used."""
+    host = endpoint.rsplit(":", 1)[0].strip("[]")
+    return host in ("localhost", "127.0.0.1", "::1")
+
+
+def create_speech_client(endpoint: str | None = None) -> speech.SpeechClient:
+    """
+    Create a Speech client, by default for Google's global endpoint.
+
+    Args:
+        endpoint (str, optional): host:port of another endpoint. Local ones,
+            e.g. a `FakeSpeechServer`, are reached over plain gRPC without
+            credentials.
+    """
+    if endpoint is None:
+        return speech.SpeechClient()
+    if is_local_endpoint(endpoint):
+        return speech.SpeechClient(
+            transport=SpeechGrpcTransport(channel=grpc.insecure_channel(endpoint))
+        )
+    return speech.SpeechClient(client_options={"api_endpoint": endpoint})
+
+
+class RecognitionResult:
+    """One streaming recognition result, without the protobuf message.
+
+    Iterating yields (transcript, is_final), so it unpacks like the tuples
+    `recognize_stream` used to yield. `words` holds (word, start, end)
+    tuples, with times in seconds of audio, when word time offsets are
+    enabled; the server only sends them with final results. `stability`
+    is only set on interim results and `confidence` on final ones.
+    """
+
+    __slots__ = ("transcript", "is_final", "stability", "confidence", "end_time", "words")
+
+    def __init__(
+        self,
+        transcript: str,
+        is_final: bool,
+        stability: float = 0.0,
+        confidence: float = 0.0,
+        end_time: float = 0.0,
+        words: tuple = (),
+    ):
+        self.transcript = transcript
+        self.is_final = is_final
+        self.stability = stability
+        self.confidence = confidence
+        self.end_time = end_time
+        self.words = words
+
+    def __iter__(self):
+        return iter((self.transcript, self.is_final))
+
+    def shift(self, seconds: float) -> None:
+        """Move the end time and word timings `seconds` later."""
+        self.end_time += seconds
+        if self.words:
+            self.words = tuple(
+                (word, start + seconds, end + seconds) for word, start, end in self.words
+            )
+
+    def __repr__(self) -> str:
+        return (
+            f"RecognitionResult({self.transcript!r}, is_final={self.is_final}, "
+            f"stability={self.stability:.2f}, confidence={self.confidence:.2f}, "
+            f"end_time={self.end_time:.2f})"
+        )
+
+    @classmethod
+    def from_response(cls, response) -> "RecognitionResult | None":
+        """
+        Convert the first result of a `StreamingRecognizeResponse`.
+
+        Reads the underlying protobuf message directly, since every field
+        access through the proto-plus wrapper allocates a wrapper object.
+
+        Returns:
+            RecognitionResult or None: None if the response has no transcript.
+        """
+        pb = getattr(response, "_pb", response)
+        if not pb.results:
+            return None
+        result = pb.results[0]
+        if not result.alternatives:
+            return None
+        alternative = result.alternatives[0]
+        end = result.result_end_time
+        words = ()
+        if alternative.words:
+            words = tuple(
+                (
+                    word.word,
+                    word.start_time.seconds + word.start_time.nanos * 1e-9,
+                    word.end_time.seconds + word.end_time.nanos * 1e-9,
+                )
+                for word in alternative.words
+            )
+        return cls(
+            alternative.transcript,
+            result.is_final,
+            result.stability,
+            alternative.confidence,
+            end.seconds + end.nanos * 1e-9,
+            words,
+        )
+
+
+class _Stream:
+    """One `streaming_recognize` call fed from a queue.
+
+    The call runs on its own thread, so it can be opened before any audio is
+    available. Its responses are put on `results` as (stream, kind, payload)
+    tuples: "response", then "error" or "done" once it has ended. Audio is
+    sent `chunks_per_request` chunks at a time, compressed by `encoder` if
+    one is given.
+    """
+
+    def __init__(
+        self,
+        client,
+        streaming_config,
+        results: queue.Queue,
+        encoder: StreamEncoder | None = None,
+        chunks_per_request: int = 1,
+    ):
+        self.client = client
+        self.streaming_config = streaming_config
+        self.results = results
+        self.encoder = encoder
+        self.chunks_per_request = chunks_per_request
+        self.opened = time.monotonic()
+        self.start_sample: int | None = None
+        self.samples = 0
+        self.bytes_sent = 0
+        self._pending: list = []
+        self.retired = False
+        self.cancelled = False
+        self.responses = None
+        self._requests: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "_Stream":
+        self._thread.start()
+        return self
+
+    def _request_generator(self):
+        while True:
+            content = self._requests.get()
+            if content is None:
+                return
+            yield speech.StreamingRecognizeRequest(audio_content=content)
+
+    def _run(self) -> None:
+        try:
+            # Returns only once the first response arrived. The client's own
+            # retry would re-send the same request iterator; failed streams
+            # are reconnected by the recognizer instead.
+            responses = self.client.streaming_recognize(
+                self.streaming_config, self._request_generator(), retry=None
+            )
+            with self._lock:
+                self.responses = responses
+                if self.cancelled:
+                    responses.cancel()
+            for response in responses:
+                self.results.put((self, "response", response))
+        except Exception as e:
+            self.results.put((self, "error", e))
+        else:
+            self.results.put((self, "done", None))
+
+    def send(self, content: bytes, start_sample: int) -> None:
+        """Queue audio starting at absolute sample `start_sample` of the turn."""
+        if self.start_sample is None:
+            self.start_sample = start_sample
+        self.samples += len(content) // 2
+        self._pending.append(content)
+        if len(self._pending) >= self.chunks_per_request:
+            self._flush()
+
+    def _flush(self, final: bool = False) -> None:
+        content = b"".join(self._pending)
+        self._pending.clear()
+        if self.encoder is not None:
+            content = self.encoder.encode(np.frombuffer(content, dtype=np.int16))
+            if final:
+                content += self.encoder.finish()
+        if content:
+            self.bytes_sent += len(content)
+            self._requests.put(content)
+
+    def half_close(self) -> None:
+        """End the request stream; the server finalizes what it has heard."""
+        if not self.cancelled:
+            self._flush(final=True)
+        self._requests.put(None)
+
+    def cancel(self) -> None:
+        """Abandon the call and its remaining results."""
+        with self._lock:
+            self.cancelled = True
+            if self.responses is not None:
+                self.responses.cancel()
+        self.half_close()
 
 
 class SpeechRecognizer:
@@ -12,79 +249,545 @@ class SpeechRecognizer:
         chunk: int = 1600,
         language_code: str = "en-US",
         device_index: int | None = None,
+        audio_bus: AudioBus | None = None,
+        preroll: float = 0.0,
+        persistent: bool = False,
+        source: AudioSource | None = None,
+        capture_rate: int | None = None,
+        client: speech.SpeechClient | None = None,
+        endpointing: bool = False,
+        endpoint_silence: float = 0.6,
+        endpoint_stability: float = 0.3,
+        single_utterance: bool = False,
+        rollover_after: float = 290.0,
+        warm_stream_timeout: float = 5.0,
+        encoding: str = "LINEAR16",
+        chunks_per_request: int = 1,
+        word_time_offsets: bool = False,
+        max_reconnects: int = 3,
+        endpoint: str | None = None,
     ):
-        """Initializes the speech recognizer."""
+        """Initializes the speech recognizer.
+
+        When `audio_bus` is given, audio is read from the shared capture bus
+        and no PyAudio stream is opened. `preroll` is the maximum number of
+        seconds of already captured bus audio replayed at the start of the next
+        stream, see `replay_from`. With `persistent`, the speech client and
+        PyAudio stream outlive the `with` block and are only released by
+        `close`. A `source`, e.g. a file, is read through a private audio bus
+        that runs until `close`. Without a bus, `capture_rate` opens the
+        microphone at that rate (usually its native one) and resamples to
+        `rate` in-process. A `client` passed in is used instead of creating
+        one, so several recognizers can share one gRPC channel.
+
+        With `endpointing`, the end of an utterance is detected locally instead
+        of waiting for the server. Once speech was heard, followed by
+        `endpoint_silence` seconds of quiet by an energy gate, and the interim
+        transcript has not changed for `endpoint_stability` seconds, the
+        request stream is half-closed, so the server finalizes at once.
+        `last_endpoint` reports how long each decision took. Alternatively,
+        `single_utterance` lets the server end the stream after one utterance.
+
+        The gRPC channel is connected in the background as soon as the client
+        is created, and `prewarm` opens the next stream ahead of time. Google
+        ends a stream after about five minutes of audio, so after
+        `rollover_after` seconds a new stream, opened a few seconds earlier,
+        takes over. Audio not yet finalized by the old stream is replayed into
+        it and the old stream is cancelled, so no audio is lost; results of
+        all streams come out of `recognize_stream` as one iterator.
+
+        To save upload bandwidth, `encoding` "FLAC" or "OGG_OPUS" compresses
+        the audio on the fly (this needs the soundfile package), and
+        `chunks_per_request` sends several chunks per request. Both add up to
+        one request's worth of delay; `last_upload` reports the bytes sent
+        per turn.
+
+        `word_time_offsets` asks the server for word timings, which are
+        included in the final `RecognitionResult`s.
+
+        When a stream fails with a retryable error such as UNAVAILABLE, it is
+        reopened up to `max_reconnects` times per turn, replaying the audio
+        not yet finalized. `endpoint` connects to another Speech endpoint,
+        e.g. a regional one, or over plain gRPC to a local server such as
+        `FakeSpeechServer` when the host is localhost.
+        """
         self.rate = rate
         self.chunk = chunk
         self.language_code = language_code
+        self.shared_client = client
         self.client = None
         self.streaming_config = None
         self.audio = None
-        self.stream = None
+        self.audio_stream = None
         self.device_index = device_index
-
-    def __enter__(self):
-        """Sets up the speech client and audio stream."""
-        load_dotenv()
-        self.client = speech.SpeechClient()
-
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=self.rate,
-            language_code=self.language_code,
+        self.capture_rate = capture_rate or rate
+        self.capture_chunk = self.chunk * self.capture_rate // rate
+        self.resampler = (
+            Resampler(self.capture_rate, rate) if self.capture_rate != rate else None
         )
-
-        self.streaming_config = speech.StreamingRecognitionConfig(
-            config=config, interim_results=True
+        self.persistent = persistent
+        self.endpointing = endpointing
+        self.endpoint_silence = endpoint_silence
+        self.endpoint_stability = endpoint_stability
+        self.single_utterance = single_utterance
+        self.rollover_after = rollover_after
+        self.warm_stream_timeout = warm_stream_timeout
+        self.encoding = encoding
+        self.chunks_per_request = chunks_per_request
+        self.word_time_offsets = word_time_offsets
+        self.endpoint = endpoint
+        self.last_upload: Dict[str, float] | None = None
+        if encoding != "LINEAR16":
+            # Fail early if the encoder cannot be created.
+            StreamEncoder(encoding, rate).finish()
+        self.rollovers = 0
+        self.max_reconnects = max_reconnects
+        self.reconnects = 0
+        self._warm_stream: _Stream | None = None
+        self._finalized_sample = 0
+        self._last_transcript = ""
+        self._max_replay = min(MAX_REPLAY_SECONDS, rollover_after / 2) * rate
+        self._lock = threading.Lock()
+        self._current: _Stream | None = None
+        self._next_stream: _Stream | None = None
+        self._replay: collections.deque = collections.deque()
+        self._replay_samples = 0
+        self._feed_done = False
+        self._turn_reconnects = 0
+        # Number of the current turn; a feeder only touches the turn state
+        # above while its own turn is current.
+        self._turn = 0
+        self._feeder: threading.Thread | None = None
+        self._feed_stop = threading.Event()
+        self.vad = EnergyGate(
+            self.chunk, hangover_frames=max(1, round(endpoint_silence * rate / chunk))
         )
+        self.last_endpoint: Dict[str, float] | None = None
+        self._heard_speech = False
+        self._last_speech_time = 0.0
+        self._transcript_time = 0.0
+        self._endpoint_time: float | None = None
+        self.owns_bus = source is not None and audio_bus is None
+        if self.owns_bus:
+            audio_bus = AudioBus(source=source, sample_rate=rate)
+        self.audio_bus = audio_bus
+        self.reader: AudioBusReader | None = None
+        self.preroll = preroll
+        self.replay_start: int | None = None
+        if audio_bus is not None and audio_bus.sample_rate != rate:
+            raise ValueError(
+                f"Audio bus sample rate {audio_bus.sample_rate} does not match "
+                f"recognizer rate {rate}"
+            )
+        if preroll and audio_bus is None:
+            raise ValueError("preroll requires an audio_bus")
+        if audio_bus is not None and preroll * rate > audio_bus.capacity:
+            raise ValueError(
+                f"preroll of {preroll}s exceeds the audio bus capacity of "
+                f"{audio_bus.capacity / rate}s"
+            )
 
-        self.audio = pyaudio.PyAudio()
-        self.stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk,
-            input_device_index=self.device_index,
+    def replay_from(self, position: int) -> None:
+        """
+        Replay bus audio captured since `position` when the next stream starts.
+
+        The replay is limited to the last `preroll` seconds, so speech that
+        started while the stream was being set up is not lost.
+
+        Args:
+            position (int): Absolute audio bus position, e.g. where the wake
+                word ended.
+        """
+        self.replay_start = position
+
+    def open(self):
+        """
+        Creates the speech client and, without an audio bus, the PyAudio
+        stream. Both are kept until `close` is called, so in persistent mode
+        each turn only resumes and pauses the already open stream.
+        """
+        if self.client is None:
+            load_dotenv()
+            self.client = self.shared_client or self._create_client()
+
+            config = speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding[self.encoding],
+                sample_rate_hertz=self.rate,
+                language_code=self.language_code,
+                enable_word_time_offsets=self.word_time_offsets,
+            )
+
+            self.streaming_config = speech.StreamingRecognitionConfig(
+                config=config,
+                interim_results=True,
+                single_utterance=self.single_utterance,
+            )
+            self._warm_channel()
+
+        if self.audio_bus is None and self.audio is None:
+            self.audio = pyaudio.PyAudio()
+            self.audio_stream = self.audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.capture_rate,
+                input=True,
+                frames_per_buffer=self.capture_chunk,
+                input_device_index=self.device_index,
+                start=False,
+            )
+
+    def _create_client(self):
+        return create_speech_client(self.endpoint)
+
+    def _warm_channel(self) -> None:
+        """Connect the client's gRPC channel in the background, ahead of the first stream."""
+        channel = getattr(getattr(self.client, "transport", None), "grpc_channel", None)
+        if channel is None:
+            return
+
+        def connect():
+            try:
+                grpc.channel_ready_future(channel).result(timeout=10.0)
+            except Exception as e:
+                print(f"Could not warm up the speech channel: {e}")
+
+        threading.Thread(target=connect, daemon=True).start()
+
+    def prewarm(self) -> None:
+        """
+        Open the next stream now, e.g. on the wake word, so its setup overlaps
+        the wait for speech. It is used by the next `recognize_stream` if that
+        starts within `warm_stream_timeout` seconds, and cancelled otherwise.
+        """
+        self.open()
+        if self._warm_stream is not None:
+            self._warm_stream.cancel()
+        self._warm_stream = self._new_stream(queue.Queue()).start()
+
+    def _new_stream(self, results: queue.Queue) -> _Stream:
+        """Create a stream with this recognizer's encoding, posting to `results`."""
+        encoder = None
+        if self.encoding != "LINEAR16":
+            encoder = StreamEncoder(
+                self.encoding,
+                self.rate,
+                page_latency=self.chunks_per_request * self.chunk / self.rate,
+            )
+        return _Stream(
+            self.client,
+            self.streaming_config,
+            results,
+            encoder=encoder,
+            chunks_per_request=self.chunks_per_request,
         )
-        return self
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        """Tears down the audio stream and PyAudio instance."""
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
+    def close(self):
+        """Tears down the audio stream, PyAudio instance and speech client."""
+        self._feed_stop.set()
+        if self._warm_stream is not None:
+            self._warm_stream.cancel()
+            self._warm_stream = None
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+        if self.owns_bus:
+            self.audio_bus.stop()
+        # No feeder may still be reading when the PyAudio stream is closed.
+        self._stop_feeder()
+        if self.audio_stream:
+            if not self.audio_stream.is_stopped():
+                self.audio_stream.stop_stream()
+            self.audio_stream.close()
+            self.audio_stream = None
         if self.audio:
             self.audio.terminate()
+            self.audio = None
+        self.client = None
+        self.streaming_config = None
+
+    def __enter__(self):
+        """Sets up the speech client and starts the audio stream."""
+        self.open()
+
+        if self.audio_bus is not None:
+            start = None
+            if self.replay_start is not None:
+                earliest = self.audio_bus.position - int(self.preroll * self.rate)
+                start = max(self.replay_start, earliest)
+                self.replay_start = None
+            self.reader = self.audio_bus.reader(start)
+            if self.owns_bus and not self.audio_bus.running:
+                self.audio_bus.start()
+            return self
+
+        if self.audio_stream.is_stopped():
+            if self.resampler is not None:
+                self.resampler.reset()
+            self.audio_stream.start_stream()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Pauses the audio stream, or tears everything down if not persistent."""
+        if not self.persistent:
+            self.close()
+            return
+
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+        # No feeder may still be reading when the PyAudio stream is stopped.
+        self._stop_feeder()
+        if self.audio_stream and not self.audio_stream.is_stopped():
+            self.audio_stream.stop_stream()
+
+    def _end_of_utterance(self, pcm: np.ndarray) -> bool:
+        """Local endpointer: whether the user has finished speaking after `pcm`."""
+        now = time.monotonic()
+        speaking = self.vad.update(pcm)
+        if self.vad.last_ratio >= self.vad.close_ratio:
+            self._last_speech_time = now
+        if speaking:
+            self._heard_speech = True
+            return False
+        if not self._heard_speech:
+            return False
+        if now - self._transcript_time < self.endpoint_stability:
+            # The transcript is still changing; wait for it to settle.
+            return False
+        self._endpoint_time = now
+        return True
 
     def _audio_generator(self):
         """A generator that yields audio chunks from the microphone."""
-        while self.stream and not self.stream.is_stopped():
-            data = self.stream.read(self.chunk, exception_on_overflow=False)
+        reader = self.reader
+        if reader is not None:
+            while not reader.closed:
+                data = reader.read(self.chunk, timeout=0.5)
+                if data is None:
+                    if self.audio_bus.closed:
+                        break
+                    continue
+                yield data.tobytes()
+                if self.endpointing and self._end_of_utterance(data):
+                    return
+            return
+
+        while self.audio_stream and not self.audio_stream.is_stopped():
+            data = self.audio_stream.read(self.capture_chunk, exception_on_overflow=False)
+            pcm = np.frombuffer(data, dtype=np.int16)
+            if self.resampler is not None:
+                pcm = self.resampler.process(pcm)
+                data = pcm.tobytes()
             yield data
+            if self.endpointing and self._end_of_utterance(pcm):
+                return
+
+    def _start_turn(self) -> None:
+        """Reset the per-turn endpointing and rollover state."""
+        self.vad.reset(keep_noise_floor=True)
+        self._heard_speech = False
+        self._transcript_time = time.monotonic()
+        self._endpoint_time = None
+        self.last_endpoint = None
+        self._last_transcript = ""
+        self._finalized_sample = 0
+
+    def _track_result(self, result: RecognitionResult) -> None:
+        """Update the endpointing and rollover state from a streaming result."""
+        if result.transcript != self._last_transcript:
+            self._last_transcript = result.transcript
+            self._transcript_time = time.monotonic()
+        if not result.is_final:
+            return
+        end = int(result.end_time * self.rate)
+        self._finalized_sample = max(self._finalized_sample, end)
+        if self._endpoint_time is not None:
+            self.last_endpoint = {
+                "decision_latency": self._endpoint_time - self._last_speech_time,
+                "final_latency": time.monotonic() - self._endpoint_time,
+            }
+
+    def _replay_into(self, stream: _Stream, max_samples: float) -> None:
+        """Send the newest `max_samples` of unfinalized audio to `stream`."""
+        skip = self._replay_samples - max_samples
+        for start, pending in self._replay:
+            if skip > 0:
+                skip -= len(pending) // 2
+                continue
+            stream.send(pending, start)
+
+    def _feed(self, stop: threading.Event, turn: int) -> None:
+        """Send audio to the current stream of `turn` and roll over to a new one near the limit."""
+        limit = int(self.rollover_after * self.rate)
+        lead = int(min(2.0, self.rollover_after / 2) * self.rate)
+        position = 0
+        try:
+            for content in self._audio_generator():
+                if stop.is_set():
+                    break
+                samples = len(content) // 2
+                with self._lock:
+                    if turn != self._turn:
+                        break
+                    self._replay.append((position, content))
+                    self._replay_samples += samples
+                    # Drop audio the server has finalized.
+                    while self._replay and (
+                        self._replay[0][0] + len(self._replay[0][1]) // 2
+                        <= self._finalized_sample
+                    ):
+                        self._replay_samples -= len(self._replay.popleft()[1]) // 2
+                    stream = self._current
+                    stream.send(content, position)
+                    position += samples
+
+                    if self._next_stream is None and stream.samples >= limit - lead:
+                        self._next_stream = self._new_stream(stream.results)
+                        stream.results.put((self._next_stream, "opened", None))
+                        self._next_stream.start()
+                    if stream.samples < limit:
+                        continue
+
+                    if self._replay_samples <= self._max_replay:
+                        # Re-recognize the unfinalized tail in the new stream.
+                        stream.cancel()
+                        self._replay_into(self._next_stream, self._max_replay)
+                    else:
+                        stream.retired = True
+                        stream.half_close()
+                        self._replay.clear()
+                        self._replay_samples = 0
+                    self._current, self._next_stream = self._next_stream, None
+                    self.rollovers += 1
+        except Exception as e:
+            if not stop.is_set():
+                print(f"Error reading audio for speech recognition: {e}")
+        finally:
+            with self._lock:
+                if turn == self._turn:
+                    self._feed_done = True
+                    self._current.half_close()
+                    if self._next_stream is not None:
+                        self._next_stream.cancel()
+                        self._next_stream = None
+
+    def _stop_feeder(self) -> None:
+        """Stop the audio feeder of the last turn and wait for it to exit."""
+        self._feed_stop.set()
+        if self._feeder is not None:
+            self._feeder.join()
+            self._feeder = None
+
+    def _reconnect(self, failed: _Stream, error: Exception) -> _Stream | None:
+        """
+        Replace a stream that failed with a retryable error.
+
+        The unfinalized audio is replayed into the new stream, so the turn
+        continues where the failed stream left off.
+
+        Returns:
+            The new stream, or None if `error` is not retried.
+        """
+        code = getattr(error, "grpc_status_code", None)
+        if code is None and isinstance(error, grpc.RpcError):
+            code = error.code()
+        if code not in RETRYABLE_CODES or self._turn_reconnects >= self.max_reconnects:
+            return None
+        with self._lock:
+            if failed is self._next_stream:
+                # Not used yet; the feeder opens another one.
+                self._next_stream = None
+                return failed
+            if failed is not self._current:
+                return None
+            stream = self._new_stream(failed.results).start()
+            self._replay_into(stream, self._max_replay)
+            if self._feed_done:
+                stream.half_close()
+            self._current = stream
+        self._turn_reconnects += 1
+        self.reconnects += 1
+        print(f"Speech stream failed ({code}), reconnected: {error}")
+        return stream
+
+    def cancel(self) -> None:
+        """
+        Abandon the current turn from another thread: its streams are
+        cancelled, so `recognize_stream` ends without further results.
+        """
+        with self._lock:
+            for stream in (self._current, self._next_stream):
+                if stream is not None:
+                    stream.cancel()
 
     def recognize_stream(self):
         """
         Recognizes speech from the microphone stream and yields transcripts.
         Yields:
-            tuple: A tuple containing the transcript (str) and a boolean
-                   indicating if the result is final (bool).
+            RecognitionResult: The transcript, whether it is final, and its
+                stability, confidence, end time and word timings. Times are
+                seconds since the start of the turn's audio, across stream
+                rollovers. Unpacks as a (transcript, is_final) tuple.
         """
-        requests = (
-            speech.StreamingRecognizeRequest(audio_content=content)
-            for content in self._audio_generator()
+        self._start_turn()
+        stream = self._warm_stream
+        self._warm_stream = None
+        if stream is None or time.monotonic() - stream.opened > self.warm_stream_timeout:
+            if stream is not None:
+                stream.cancel()
+            stream = self._new_stream(queue.Queue()).start()
+        results = stream.results
+        streams = {stream}
+        used = [stream]
+        # The last turn's feeder must be gone before its state is replaced.
+        self._stop_feeder()
+        with self._lock:
+            self._turn += 1
+            self._current = stream
+            self._next_stream = None
+            self._replay = collections.deque()
+            self._replay_samples = 0
+            self._feed_done = False
+            self._turn_reconnects = 0
+        stop = self._feed_stop = threading.Event()
+        self._feeder = threading.Thread(
+            target=self._feed, args=(stop, self._turn), daemon=True
         )
+        self._feeder.start()
 
-        responses = self.client.streaming_recognize(self.streaming_config, requests)
-
-        for response in responses:
-            if not response.results:
-                continue
-
-            result = response.results[0]
-            if not result.alternatives:
-                continue
+        try:
+            while streams:
+                stream, kind, payload = results.get()
+                if kind == "opened":
+                    streams.add(stream)
+                    used.append(stream)
+                    continue
+                if kind != "response":
+                    streams.discard(stream)
+                    if kind == "error" and not stream.cancelled:
+                        replacement = self._reconnect(stream, payload)
+                        if replacement is None:
+                            raise payload
+                        if replacement is not stream:
+                            streams.add(replacement)
+                            used.append(replacement)
+                    continue
+                if stream.cancelled:
+                    continue
 
-            transcript = result.alternatives[0].transcript
+                result = RecognitionResult.from_response(payload)
+                if result is None or (stream.retired and not result.is_final):
+                    continue
 
-            yield transcript, result.is_final
+                if stream.start_sample:
+                    result.shift(stream.start_sample / self.rate)
+                self._track_result(result)
+                yield result
+        finally:
+            stop.set()
+            for stream in streams:
+                stream.cancel()
+            self.last_upload = {
+                "bytes_sent": sum(stream.bytes_sent for stream in used),
+                "audio_seconds": sum(stream.samples for stream in used) / self.rate,
+            }
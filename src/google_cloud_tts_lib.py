@@ -1,29 +1,51 @@
+import io
+import wave
+import numpy as np
 import pyaudio
 from google.cloud import texttospeech
 from dotenv import load_dotenv
 import threading
 import queue
+from resampler_lib import Resampler
 
 
 class TextToSpeech:
     """A class to handle streaming Text-to-Speech conversion and audio playback."""
 
+    SYNTHESIS_RATE = 24000
+
     def __init__(
         self,
         language_code="en-US",
         voice_name="en-US-Wavenet-D",
         speaking_rate=1.0,
+        output_rate=None,
+        output_device_index=None,
+        client=None,
     ):
-        """Initializes the Text-to-Speech client."""
+        """Initializes the Text-to-Speech client.
+
+        Speech is synthesized at 24 kHz. Pass the output device's native rate as
+        `output_rate` to resample in-process instead of relying on PortAudio or
+        ALSA to convert it. `output_device_index` selects the speaker, and a
+        `client` passed in is shared instead of creating a new one.
+        """
         load_dotenv()
-        self.client = texttospeech.TextToSpeechClient()
+        self.client = client or texttospeech.TextToSpeechClient()
         self.voice = texttospeech.VoiceSelectionParams(
             language_code=language_code, name=voice_name
         )
         self.audio_config = texttospeech.AudioConfig(
             audio_encoding=texttospeech.AudioEncoding.LINEAR16,
             speaking_rate=speaking_rate,
-            sample_rate_hertz=24000,
+            sample_rate_hertz=self.SYNTHESIS_RATE,
+        )
+        self.output_rate = output_rate or self.SYNTHESIS_RATE
+        self.output_device_index = output_device_index
+        self.resampler = (
+            Resampler(self.SYNTHESIS_RATE, self.output_rate)
+            if self.output_rate != self.SYNTHESIS_RATE
+            else None
         )
         self.audio = None
         self.stream = None
@@ -37,8 +59,9 @@ class TextToSpeech:
         self.stream = self.audio.open(
             format=self.audio.get_format_from_width(2),
             channels=1,
-            rate=24000,
+            rate=self.output_rate,
             output=True,
+            output_device_index=self.output_device_index,
         )
         self.playing.set()
         self.player_thread = threading.Thread(target=self._play_audio)
@@ -79,7 +102,20 @@ class TextToSpeech:
         response = self.client.synthesize_speech(
             input=synthesis_input, voice=self.voice, audio_config=self.audio_config
         )
-        self.audio_queue.put(response.audio_content)
+        audio = response.audio_content
+        if self.resampler is not None:
+            audio = self._resample(audio)
+        self.audio_queue.put(audio)
+
+    def _resample(self, audio: bytes) -> bytes:
+        """Converts synthesized LINEAR16 audio to the output device rate."""
+        if audio[:4] == b"RIFF":
+            with wave.open(io.BytesIO(audio), "rb") as wav:
+                audio = wav.readframes(wav.getnframes())
+        pcm = np.frombuffer(audio, dtype=np.int16)
+        return np.concatenate(
+            (self.resampler.process(pcm), self.resampler.flush())
+        ).tobytes()
 
     def wait(self):
         """Blocks until the audio queue is empty."""
@@ -0,0 +1,217 @@
+import queue
+import threading
+import time
+from typing import Dict, Union
+from vosk import KaldiRecognizer, Model
+from google_cloud_speech_lib import RecognitionResult, SpeechRecognizer
+from speech_to_text_lib import parse_vosk_result
+from vosk_model_lib import vosk_models
+
+
+# Seconds by which a late Google final may end after the Vosk final already
+# yielded for the same utterance.
+END_TIME_TOLERANCE = 1.0
+
+
+class HybridRecognizer(SpeechRecognizer):
+    """A `SpeechRecognizer` that also recognizes the same audio locally with Vosk.
+
+    Every chunk sent to Google is also fed to a Vosk recognizer on its own
+    thread. Interim results come from Vosk, without a network round trip;
+    finals come from Google. When Vosk finalizes an utterance, Google has
+    `latency_budget` seconds to deliver its final, after which the Vosk final
+    is yielded instead and the late Google final for the same audio is
+    dropped. A Vosk final whose audio starts before the end of a Google
+    final already yielded covers the same utterance and is dropped too.
+    If the cloud stream fails, the turn is finished with Vosk results.
+    `last_final` reports the source of each final and how long it came after
+    the Vosk final; `fallbacks` counts the Vosk finals used.
+    """
+
+    def __init__(
+        self,
+        model: Union[str, Model] = "model",
+        latency_budget: float = 0.5,
+        **kwargs,
+    ):
+        """Initializes the recognizer.
+
+        Args:
+            model (Union[str, Model]): Directory or name of the Vosk model,
+                loaded once per process, or an already loaded model
+            latency_budget (float): Seconds to wait for the Google final after
+                the Vosk final before using the Vosk one
+            **kwargs: Arguments of `SpeechRecognizer`
+        """
+        super().__init__(**kwargs)
+        self.model = vosk_models.get(model)
+        self.latency_budget = latency_budget
+        self.fallbacks = 0
+        self.last_final: Dict[str, Union[str, float]] | None = None
+        self._local_audio: queue.Queue | None = None
+        self._local_stop = threading.Event()
+
+    def _audio_generator(self):
+        """The audio chunks sent to Google, also passed on to Vosk."""
+        local_audio, local_stop = self._local_audio, self._local_stop
+        audio = super()._audio_generator()
+        try:
+            for content in audio:
+                local_audio.put(content)
+                yield content
+        finally:
+            # If the cloud stream ended early, e.g. on an error, Vosk goes on
+            # listening until the turn ends.
+            try:
+                for content in audio:
+                    if local_stop.is_set():
+                        break
+                    local_audio.put(content)
+            finally:
+                local_audio.put(None)
+
+    def _recognize_locally(self, audio: queue.Queue, events: queue.Queue) -> None:
+        """
+        Run Vosk on the audio of one turn, posting its results to `events`.
+
+        Finals are posted as "local_final" with the time their utterance
+        started, i.e. where the previous Vosk final ended.
+        """
+        try:
+            recognizer = KaldiRecognizer(self.model, self.rate)
+            samples = 0
+            start_time = 0.0
+            last_partial = ""
+            while True:
+                content = audio.get()
+                if content is None:
+                    break
+                samples += len(content) // 2
+                end_time = samples / self.rate
+                if recognizer.AcceptWaveform(content):
+                    text = parse_vosk_result(recognizer.Result(), "text")
+                    last_partial = ""
+                    if text:
+                        result = RecognitionResult(text, True, end_time=end_time)
+                        events.put(("local_final", (result, start_time)))
+                    start_time = end_time
+                    continue
+                raw = recognizer.PartialResult()
+                if raw == last_partial:
+                    continue
+                last_partial = raw
+                partial = parse_vosk_result(raw, "partial")
+                if partial:
+                    events.put(("local", RecognitionResult(partial, False, end_time=end_time)))
+            text = parse_vosk_result(recognizer.FinalResult(), "text")
+            if text:
+                result = RecognitionResult(text, True, end_time=samples / self.rate)
+                events.put(("local_final", (result, start_time)))
+        except Exception as e:
+            print(f"Error in local speech recognition: {e}")
+        finally:
+            events.put(("local_done", None))
+
+    def _recognize_in_cloud(self, events: queue.Queue) -> None:
+        """Run the Google streams of one turn, posting their results to `events`."""
+        try:
+            for result in super().recognize_stream():
+                events.put(("cloud", result))
+        except Exception as e:
+            events.put(("cloud_done", e))
+        else:
+            events.put(("cloud_done", None))
+
+    def _use_local(self, result: RecognitionResult, since: float) -> RecognitionResult:
+        """Record a Vosk final used in place of the Google one."""
+        self.fallbacks += 1
+        self.last_final = {"source": "local", "after_local_final": time.monotonic() - since}
+        return result
+
+    def recognize_stream(self):
+        """
+        Recognizes speech with Vosk and Google and yields transcripts.
+        Yields:
+            RecognitionResult: Vosk interim results and, per utterance, the
+                Google final or, past the latency budget, the Vosk final.
+                Unpacks as a (transcript, is_final) tuple.
+        """
+        events: queue.Queue = queue.Queue()
+        self._local_audio = queue.Queue()
+        self._local_stop = threading.Event()
+        threading.Thread(
+            target=self._recognize_locally,
+            args=(self._local_audio, events),
+            daemon=True,
+        ).start()
+        threading.Thread(target=self._recognize_in_cloud, args=(events,), daemon=True).start()
+
+        pending: RecognitionResult | None = None
+        pending_start = pending_time = 0.0
+        cloud_end = 0.0
+        local_end = -END_TIME_TOLERANCE
+        cloud_error: Exception | None = None
+        cloud_running = local_running = True
+        finals = 0
+        try:
+            while cloud_running or local_running:
+                timeout = None
+                if pending is not None and cloud_running:
+                    timeout = max(0.0, pending_time + self.latency_budget - time.monotonic())
+                try:
+                    kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    kind, payload = "budget", None
+
+                if kind == "cloud":
+                    if not payload.is_final:
+                        # Interim results come from Vosk.
+                        continue
+                    if payload.end_time <= local_end + END_TIME_TOLERANCE:
+                        # Already reported from Vosk.
+                        continue
+                    waited = 0.0
+                    if pending is not None and pending_start < payload.end_time:
+                        # Google finalized the utterance Vosk is waiting on.
+                        waited = time.monotonic() - pending_time
+                        pending = None
+                    cloud_end = payload.end_time
+                    self.last_final = {"source": "cloud", "after_local_final": waited}
+                    finals += 1
+                    yield payload
+                    continue
+
+                if kind == "local":
+                    yield payload
+                    continue
+
+                if kind == "local_final":
+                    result, start = payload
+                    if start < cloud_end:
+                        # Its audio overlaps a Google final already yielded.
+                        continue
+                    if pending is not None:
+                        # Vosk has moved on to the next utterance.
+                        local_end = pending.end_time
+                        finals += 1
+                        yield self._use_local(pending, pending_time)
+                    pending, pending_start, pending_time = result, start, time.monotonic()
+                elif kind == "cloud_done":
+                    cloud_running = False
+                    cloud_error = payload
+                    if payload is not None:
+                        print(f"Cloud speech recognition failed, using Vosk: {payload}")
+                elif kind == "local_done":
+                    local_running = False
+
+                if pending is not None and (kind == "budget" or not cloud_running):
+                    local_end = pending.end_time
+                    finals += 1
+                    result, pending = pending, None
+                    yield self._use_local(result, pending_time)
+        finally:
+            self._local_stop.set()
+            self.cancel()
+
+        if cloud_error is not None and not finals:
+            raise cloud_error
@@ -0,0 +1,176 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+import time as time_lib
+
+
+class AdaptiveLatencyController:
+    """Finds the lowest stable latency and blocksize for an input stream.
+
+    The audio callback reports every block through `record`, which only
+    updates a few counters. A background thread evaluates them once per
+    `interval`:
+
+    - An overflow or underflow doubles the latency, and marks the old value
+      as unstable so the controller never goes back to it.
+    - If the callback uses more than half of a block's duration, the
+      blocksize doubles, and the old value is marked as unstable.
+    - After `settle_time` seconds without errors, with the callback using
+      less than a quarter of a block, the latency drops by a quarter and the
+      blocksize halves, moving towards the lowest setting that stays clean
+      without returning to one marked as unstable.
+
+    Changes are applied by the owner's `restart` function, which reopens the
+    stream. Settings that held for `settle_time` seconds without errors are
+    remembered per device, so reopening a stream starts from the last known
+    good values.
+    """
+
+    # Last stable (latency, blocksize) per device, shared by all controllers.
+    stable_settings: Dict[str, Tuple[float, int]] = {}
+
+    def __init__(
+        self,
+        restart: Callable[[float, int], None],
+        sample_rate: int,
+        latency: float = 0.1,
+        blocksize: int = 512,
+        device_key: Optional[str] = None,
+        min_latency: float = 0.01,
+        max_latency: float = 1.0,
+        block_multiple: int = 1,
+        max_blocksize: int = 16384,
+        interval: float = 1.0,
+        settle_time: float = 30.0,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            restart (Callable[[float, int], None]): Reopens the stream with a new
+                latency (seconds) and blocksize (frames)
+            sample_rate (int): Stream sample rate in Hz
+            latency (float): Initial latency in seconds
+            blocksize (int): Initial blocksize in frames
+            device_key (str, optional): Key under which stable settings are
+                remembered, e.g. the device name
+            min_latency (float): Lowest latency to try
+            max_latency (float): Highest latency to use
+            block_multiple (int): Blocksizes are kept a multiple of this, e.g.
+                Porcupine's frame length
+            max_blocksize (int): Largest blocksize to use
+            interval (float): Seconds between evaluations
+            settle_time (float): Error-free seconds before lowering latency
+        """
+        self.restart = restart
+        self.sample_rate = sample_rate
+        self.device_key = device_key
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+        self.block_multiple = block_multiple
+        self.max_blocksize = max_blocksize
+        self.interval = interval
+        self.settle_time = settle_time
+
+        latency, blocksize = self.stable_settings.get(device_key, (latency, blocksize))
+        self.latency = latency
+        self.blocksize = blocksize
+        self.unstable_latency = 0.0
+        self.unstable_blocksize = 0
+
+        self.overflows = 0
+        self.underflows = 0
+        self.blocks = 0
+        self.max_callback_time = 0.0
+        # Input overflows and underflows over the controller's lifetime.
+        self.total_overflows = 0
+        self.total_underflows = 0
+        self.adjustments = 0
+        self.last_error_time = time_lib.monotonic()
+        # When the current latency and blocksize were applied.
+        self.settings_time = self.last_error_time
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(self, status, callback_time: float) -> None:
+        """
+        Account for one audio callback. Cheap enough for the audio thread.
+
+        Args:
+            status: The callback's `sounddevice.CallbackFlags`
+            callback_time (float): Seconds the callback took to run
+        """
+        self.blocks += 1
+        if callback_time > self.max_callback_time:
+            self.max_callback_time = callback_time
+        if status:
+            if status.input_overflow:
+                self.overflows += 1
+            if status.input_underflow:
+                self.underflows += 1
+
+    def evaluate(self) -> None:
+        """Adjust latency and blocksize from the statistics since the last call."""
+        if self.blocks == 0:
+            return
+        errors = self.overflows + self.underflows
+        load = self.max_callback_time * self.sample_rate / self.blocksize
+        self.total_overflows += self.overflows
+        self.total_underflows += self.underflows
+        self.overflows = self.underflows = self.blocks = 0
+        self.max_callback_time = 0.0
+
+        now = time_lib.monotonic()
+        latency, blocksize = self.latency, self.blocksize
+        if errors:
+            self.last_error_time = now
+            self.unstable_latency = max(self.unstable_latency, latency)
+            latency = min(latency * 2, self.max_latency)
+        if load > 0.5:
+            self.unstable_blocksize = max(self.unstable_blocksize, blocksize)
+            blocksize = min(blocksize * 2, self.max_blocksize)
+        elif not errors:
+            settled = now - max(self.last_error_time, self.settings_time)
+            if self.device_key is not None and settled >= self.settle_time:
+                self.stable_settings[self.device_key] = (latency, blocksize)
+            if now - self.last_error_time >= self.settle_time and load < 0.25:
+                lower = max(latency * 0.75, self.min_latency)
+                if lower > self.unstable_latency:
+                    latency = lower
+                if blocksize // 2 > self.unstable_blocksize:
+                    blocksize = max(blocksize // 2, self.block_multiple)
+                self.last_error_time = now
+
+        blocksize -= blocksize % self.block_multiple
+        if (latency, blocksize) != (self.latency, self.blocksize):
+            print(
+                f"Adjusting audio stream: latency {self.latency:.3f}s -> {latency:.3f}s, "
+                f"blocksize {self.blocksize} -> {blocksize}"
+            )
+            self.latency, self.blocksize = latency, blocksize
+            self.settings_time = now
+            self.adjustments += 1
+            try:
+                self.restart(latency, blocksize)
+            except Exception as e:
+                print(f"Error restarting audio stream: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.evaluate()
+
+    def start(self) -> None:
+        """Start evaluating in the background."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self.last_error_time = self.settings_time = time_lib.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop evaluating."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
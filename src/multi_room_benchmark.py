@@ -0,0 +1,122 @@
+"""
+Benchmark of the CPU cost of each room served by one process.
+
+Runs 1 to --rooms local pipelines side by side, each playing the same
+recording in real time through its own audio bus into a wake word detector
+and Vosk. The Porcupine keyword files and the Vosk model are loaded once
+and shared, as in the companion's multi-room mode. Cloud speech, Gemini and
+TTS are left out since their cost is mostly network time.
+
+Example usage:
+    python src/multi_room_benchmark.py --input_file recording.wav
+    python src/multi_room_benchmark.py --input_file recording.wav --rooms 4 --seconds 20
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import List
+import pvporcupine
+from dotenv import load_dotenv
+from vosk import Model
+from audio_bus_lib import AudioBus
+from audio_source_lib import FileSource
+from speech_to_text_lib import SpeechToText
+from wake_word_detector_lib import WakeWordDetector
+from vosk_model_lib import vosk_models
+
+
+def measure(
+    rooms: int,
+    input_file: str,
+    seconds: float,
+    access_key: str,
+    keyword_paths: List[str],
+    model: Model,
+) -> float:
+    """Return the process CPU seconds used per second of audio by `rooms` pipelines."""
+    buses, detectors, recognizers = [], [], []
+    for _ in range(rooms):
+        bus = AudioBus(source=FileSource(input_file, sample_rate=16000))
+        buses.append(bus)
+        detectors.append(
+            WakeWordDetector(
+                access_key=access_key,
+                keywords=["wake"],
+                keyword_paths=keyword_paths,
+                callback=lambda detected: None,
+                audio_bus=bus,
+            )
+        )
+        recognizers.append(SpeechToText(model=model, audio_bus=bus))
+
+    threads = [
+        threading.Thread(
+            target=recognizer.process_audio, args=(lambda text, partial: None,)
+        )
+        for recognizer in recognizers
+    ]
+    for detector in detectors:
+        detector.start()
+    for thread in threads:
+        thread.start()
+
+    started = time.process_time()
+    for bus in buses:
+        bus.start()
+    buses[0].wait(seconds)
+    elapsed = time.process_time() - started
+
+    for bus in buses:
+        bus.stop()
+    for detector in detectors:
+        detector.stop()
+        detector.porcupine.delete()
+    for thread in threads:
+        thread.join()
+    return elapsed / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU per room")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        required=True,
+        help="WAV or raw 16 kHz PCM file played into every room",
+    )
+    parser.add_argument("--rooms", type=int, default=3, help="Largest number of rooms")
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=10.0,
+        help="Audio length per measurement, at most the length of the file",
+    )
+    parser.add_argument("--keyword", type=str, default="bumblebee", help="Wake keyword")
+    parser.add_argument("--model", type=str, default="model", help="Vosk model name")
+    args = parser.parse_args()
+
+    load_dotenv()
+    access_key = os.getenv("PICOVOICE_ACCESS_KEY")
+    if not access_key:
+        raise ValueError("Please set the PICOVOICE_ACCESS_KEY environment variable")
+
+    seconds = min(args.seconds, FileSource(args.input_file, sample_rate=16000).duration)
+    keyword_paths = [pvporcupine.KEYWORD_PATHS[args.keyword]]
+    model = vosk_models.get(args.model)
+    print(f"Vosk model footprint: {vosk_models.footprint()}")
+
+    print(f"\nCPU per room over {seconds:.1f}s of audio:")
+    print(f"{'rooms':>6} {'CPU %':>8} {'added room %':>13}")
+    previous = 0.0
+    for rooms in range(1, args.rooms + 1):
+        load = measure(
+            rooms, args.input_file, seconds, access_key, keyword_paths, model
+        )
+        print(f"{rooms:>6} {load * 100:>8.1f} {(load - previous) * 100:>13.1f}")
+        previous = load
+
+
+if __name__ == "__main__":
+    main()
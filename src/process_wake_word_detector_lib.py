@@ -0,0 +1,318 @@
+import collections
+import multiprocessing
+import queue
+import threading
+import time as time_lib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+from shared_audio_bus_lib import SharedAudioBus
+from wake_word_detector_lib import WakeWordDetector
+
+
+def _detector_main(
+    bus_name: str,
+    bus_lock: Any,
+    access_key: str,
+    keywords: List[str],
+    sensitivities: Optional[List[float]],
+    keyword_paths: Optional[List[str]],
+    energy_gate: bool,
+    messages: Any,
+    commands: Any,
+    stop: Any,
+    stats_interval: float = 1.0,
+) -> None:
+    """Entry point of the detector process: shared ring -> Porcupine -> messages."""
+    bus = SharedAudioBus(name=bus_name, lock=bus_lock)
+    try:
+        detector = WakeWordDetector(
+            access_key=access_key,
+            keywords=keywords,
+            sensitivities=sensitivities,
+            audio_bus=bus,
+            keyword_paths=keyword_paths,
+            energy_gate=energy_gate,
+        )
+    except Exception as e:
+        messages.put(("error", str(e)))
+        return
+
+    def on_detection(keyword: str) -> None:
+        messages.put(
+            (
+                "detection",
+                keyword,
+                detector.last_detection_position,
+                time_lib.monotonic(),
+            )
+        )
+
+    reported = {"frames": 0, "skipped_frames": 0}
+
+    def report_stats() -> None:
+        # Send the energy gate counters accumulated since the last report.
+        stats = detector.stats()
+        messages.put(
+            ("stats", {key: stats[key] - reported[key] for key in reported})
+        )
+        reported.update((key, stats[key]) for key in reported)
+
+    detector.callback = on_detection
+    with detector:
+        messages.put(("ready",))
+        last_report = time_lib.monotonic()
+        try:
+            # Also exit once the capture process closed the bus.
+            while not stop.is_set() and not detector.wait(0):
+                if time_lib.monotonic() - last_report >= stats_interval:
+                    report_stats()
+                    last_report = time_lib.monotonic()
+                try:
+                    keywords, sensitivities, keyword_paths = commands.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                try:
+                    detector.reconfigure(keywords, sensitivities, keyword_paths).result()
+                    messages.put(("reconfigured", None))
+                except Exception as e:
+                    messages.put(("reconfigured", str(e)))
+        except KeyboardInterrupt:
+            pass
+    report_stats()
+
+
+class ProcessWakeWordDetector:
+    """A `WakeWordDetector` running in its own process.
+
+    Porcupine and its frame loop run in a child process that reads audio from
+    a `SharedAudioBus` and sends detections back over a queue, so detection
+    latency does not depend on the GIL in the main process. A thread in the
+    main process calls `callback` for each detection. The start/stop and
+    context manager API is the same as `WakeWordDetector`'s.
+    """
+
+    def __init__(
+        self,
+        access_key: str,
+        keywords: List[str],
+        sensitivities: Optional[List[float]] = None,
+        callback: Optional[Callable[[str], None]] = None,
+        device: Optional[Union[int, str, Dict[str, Any]]] = None,
+        latency: float = 0.1,
+        audio_bus: Optional[SharedAudioBus] = None,
+        keyword_paths: Optional[List[str]] = None,
+        energy_gate: bool = False,
+    ):
+        """
+        Initialize the detector. The child process is started by `start`.
+
+        Args:
+            access_key (str): Picovoice access key
+            keywords (List[str]): List of keywords to detect
+            sensitivities (List[float], optional): Detection sensitivity for each keyword (0-1)
+            callback (Callable[[str], None], optional): Function to call when wake word is detected
+            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
+                for the private capture process used without `audio_bus`
+            latency (float): Audio stream latency in seconds, without `audio_bus`
+            audio_bus (SharedAudioBus, optional): Shared-memory capture bus to read
+                from; by default a private one is captured from `device`
+            keyword_paths (List[str], optional): Keyword model files, one per keyword
+            energy_gate (bool): Skip Porcupine on background noise frames
+        """
+        self.access_key = access_key
+        self.keywords = keywords
+        self.sensitivities = sensitivities
+        self.keyword_paths = keyword_paths
+        self.energy_gate = energy_gate
+        self.callback = callback or (lambda x: print(f"Wake word detected: {x}"))
+        self.owns_bus = audio_bus is None
+        if self.owns_bus:
+            audio_bus = SharedAudioBus(device=device, latency=latency)
+        self.audio_bus = audio_bus
+        self.device = audio_bus.device
+        self.last_detection_position: Optional[int] = None
+        self.detection_latencies: collections.deque = collections.deque(maxlen=100)
+        # Energy gate counters, reported by the child process.
+        self.frames = 0
+        self.skipped_frames = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._messages = self._context.Queue()
+        self._commands = self._context.Queue()
+        self._pending: collections.deque = collections.deque()
+        self._stop_event = self._context.Event()
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._listener_thread: Optional[threading.Thread] = None
+
+    def _wait_ready(self) -> None:
+        """Wait for the child to create Porcupine; raise if it fails."""
+        while True:
+            try:
+                message = self._messages.get(timeout=0.1)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError(
+                        f"Wake word process exited with code {self._process.exitcode}"
+                    )
+                continue
+            if message[0] == "ready":
+                return
+            if message[0] == "error":
+                raise RuntimeError(
+                    f"Failed to initialize wake word detector: {message[1]}"
+                )
+
+    def _listen(self) -> None:
+        """Call the user callback for detections sent by the child."""
+        while True:
+            message = self._messages.get()
+            if message is None:
+                break
+            if message[0] == "reconfigured":
+                future = self._pending.popleft()
+                if message[1] is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(RuntimeError(message[1]))
+                continue
+            if message[0] == "stats":
+                self.frames += message[1]["frames"]
+                self.skipped_frames += message[1]["skipped_frames"]
+                continue
+            if message[0] != "detection":
+                continue
+            _, keyword, position, detected = message
+            self.last_detection_position = position
+            self.detection_latencies.append(time_lib.monotonic() - detected)
+            try:
+                self.callback(keyword)
+            except Exception as e:
+                print(f"Error in wake word callback: {e}")
+
+    def reconfigure(
+        self,
+        keywords: List[str],
+        sensitivities: Optional[List[float]] = None,
+        keyword_paths: Optional[List[str]] = None,
+    ) -> "Future[None]":
+        """
+        Switch the running child to new keywords without pausing detection.
+
+        See `WakeWordDetector.reconfigure`. Also applies to later restarts.
+
+        Returns:
+            Future: Resolves once the child listens for the new keywords.
+        """
+        self.keywords = keywords
+        self.sensitivities = sensitivities
+        self.keyword_paths = keyword_paths
+        future: "Future[None]" = Future()
+        if self._process is None:
+            future.set_result(None)
+            return future
+        self._pending.append(future)
+        self._commands.put((keywords, sensitivities, keyword_paths))
+        return future
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Detection statistics.
+
+        Returns:
+            dict: Frames seen and skipped by the energy gate, as last reported
+            by the child process (about once a second, and when it stops),
+            and the mean and maximum latency in seconds from a detection in
+            the child process to calling `callback`, over the last 100
+            detections.
+        """
+        latencies = list(self.detection_latencies)
+        return {
+            "frames": self.frames,
+            "skipped_frames": self.skipped_frames,
+            "detections": len(latencies),
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency": max(latencies, default=0.0),
+        }
+
+    def start(self):
+        """Start the detector process and wait until it is listening."""
+        self._stop_event.clear()
+        self._process = self._context.Process(
+            target=_detector_main,
+            args=(
+                self.audio_bus.name,
+                self.audio_bus.lock,
+                self.access_key,
+                self.keywords,
+                self.sensitivities,
+                self.keyword_paths,
+                self.energy_gate,
+                self._messages,
+                self._commands,
+                self._stop_event,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        try:
+            self._wait_ready()
+        except Exception:
+            self._process.join()
+            self._process = None
+            raise
+
+        self._listener_thread = threading.Thread(target=self._listen, daemon=True)
+        self._listener_thread.start()
+        if self.owns_bus:
+            self.audio_bus.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the detector process exits, e.g. after the bus closed.
+
+        Returns:
+            bool: True once the process has exited, False on timeout.
+        """
+        if self._process is None:
+            return True
+        self._process.join(timeout)
+        return not self._process.is_alive()
+
+    def stop(self):
+        """Stop listening for wake words."""
+        self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+        if self._listener_thread is not None:
+            self._messages.put(None)
+            self._listener_thread.join()
+            self._listener_thread = None
+        while self._pending:
+            self._pending.popleft().set_exception(
+                RuntimeError("Wake word detector stopped before reconfiguring")
+            )
+        if self.owns_bus:
+            self.audio_bus.stop()
+
+    def close(self):
+        """
+        Stop listening and free the private capture bus, if any, and the
+        queues to the child; the detector cannot be restarted.
+        """
+        self.stop()
+        if self.owns_bus:
+            self.audio_bus.close()
+        self._messages.close()
+        self._commands.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        self.close()
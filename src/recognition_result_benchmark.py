@@ -0,0 +1,136 @@
+"""
+Benchmark of converting streaming recognition responses.
+
+Builds synthetic `StreamingRecognizeResponse` messages like those of a
+turn: interim results with a growing transcript, then a final result with
+word timings. Compares, per response:
+    - tuple: the old (transcript, is_final) extraction through proto-plus
+    - proto-plus: a `RecognitionResult` filled through the proto-plus wrappers
+    - record: `RecognitionResult.from_response`, reading the raw protobuf
+Reports the time and the memory allocated per response, as traced by
+tracemalloc.
+
+Example usage:
+    python src/recognition_result_benchmark.py
+    python src/recognition_result_benchmark.py --responses 20000 --words 30
+"""
+
+import argparse
+import datetime
+import time
+import tracemalloc
+from typing import List
+from google.cloud import speech
+from google_cloud_speech_lib import RecognitionResult
+
+
+def make_responses(count: int, words: int) -> List[speech.StreamingRecognizeResponse]:
+    """Interim responses growing word by word, every `words`-th one final."""
+    vocabulary = ["turn", "on", "the", "kitchen", "lights", "please"]
+    responses = []
+    for i in range(count):
+        length = i % words + 1
+        transcript = " ".join(vocabulary[j % len(vocabulary)] for j in range(length))
+        is_final = length == words
+        alternative = speech.SpeechRecognitionAlternative(
+            transcript=transcript, confidence=0.9 if is_final else 0.0
+        )
+        if is_final:
+            alternative.words = [
+                speech.WordInfo(
+                    word=vocabulary[j % len(vocabulary)],
+                    start_time=datetime.timedelta(seconds=j * 0.3),
+                    end_time=datetime.timedelta(seconds=j * 0.3 + 0.25),
+                )
+                for j in range(length)
+            ]
+        responses.append(
+            speech.StreamingRecognizeResponse(
+                results=[
+                    speech.StreamingRecognitionResult(
+                        alternatives=[alternative],
+                        is_final=is_final,
+                        stability=0.0 if is_final else 0.8,
+                        result_end_time=datetime.timedelta(seconds=length * 0.3),
+                    )
+                ]
+            )
+        )
+    return responses
+
+
+def convert_tuple(response):
+    """The extraction before result records."""
+    if not response.results:
+        return None
+    result = response.results[0]
+    if not result.alternatives:
+        return None
+    return result.alternatives[0].transcript, result.is_final
+
+
+def convert_proto_plus(response):
+    """A result record filled field by field through proto-plus."""
+    if not response.results:
+        return None
+    result = response.results[0]
+    if not result.alternatives:
+        return None
+    alternative = result.alternatives[0]
+    return RecognitionResult(
+        alternative.transcript,
+        result.is_final,
+        result.stability,
+        alternative.confidence,
+        result.result_end_time.total_seconds(),
+        tuple(
+            (word.word, word.start_time.total_seconds(), word.end_time.total_seconds())
+            for word in alternative.words
+        ),
+    )
+
+
+def measure(convert, responses) -> tuple:
+    """Return (microseconds, bytes allocated) per response."""
+    started = time.perf_counter()
+    for response in responses:
+        convert(response)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    allocated = 0
+    for response in responses:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        convert(response)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed / len(responses) * 1e6, allocated / len(responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark conversion of streaming recognition responses"
+    )
+    parser.add_argument(
+        "--responses", type=int, default=5000, help="Number of responses to convert"
+    )
+    parser.add_argument(
+        "--words", type=int, default=12, help="Words per utterance, one response each"
+    )
+    args = parser.parse_args()
+
+    responses = make_responses(args.responses, args.words)
+    print(f"\n{args.responses} responses, utterances of {args.words} words:")
+    print(f"{'path':>12} {'us/response':>12} {'bytes/response':>15}")
+    for name, convert in (
+        ("tuple", convert_tuple),
+        ("proto-plus", convert_proto_plus),
+        ("record", RecognitionResult.from_response),
+    ):
+        micros, allocated = measure(convert, responses)
+        print(f"{name:>12} {micros:>12.2f} {allocated:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark of the in-process polyphase resampler.
+
+Measures the cost of `Resampler` on synthetic audio for the rate conversions
+used by the companion. With --device it also captures from a real microphone
+twice: once at 16 kHz, leaving any conversion to PortAudio/ALSA (the implicit
+path), and once at the device's native rate with in-process resampling.
+
+Example usage:
+    python src/resampler_benchmark.py
+    python src/resampler_benchmark.py --device 1 --seconds 10
+"""
+
+import argparse
+import time
+import numpy as np
+import sounddevice as sd
+from audio_device_lib import device_registry
+from resampler_lib import Resampler
+
+
+CONVERSIONS = [
+    (48000, 16000),  # USB microphone to Porcupine, Vosk and Google STT
+    (44100, 16000),
+    (24000, 48000),  # Google TTS to USB speaker
+    (24000, 44100),
+]
+
+
+def benchmark_offline(seconds: float, block_ms: int) -> None:
+    """Time the resampler on white noise for each conversion."""
+    rng = np.random.default_rng(0)
+    print(f"\nOffline resampling of {seconds:.0f}s of noise in {block_ms} ms blocks:")
+    print(f"{'conversion':>16} {'us/block':>10} {'x real time':>12} {'CPU %':>7}")
+    for input_rate, output_rate in CONVERSIONS:
+        resampler = Resampler(input_rate, output_rate)
+        pcm = rng.integers(-8000, 8000, int(seconds * input_rate), dtype=np.int16)
+        block = input_rate * block_ms // 1000
+        blocks = [pcm[i : i + block] for i in range(0, len(pcm), block)]
+
+        started = time.perf_counter()
+        for chunk in blocks:
+            resampler.process(chunk)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{input_rate:>7} -> {output_rate:<6} "
+            f"{elapsed / len(blocks) * 1e6:>10.1f} "
+            f"{seconds / elapsed:>12.0f} "
+            f"{elapsed / seconds * 100:>7.2f}"
+        )
+
+
+def benchmark_capture(device: int, seconds: float) -> None:
+    """Compare process CPU time of implicit and in-process resampling on a device."""
+    native_rate = int(device_registry.get(device).default_samplerate)
+    target_rate = 16000
+    print(f"\nCapturing {seconds:.0f}s from device {device} (native {native_rate} Hz):")
+
+    def measure(rate: int, resampler: Resampler | None) -> float:
+        def callback(indata, frames, time_info, status):
+            pcm = indata[:, 0]
+            if resampler is not None:
+                resampler.process(pcm)
+            else:
+                pcm.copy()
+
+        blocksize = 512 * rate // target_rate
+        with sd.InputStream(
+            samplerate=rate,
+            device=device,
+            channels=1,
+            dtype=np.int16,
+            blocksize=blocksize,
+            callback=callback,
+        ):
+            started = time.process_time()
+            time.sleep(seconds)
+            return time.process_time() - started
+
+    implicit = measure(target_rate, None)
+    explicit = measure(native_rate, Resampler(native_rate, target_rate))
+    print(f"  implicit ({target_rate} Hz stream):         {implicit / seconds * 1000:.2f} ms CPU/s")
+    print(f"  in-process ({native_rate} Hz + Resampler): {explicit / seconds * 1000:.2f} ms CPU/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the polyphase resampler")
+    parser.add_argument(
+        "--seconds", type=float, default=10.0, help="Audio length per measurement"
+    )
+    parser.add_argument(
+        "--block_ms", type=int, default=32, help="Block length for offline runs"
+    )
+    parser.add_argument(
+        "--device", type=int, help="Input device to compare capture paths on"
+    )
+    args = parser.parse_args()
+
+    benchmark_offline(args.seconds, args.block_ms)
+    if args.device is not None:
+        benchmark_capture(args.device, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import math
+import numpy as np
+
+
+class Resampler:
+    """Streaming polyphase resampler for mono int16 audio.
+
+    Converts between any two integer sample rates by the rational factor
+    `output_rate / input_rate`. The windowed-sinc prototype filter is split
+    into one short filter per output phase, and each block is filtered with
+    a single vectorized gather and multiply-accumulate. Filter state carries
+    over between calls, so blocks of any size can be fed in as they arrive.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, zero_crossings: int = 16):
+        """
+        Initialize the resampler.
+
+        Args:
+            input_rate (int): Sample rate of the audio passed to `process` in Hz
+            output_rate (int): Sample rate of the returned audio in Hz
+            zero_crossings (int): Sinc zero crossings on each side of the
+                prototype filter; higher is sharper and more expensive
+        """
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+
+        divisor = math.gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        # Prototype low-pass filter at the upsampled rate, cut off below the
+        # Nyquist frequency of the lower of the two rates.
+        ratio = max(self.up, self.down)
+        self.taps = int(math.ceil(2 * zero_crossings * ratio / self.up))
+        length = self.taps * self.up
+        cutoff = 0.5 / ratio * 0.95
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+        prototype *= self.up / prototype.sum()
+
+        # phases[p, j] weights input sample `base - (taps - 1 - j)` for output
+        # phase p, so each output is a dot product with a contiguous window.
+        self.phases = (
+            prototype.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32).copy()
+        )
+        self.reset()
+
+    @property
+    def delay(self) -> float:
+        """Group delay introduced by the filter, in seconds."""
+        return (self.taps * self.up - 1) / 2 / (self.input_rate * self.up)
+
+    def reset(self) -> None:
+        """Forget all buffered input, e.g. after a gap in the stream."""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._offset = 0
+
+    def flush(self) -> np.ndarray:
+        """Return the output still held back by the filter delay and reset."""
+        tail = self.process(np.zeros(self.taps, dtype=np.int16))
+        self.reset()
+        return tail
+
+    def output_length(self, input_length: int) -> int:
+        """Number of samples the next `process` call returns for `input_length` inputs."""
+        return max(0, (self.up * input_length - 1 - self._offset) // self.down + 1)
+
+    def process(self, pcm: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of the stream.
+
+        Args:
+            pcm (np.ndarray): int16 samples at `input_rate`
+
+        Returns:
+            np.ndarray: int16 samples at `output_rate`
+        """
+        if self.up == self.down:
+            return pcm
+
+        count = self.output_length(len(pcm))
+        buffer = np.concatenate((self._history, pcm.astype(np.float32)))
+        self._history = buffer[len(buffer) - (self.taps - 1) :]
+        if count == 0:
+            self._offset -= self.up * len(pcm)
+            return np.zeros(0, dtype=np.int16)
+
+        positions = self._offset + self.down * np.arange(count)
+        bases, phase = np.divmod(positions, self.up)
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)
+        out = np.einsum("ij,ij->i", windows[bases], self.phases[phase])
+        self._offset += self.down * count - self.up * len(pcm)
+
+        np.rint(out, out=out)
+        np.clip(out, -32768, 32767, out=out)
+        return out.astype(np.int16)
@@ -0,0 +1,290 @@
+import contextlib
+import multiprocessing
+import time as time_lib
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+from typing import Any, Dict, Optional, Tuple, Union
+from audio_bus_lib import AudioBus, AudioBusReader, write_ring
+from audio_device_lib import device_registry
+from audio_source_lib import MicrophoneSource
+from resampler_lib import Resampler
+
+
+# The shared block starts with five int64 fields: the write position, a
+# closed flag, the capacity, the sample rate and the `time.monotonic_ns()` of
+# the latest write. The int16 ring buffer follows.
+# The capture process stores samples in the ring before it publishes the
+# position past them, and it publishes the position while holding the bus's
+# `lock`. Readers take the same lock to load the position, so on any CPU they
+# see the samples below it. Without the lock, the order of stores would only
+# be visible to other processes on CPUs that keep stores in order, e.g. x86,
+# and not on ARM.
+HEADER_FIELDS = 5
+HEADER_SIZE = HEADER_FIELDS * 8
+POSITION, CLOSED, CAPACITY, SAMPLE_RATE, WRITE_TIME = range(HEADER_FIELDS)
+
+
+def _map_ring(shm: shared_memory.SharedMemory) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the header and ring buffer arrays backed by a shared memory block."""
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+    ring = np.ndarray(
+        (int(header[CAPACITY]),), dtype=np.int16, buffer=shm.buf, offset=HEADER_SIZE
+    )
+    return header, ring
+
+
+def _release(shm: shared_memory.SharedMemory, unlink: bool = True) -> None:
+    if unlink:
+        shm.unlink()
+    try:
+        shm.close()
+    except BufferError:
+        # Readers still hold views; the mapping goes away with the process.
+        pass
+
+
+def _capture_main(
+    name: str,
+    device: int,
+    sample_rate: int,
+    capture_rate: int,
+    blocksize: int,
+    latency: float,
+    adaptive_latency: bool,
+    lock: Any,
+    ready: Any,
+    stop: Any,
+) -> None:
+    """Entry point of the capture process: microphone -> resampler -> shared ring."""
+    shm = shared_memory.SharedMemory(name=name)
+    header, ring = _map_ring(shm)
+    try:
+        source = MicrophoneSource(
+            device=device,
+            sample_rate=capture_rate,
+            blocksize=blocksize * capture_rate // sample_rate,
+            latency=latency,
+            adaptive_latency=adaptive_latency,
+        )
+        resampler = (
+            Resampler(capture_rate, sample_rate) if capture_rate != sample_rate else None
+        )
+
+        def write(pcm: np.ndarray) -> None:
+            if resampler is not None:
+                pcm = resampler.process(pcm)
+            if len(pcm):
+                # Samples are stored before the position moves past them.
+                position = write_ring(ring, int(header[POSITION]), pcm)
+                now = time_lib.monotonic_ns()
+                with lock:
+                    header[POSITION] = position
+                    header[WRITE_TIME] = now
+
+        source.start(write)
+        ready.set()
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+        source.stop()
+    finally:
+        with lock:
+            header[CLOSED] = 1
+
+
+class SharedAudioBus(AudioBus):
+    """An `AudioBus` whose ring buffer is filled by a separate capture process.
+
+    The PortAudio callback and the resampler run in a child process that
+    writes into a `multiprocessing.shared_memory` ring buffer, so capture
+    timing does not depend on the GIL in the main process, where streaming
+    recognition, Gemini and TTS run. Readers work exactly as with `AudioBus`
+    and get views straight into shared memory; since the writer cannot wake
+    them across processes, a waiting reader sleeps until enough audio should
+    have arrived and checks again.
+
+    Other processes can read the same ring by creating a `SharedAudioBus`
+    with the `name` and `lock` of this one.
+    """
+
+    def __init__(
+        self,
+        device: Optional[Union[int, str, Dict[str, Any]]] = None,
+        sample_rate: int = 16000,
+        blocksize: int = 512,
+        latency: float = 0.1,
+        capacity: float = 10.0,
+        capture_rate: Optional[int] = None,
+        adaptive_latency: bool = False,
+        poll_interval: float = 0.005,
+        name: Optional[str] = None,
+        lock: Optional[Any] = None,
+    ):
+        """
+        Initialize the shared audio bus.
+
+        Args:
+            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
+            sample_rate (int): Sample rate delivered to readers in Hz
+            blocksize (int): Frames per capture callback, at `sample_rate`
+            latency (float): Audio stream latency in seconds
+            capacity (float): Length of the shared ring buffer in seconds
+            capture_rate (int, optional): Rate to open the microphone at, usually
+                the device's native rate; resampled in the capture process
+            adaptive_latency (bool): Let the microphone tune its latency and
+                blocksize from overflow statistics
+            poll_interval (float): Shortest time a waiting reader sleeps, in seconds
+            name (str, optional): Attach to the ring of a bus created by another
+                process instead of creating one. The attached bus can only be
+                read; sample rate and capacity come from the ring itself.
+            lock (multiprocessing.Lock, optional): The `lock` of the bus to
+                attach to, which orders the position after the samples it
+                covers; see the comment on the header layout
+        """
+        self._context = multiprocessing.get_context("spawn")
+        self.source = None
+        self.capture_rate = capture_rate or sample_rate
+        self.blocksize = blocksize
+        self.latency = latency
+        self.adaptive_latency = adaptive_latency
+        self.resampler = None
+        self.lossless = False
+        self.poll_interval = poll_interval
+        self.attached = name is not None
+
+        if self.attached:
+            self.device = device
+            self.lock = lock if lock is not None else contextlib.nullcontext()
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._header, self._buffer = _map_ring(self._shm)
+            self._release = weakref.finalize(self, _release, self._shm, False)
+        else:
+            self.device = device_registry.resolve_input(device)
+            self.lock = self._context.Lock()
+            capacity_samples = int(capacity * sample_rate)
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=HEADER_SIZE + capacity_samples * 2
+            )
+            header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+            header[:] = (0, 0, capacity_samples, sample_rate, 0)
+            del header
+            self._header, self._buffer = _map_ring(self._shm)
+            self._release = weakref.finalize(self, _release, self._shm)
+        self.capacity = int(self._header[CAPACITY])
+        self.sample_rate = int(self._header[SAMPLE_RATE])
+
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._stop_event = self._context.Event()
+        self._init_readers()
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block holding the ring buffer."""
+        return self._shm.name
+
+    @property
+    def position(self) -> int:
+        """Total number of samples written by the capture process."""
+        with self.lock:
+            return int(self._header[POSITION])
+
+    @property
+    def closed(self) -> bool:
+        """Whether the bus has been stopped or the capture process has exited."""
+        if self._closed:
+            return True
+        with self.lock:
+            return bool(self._header[CLOSED])
+
+    def capture_time(self, position: int) -> Optional[float]:
+        """See `AudioBus.capture_time`; the monotonic clock is shared by all processes."""
+        with self.lock:
+            written, write_time = int(self._header[POSITION]), int(self._header[WRITE_TIME])
+        if not write_time:
+            return None
+        return write_time / 1e9 - (written - position) / self.sample_rate
+
+    def write(self, pcm: np.ndarray) -> None:
+        raise RuntimeError("A shared audio bus is only written by its capture process")
+
+    def _wait_readable(
+        self,
+        reader: AudioBusReader,
+        frames: int,
+        timeout: Optional[float],
+        partial: bool = False,
+    ) -> Optional[int]:
+        """
+        Poll until `frames` samples are past the reader's cursor; returns the bus position.
+
+        With `partial`, a closed bus with fewer samples left also returns.
+        """
+        deadline = None if timeout is None else time_lib.monotonic() + timeout
+        while not reader.closed:
+            position = self.position
+            missing = frames - (position - reader.cursor)
+            if missing <= 0:
+                return position
+            if self.closed:
+                return position if partial and position > reader.cursor else None
+            delay = max(missing / self.sample_rate, self.poll_interval)
+            if deadline is not None:
+                remaining = deadline - time_lib.monotonic()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            time_lib.sleep(delay)
+        return None
+
+    def start(self):
+        """Start the capture process and wait until the microphone is open."""
+        if self.attached:
+            raise RuntimeError("An attached shared audio bus cannot start capturing")
+        self._closed = False
+        self._running = True
+        self._ended.clear()
+        self._header[CLOSED] = 0
+        self._stop_event.clear()
+        ready = self._context.Event()
+        self._process = self._context.Process(
+            target=_capture_main,
+            args=(
+                self.name,
+                self.device,
+                self.sample_rate,
+                self.capture_rate,
+                self.blocksize,
+                self.latency,
+                self.adaptive_latency,
+                self.lock,
+                ready,
+                self._stop_event,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        while not ready.wait(0.1):
+            if not self._process.is_alive():
+                self._running = False
+                raise RuntimeError(
+                    f"Capture process exited with code {self._process.exitcode}"
+                )
+
+    def stop(self):
+        """Stop the capture process and release any waiting readers."""
+        self._closed = True
+        self._running = False
+        self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+
+    def close(self) -> None:
+        """Stop capturing and free the shared memory block, or detach from it."""
+        self.stop()
+        self._release()
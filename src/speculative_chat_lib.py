@@ -0,0 +1,199 @@
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+import google.generativeai as genai
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase a transcript and drop punctuation and extra spaces, for comparison."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+class SpeculativeChat:
+    """Sends a spoken command to Gemini before its transcript is final.
+
+    Every interim transcript is passed to `update`. Once one has not changed
+    for `hold` seconds, it is sent ahead on a copy of the chat, so Gemini's
+    time to first token overlaps the wait for the final transcript. `send`
+    then takes the final transcript:
+
+    - If it matches the speculative request after `normalize_transcript`,
+      the copy and its in-flight response are adopted, and the copy
+      becomes `chat`.
+    - Otherwise the copy is dropped and the chat history is left as it
+      was. The final transcript is sent at once.
+
+    A newer stable transcript replaces a speculative request in the same way.
+    The stream of a dropped request is cancelled as soon as its first chunk
+    has arrived. `stats` reports hits, misses (speculative requests the final
+    transcript did not match, or that failed) and the milliseconds saved.
+    """
+
+    def __init__(self, chat: genai.ChatSession, hold: float = 0.3):
+        """Initialize the speculative chat.
+
+        Args:
+            chat (genai.ChatSession): The chat to send commands to
+            hold (float): Seconds an interim transcript must stay unchanged
+                before it is sent ahead
+        """
+        self.chat = chat
+        self.hold = hold
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini")
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._transcript = ""
+        self._text: Optional[str] = None
+        self._session: Optional[genai.ChatSession] = None
+        self._future: Optional[Future] = None
+        self._started = 0.0
+
+    @staticmethod
+    def _send(
+        session: genai.ChatSession, transcript: str
+    ) -> Tuple[genai.types.GenerateContentResponse, float]:
+        """Send a message; returns the response and when its first chunk arrived."""
+        response = session.send_message(transcript, stream=True)
+        return response, time.monotonic()
+
+    @staticmethod
+    def _drain(response: genai.types.GenerateContentResponse) -> None:
+        try:
+            response.resolve()
+        except Exception:
+            pass
+
+    @classmethod
+    def _close_response(cls, future: Future) -> None:
+        """Done callback ending the stream of a dropped speculative request."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response, _ = future.result()
+        # The response keeps the gRPC stream in `_iterator`, whose cancel()
+        # ends the call. Without one, the rest of the stream is read on a
+        # thread of its own and thrown away.
+        cancel = getattr(getattr(response, "_iterator", None), "cancel", None)
+        if cancel is not None:
+            cancel()
+        else:
+            threading.Thread(target=cls._drain, args=(response,), daemon=True).start()
+
+    def _discard(self) -> None:
+        """Drop the speculative request, if any. Called with the lock held."""
+        if self._future is not None:
+            # A request still queued is cancelled; one already sent is
+            # closed once its first chunk arrives.
+            self._future.cancel()
+            self._future.add_done_callback(self._close_response)
+        self._future = None
+        self._session = None
+        self._text = None
+
+    def _stop_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def update(self, transcript: str) -> None:
+        """Report an interim transcript; it is sent ahead once stable for `hold` seconds."""
+        with self._lock:
+            if transcript == self._transcript:
+                return
+            self._transcript = transcript
+            self._stop_timer()
+            self._timer = threading.Timer(self.hold, self._speculate, args=(transcript,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _speculate(self, transcript: str) -> None:
+        with self._lock:
+            if transcript != self._transcript:
+                return
+            text = normalize_transcript(transcript)
+            if not text or text == self._text:
+                return
+            try:
+                session = self.chat.model.start_chat(history=self.chat.history)
+            except Exception as e:
+                print(f"Could not copy the chat for a speculative request: {e}")
+                return
+            self._discard()
+            self._text = text
+            self._session = session
+            self._started = time.monotonic()
+            self._future = self._executor.submit(self._send, session, transcript)
+
+    def send(self, transcript: str) -> genai.types.GenerateContentResponse:
+        """
+        Send the final transcript, adopting the speculative request if it matches.
+
+        Args:
+            transcript (str): The final transcript of the command
+
+        Returns:
+            genai.types.GenerateContentResponse: The streaming response
+        """
+        with self._lock:
+            self._stop_timer()
+            self._transcript = ""
+            final_time = time.monotonic()
+            future, session, started = self._future, self._session, self._started
+            if future is not None and self._text == normalize_transcript(transcript):
+                self._future = None
+                self._session = None
+                self._text = None
+            else:
+                if future is not None:
+                    self.misses += 1
+                self._discard()
+                future = None
+
+        if future is not None:
+            try:
+                response, first_chunk = future.result()
+            except Exception as e:
+                print(f"Speculative request failed: {e}")
+                with self._lock:
+                    self.misses += 1
+            else:
+                with self._lock:
+                    self.hits += 1
+                    # Without speculation, the first chunk would have come
+                    # `first_chunk - started` after the final transcript.
+                    self.saved += final_time + (first_chunk - started) - max(
+                        final_time, first_chunk
+                    )
+                    self.chat = session
+                return response
+
+        return self.chat.send_message(transcript, stream=True)
+
+    def cancel(self) -> None:
+        """Drop any speculative request, e.g. when the command is not sent."""
+        with self._lock:
+            self._stop_timer()
+            self._transcript = ""
+            self._discard()
+
+    def close(self) -> None:
+        """Drop any speculative request and stop the worker threads."""
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Hits, misses, hit rate and the milliseconds saved in total and per hit."""
+        with self._lock:
+            hits, misses, saved = self.hits, self.misses, self.saved
+        requests = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / requests if requests else 0.0,
+            "saved_ms": saved * 1000,
+            "saved_ms_per_hit": saved * 1000 / hits if hits else 0.0,
+        }
@@ -0,0 +1,188 @@
+"""
+Offline benchmark of streaming recognition latency and reconnection.
+
+Starts a local `FakeSpeechServer` and streams a recording in real time
+through `SpeechRecognizer` pointed at it, once per server delay. Reports:
+    - time-to-final: from the time a final result's audio ended, per its
+      result end time, to its arrival
+    - reconnects per turn after injected stream failures
+    - turns that failed despite reconnecting
+
+Without --input_file, four seconds of low noise are streamed; the scripted
+server does not listen to the audio anyway. With --vosk_model the server
+recognizes the recording with Vosk instead. With --local_model the client is
+a `HybridRecognizer`, which uses its own Vosk final when the server's is more
+than --latency_budget late.
+
+Example usage:
+    python src/speech_latency_benchmark.py
+    python src/speech_latency_benchmark.py --delays 0.05 0.3 --jitter 0.1 --failure_rate 0.3 --runs 10
+    python src/speech_latency_benchmark.py --input_file recording.wav --vosk_model model
+    python src/speech_latency_benchmark.py --input_file recording.wav --vosk_model model \
+        --local_model model --latency_budget 0.2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import wave
+from typing import List, Tuple
+import numpy as np
+from audio_source_lib import FileSource
+from fake_speech_server_lib import FakeSpeechServer
+from google_cloud_speech_lib import SpeechRecognizer
+from hybrid_speech_lib import HybridRecognizer
+from vosk_model_lib import vosk_models
+
+
+def write_noise(path: str, seconds: float) -> None:
+    """Write a 16 kHz WAV file of low white noise."""
+    rng = np.random.default_rng(0)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(rng.integers(-300, 300, int(seconds * 16000), dtype=np.int16).tobytes())
+
+
+def run(
+    endpoint: str,
+    input_file: str,
+    endpointing: bool,
+    local_model=None,
+    latency_budget: float = 0.5,
+) -> Tuple[List[float], int, bool]:
+    """Return (time-to-final of each final result, reconnects, failed) for one turn."""
+    options = dict(
+        source=FileSource(input_file, sample_rate=16000),
+        endpoint=endpoint,
+        endpointing=endpointing,
+    )
+    recognizer = (
+        HybridRecognizer(model=local_model, latency_budget=latency_budget, **options)
+        if local_model is not None
+        else SpeechRecognizer(**options)
+    )
+    latencies: List[float] = []
+    failed = False
+    try:
+        with recognizer:
+            # The file starts playing in real time when the bus starts.
+            started = time.monotonic()
+            for result in recognizer.recognize_stream():
+                if result.is_final:
+                    latencies.append(time.monotonic() - started - result.end_time)
+    except Exception as e:
+        print(f"Turn failed: {e}")
+        failed = True
+    return latencies, recognizer.reconnects, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark streaming recognition against a local fake server"
+    )
+    parser.add_argument(
+        "--input_file", type=str, help="WAV or raw 16 kHz PCM file to stream"
+    )
+    parser.add_argument(
+        "--delays",
+        type=float,
+        nargs="+",
+        default=[0.05, 0.15, 0.3],
+        help="Server response delays to measure, in seconds",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Largest random change of the delay"
+    )
+    parser.add_argument(
+        "--failure_rate",
+        type=float,
+        default=0.0,
+        help="Share of streams the server fails with UNAVAILABLE",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Turns per delay")
+    parser.add_argument(
+        "--script",
+        type=str,
+        nargs="+",
+        default=["turn on the kitchen lights"],
+        help="Utterances the scripted server recognizes",
+    )
+    parser.add_argument(
+        "--vosk_model", type=str, help="Let the server recognize with this Vosk model"
+    )
+    parser.add_argument(
+        "--local_model",
+        type=str,
+        help="Recognize locally with this Vosk model too, as a HybridRecognizer",
+    )
+    parser.add_argument(
+        "--latency_budget",
+        type=float,
+        default=0.5,
+        help="Seconds the hybrid client waits for the server final",
+    )
+    parser.add_argument(
+        "--endpointing",
+        action="store_true",
+        help="Detect the end of speech locally instead of at the end of the file",
+    )
+    args = parser.parse_args()
+
+    model = vosk_models.get(args.vosk_model) if args.vosk_model else None
+    local_model = vosk_models.get(args.local_model) if args.local_model else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = args.input_file
+        if input_file is None:
+            input_file = os.path.join(directory, "noise.wav")
+            write_noise(input_file, 4.0)
+
+        print(
+            f"\n{args.runs} turns per delay, jitter {args.jitter * 1000:.0f} ms, "
+            f"failure rate {args.failure_rate:.0%}:"
+        )
+        print(
+            f"{'delay ms':>9} {'final ms':>9} {'p95 ms':>7} "
+            f"{'reconnects':>11} {'failed':>7}"
+        )
+        for delay in args.delays:
+            server = FakeSpeechServer(
+                script=None if model else args.script,
+                model=model,
+                delay=delay,
+                jitter=args.jitter,
+                failure_rate=args.failure_rate,
+                seed=0,
+            )
+            with server:
+                results: List[Tuple[List[float], int, bool]] = [
+                    run(
+                        server.endpoint,
+                        input_file,
+                        args.endpointing,
+                        local_model,
+                        args.latency_budget,
+                    )
+                    for _ in range(args.runs)
+                ]
+            latencies = [
+                latency * 1000
+                for result in results
+                if not result[2]
+                for latency in result[0]
+            ]
+            mean = np.mean(latencies) if latencies else float("nan")
+            p95 = np.percentile(latencies, 95) if latencies else float("nan")
+            reconnects = sum(result[1] for result in results) / len(results)
+            failed = sum(result[2] for result in results)
+            print(
+                f"{delay * 1000:>9.0f} {mean:>9.0f} {p95:>7.0f} "
+                f"{reconnects:>11.2f} {failed:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,47 @@ Speech-to-text command line interface using Vosk.
 Example usage:
     # Using the small English model:
     python src/speech_to_text_cli.py --model vosk-model-small-en-us-0.15
+
+    # Transcribing a recording as fast as possible:
+    python src/speech_to_text_cli.py --model vosk-model-small-en-us-0.15 \
+        --input_file recording.wav --flat_out
+
+    # Reporting partial results at most every 0.3 seconds:
+    python src/speech_to_text_cli.py --model vosk-model-small-en-us-0.15 --partial_interval 0.3
 """
 
 import argparse
+from audio_source_lib import FileSource
 from speech_to_text_lib import SpeechToText
 
 
 def main():
     parser = argparse.ArgumentParser(description="Real-time Speech-to-Text using Vosk")
     parser.add_argument(
-        "--model", type=str, default="model", help="Path to the Vosk model directory"
+        "--model", type=str, default="model", help="Vosk model directory or name"
     )
     parser.add_argument("--device", type=int, help="Input device index")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        help="WAV or raw 16 kHz PCM file to read instead of the microphone",
+    )
+    parser.add_argument(
+        "--flat_out",
+        action="store_true",
+        help="Process the input file as fast as possible instead of in real time",
+    )
+    parser.add_argument(
+        "--adaptive_latency",
+        action="store_true",
+        help="Tune input latency and blocksize at runtime from overflow statistics",
+    )
+    parser.add_argument(
+        "--partial_interval",
+        type=float,
+        default=0.0,
+        help="Minimum seconds between partial results",
+    )
     args = parser.parse_args()
 
     # List available audio devices
@@ -35,7 +64,18 @@ def main():
     print("#" * 80)
 
     # Initialize and start speech recognition
-    stt = SpeechToText(model=args.model, device=args.device)
+    source = None
+    if args.input_file:
+        source = FileSource(
+            args.input_file, sample_rate=16000, realtime=not args.flat_out
+        )
+    stt = SpeechToText(
+        model=args.model,
+        device=args.device,
+        source=source,
+        adaptive_latency=args.adaptive_latency,
+        partial_interval=args.partial_interval,
+    )
     stt.process_audio(text_callback=handle_text)
 
 
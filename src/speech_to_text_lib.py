@@ -1,5 +1,6 @@
 import queue
 import sys
+import threading
 import json
 import sounddevice as sd
 from sounddevice import CallbackFlags
@@ -7,39 +8,107 @@ from vosk import Model, KaldiRecognizer
 from typing import Any, Optional, Union, Dict, Callable
 import numpy as np
 import time as time_lib
+from audio_device_lib import device_registry
+from audio_bus_lib import AudioBus
+from audio_source_lib import AudioSource
+from latency_controller_lib import AdaptiveLatencyController
+from vosk_model_lib import vosk_models
+
+
+def parse_vosk_result(result: str, key: str) -> str:
+    """Return the `key` field of a Vosk JSON result such as `{"text" : "hi"}`.
+
+    Plain single-field results, the usual case, are sliced out without the
+    JSON decoder; anything else, e.g. with escapes or word timings, is
+    decoded normally.
+    """
+    prefix = f'"{key}" : "'
+    start = result.find(prefix)
+    if start != -1:
+        start += len(prefix)
+        end = result.find('"', start)
+        if (
+            end != -1
+            and result[end + 1 :].strip() == "}"
+            and "\\" not in result[start:end]
+        ):
+            return result[start:end]
+    return json.loads(result).get(key, "")
 
 
 class SpeechToText:
     def __init__(
         self,
-        model: str = "model",
+        model: Union[str, Model] = "model",
         device: Optional[Union[int, str, Dict[str, Any]]] = None,
         sample_rate: int = 16000,
         latency: float = 0.1,
+        audio_bus: Optional[AudioBus] = None,
+        source: Optional[AudioSource] = None,
+        adaptive_latency: bool = False,
+        partial_interval: float = 0.0,
     ):
         """Initialize the speech-to-text engine.
 
         Args:
-            model (str): Name of the Vosk model
+            model (Union[str, Model]): Directory or name of the Vosk model, loaded
+                once per process, or an already loaded model
             device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
             sample_rate (int): Audio sample rate in Hz
             latency (float): Audio stream latency in seconds
+            audio_bus (AudioBus, optional): Shared capture bus to read from instead
+                of opening a dedicated input stream
+            source (AudioSource, optional): Audio source, e.g. a file, to read from
+                through a private audio bus instead of a microphone
+            adaptive_latency (bool): Tune the dedicated input stream's latency and
+                blocksize at runtime from overflow statistics
+            partial_interval (float): Minimum seconds between partial results;
+                a partial held back is reported with a later block if it is
+                still the latest one
         """
         try:
-            self.model = Model(model_name=model)
-            self.sample_rate = sample_rate
-            self.device = self._get_device_id(device)
+            self.model = vosk_models.get(model)
+            self.owns_bus = source is not None and audio_bus is None
+            if self.owns_bus:
+                audio_bus = AudioBus(source=source, sample_rate=source.sample_rate)
+            self.audio_bus = audio_bus
+            self.sample_rate = audio_bus.sample_rate if audio_bus else sample_rate
+            self.device = (
+                audio_bus.device if audio_bus else device_registry.resolve_input(device)
+            )
             self.latency = latency
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
             self.q = queue.Queue()
+            self.partial_interval = partial_interval
+            self._last_partial = ""
+            self._held_partial: Optional[str] = None
+            self._partial_time = 0.0
             self.error_count = 0
             self.last_error_time = 0
             self.MAX_ERRORS = 5
             self.ERROR_RESET_TIME = 60  # seconds
+            self.blocksize = 8000
+            self.stream: Optional[sd.RawInputStream] = None
+            self._stream_lock = threading.Lock()
+            self._running = False
+            self.controller: Optional[AdaptiveLatencyController] = None
+            if adaptive_latency and audio_bus is None:
+                self.controller = AdaptiveLatencyController(
+                    self._restart,
+                    sample_rate=self.sample_rate,
+                    latency=self.latency,
+                    blocksize=self.blocksize,
+                    device_key=f"vosk:{self.device}:{self.sample_rate}",
+                )
+                self.latency = self.controller.latency
+                self.blocksize = self.controller.blocksize
 
             # Print audio device info for debugging
             print("\nSpeech Recognition Audio Configuration:")
-            print(f"Using device: {sd.query_devices(self.device)}")
+            if audio_bus is not None:
+                print("Reading from shared audio bus")
+            else:
+                print(f"Using device: {device_registry.get(self.device)}")
             print(f"Sample rate: {self.sample_rate}")
             print(f"Latency: {self.latency}s")
 
@@ -47,35 +116,23 @@ class SpeechToText:
             print(f"Error initializing speech recognition: {str(e)}")
             sys.exit(1)
 
-    def _get_device_id(
-        self, device: Optional[Union[int, str, Dict[str, Any]]] = None
-    ) -> int:
-        """Get the device ID for the audio input device."""
-        try:
-            if device is None:
-                # Try to find a working input device
-                devices = sd.query_devices()
-                for i, dev in enumerate(devices):
-                    if dev["max_input_channels"] > 0:
-                        print(f"Selected input device {i}: {dev['name']}")
-                        return i
-                raise RuntimeError("No working input device found")
-            elif isinstance(device, (int, str)):
-                return sd.query_devices(device).get("index", 0)
-            elif isinstance(device, dict):
-                return device.get("index", 0)
-            else:
-                raise ValueError(f"Invalid device specification: {device}")
-        except Exception as e:
-            print(f"Error selecting audio device: {e}")
-            print("Available devices:")
-            print(sd.query_devices())
-            raise
-
     def callback(
         self, indata: np.ndarray, frames: int, time: Any, status: CallbackFlags
     ) -> None:
         """Callback for audio stream processing"""
+        started = time_lib.perf_counter()
+
+        if not self._check_status(status):
+            try:
+                self.q.put(bytes(indata))
+            except Exception as e:
+                print(f"Error in audio callback: {e}")
+
+        if self.controller is not None:
+            self.controller.record(status, time_lib.perf_counter() - started)
+
+    def _check_status(self, status: CallbackFlags) -> bool:
+        """Report stream errors; returns True if the block should be dropped."""
         current_time = time_lib.time()
 
         if status:
@@ -89,14 +146,34 @@ class SpeechToText:
                     print(
                         "\nToo many input overflows. Try increasing latency or using a different audio device."
                     )
-                    return
+                    return True
             print(f"Audio callback status: {status}")
-            return
+            return True
+        return False
 
-        try:
-            self.q.put(bytes(indata))
-        except Exception as e:
-            print(f"Error in audio callback: {e}")
+    def _open_stream(self) -> None:
+        """Create the input stream with the current latency and blocksize."""
+        self.stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.blocksize,
+            device=self.device,
+            dtype="int16",
+            channels=1,
+            callback=self.callback,
+            latency=self.latency,
+        )
+
+    def _restart(self, latency: float, blocksize: int) -> None:
+        """Reopen the input stream with settings chosen by the latency controller."""
+        with self._stream_lock:
+            self.latency = latency
+            self.blocksize = blocksize
+            if self.stream is not None:
+                self.stream.stop()
+                self.stream.close()
+            self._open_stream()
+            if self._running:
+                self.stream.start()
 
     def process_audio(
         self, text_callback: Optional[Callable[[str, bool], None]] = None
@@ -108,56 +185,120 @@ class SpeechToText:
                 - text (str): The recognized text
                 - is_partial (bool): Whether this is a partial or final result
         """
+        if self.audio_bus is not None:
+            self._process_bus(text_callback)
+            return
+
         try:
-            with sd.RawInputStream(
-                samplerate=self.sample_rate,
-                blocksize=8000,
-                device=self.device,
-                dtype="int16",
-                channels=1,
-                callback=self.callback,
-                latency=self.latency,
-            ):
+            with self._stream_lock:
+                self._open_stream()
+                self._running = True
+                self.stream.start()
+            if self.controller is not None:
+                self.controller.start()
+
+            print("\nListening for speech...")
+            while True:
+                try:
+                    self._recognize(self.q.get(), text_callback)
+                except queue.Empty:
+                    continue
+
+        except KeyboardInterrupt:
+            print("\nStopping speech recognition.")
+        except Exception as e:
+            print(f"Error during speech recognition: {str(e)}")
+        finally:
+            if self.controller is not None:
+                self.controller.stop()
+            with self._stream_lock:
+                self._running = False
+                if self.stream is not None:
+                    self.stream.stop()
+                    self.stream.close()
+                    self.stream = None
+
+    def _process_bus(
+        self, text_callback: Optional[Callable[[str, bool], None]] = None
+    ) -> None:
+        """Transcribe audio read from the shared audio bus until it stops."""
+        try:
+            with self.audio_bus.reader() as reader:
+                if self.owns_bus:
+                    self.audio_bus.start()
                 print("\nListening for speech...")
-                while True:
-                    try:
-                        data = self.q.get()
-                        if self.recognizer.AcceptWaveform(data):
-                            result = json.loads(self.recognizer.Result())
-                            if result["text"]:
-                                if text_callback:
-                                    text_callback(result["text"], False)
-                                else:
-                                    print(f"Recognized: {result['text']}")
-                        else:
-                            partial = json.loads(self.recognizer.PartialResult())
-                            if partial["partial"]:
-                                if text_callback:
-                                    text_callback(partial["partial"], True)
-                                else:
-                                    print(f"Partial: {partial['partial']}", end="\r")
-                    except queue.Empty:
+                while not reader.closed:
+                    data = reader.read(8000, timeout=0.5, partial=True)
+                    if data is None:
+                        if self.audio_bus.closed:
+                            break
                         continue
-                    except json.JSONDecodeError as e:
-                        print(f"Error decoding recognition result: {e}")
-                    except Exception as e:
-                        print(f"Error processing recognition data: {e}")
+                    self._recognize(data.tobytes(), text_callback)
+                self._finish(text_callback)
 
         except KeyboardInterrupt:
             print("\nStopping speech recognition.")
         except Exception as e:
             print(f"Error during speech recognition: {str(e)}")
+        finally:
+            if self.owns_bus:
+                self.audio_bus.stop()
+
+    def _finish(self, text_callback: Optional[Callable[[str, bool], None]]) -> None:
+        """Report what Vosk recognized in the audio it still holds at the end of the stream."""
+        try:
+            text = parse_vosk_result(self.recognizer.FinalResult(), "text")
+        except Exception as e:
+            print(f"Error processing recognition data: {e}")
+            return
+        self._last_partial = ""
+        self._held_partial = None
+        if text:
+            if text_callback:
+                text_callback(text, False)
+            else:
+                print(f"Recognized: {text}")
+
+    def _recognize(
+        self, data: bytes, text_callback: Optional[Callable[[str, bool], None]]
+    ) -> None:
+        """Feed one block of audio to Vosk and report the result."""
+        try:
+            if self.recognizer.AcceptWaveform(data):
+                text = parse_vosk_result(self.recognizer.Result(), "text")
+                self._last_partial = ""
+                self._held_partial = None
+                if text:
+                    if text_callback:
+                        text_callback(text, False)
+                    else:
+                        print(f"Recognized: {text}")
+                return
+
+            # Only parse and report the hypothesis when it has changed.
+            raw = self.recognizer.PartialResult()
+            if raw != self._last_partial:
+                self._last_partial = raw
+                partial = parse_vosk_result(raw, "partial")
+                self._held_partial = partial or None
+            partial = self._held_partial
+            if partial is None:
+                return
+            now = time_lib.monotonic()
+            if now - self._partial_time < self.partial_interval:
+                return
+            self._held_partial = None
+            self._partial_time = now
+            if text_callback:
+                text_callback(partial, True)
+            else:
+                print(f"Partial: {partial}", end="\r")
+        except json.JSONDecodeError as e:
+            print(f"Error decoding recognition result: {e}")
+        except Exception as e:
+            print(f"Error processing recognition data: {e}")
 
     @staticmethod
     def list_audio_devices() -> None:
         """List all available audio input devices with detailed information."""
-        devices = sd.query_devices()
-        input_devices = []
-        print("\nAvailable Audio Input Devices:")
-        for i, dev in enumerate(devices):
-            if dev["max_input_channels"] > 0:
-                print(f"\nDevice {i}: {dev['name']}")
-                print(f"  Channels: {dev['max_input_channels']}")
-                print(f"  Sample rates: {dev['default_samplerate']}")
-                input_devices.append(i)
-        return input_devices
+        return device_registry.print_input_devices()
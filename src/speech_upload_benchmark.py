@@ -0,0 +1,121 @@
+"""
+Benchmark of compressed audio upload to Google Cloud Speech.
+
+Streams a recording in real time through `SpeechRecognizer` once per
+encoding and number of chunks per request. Reports:
+    - bytes sent and the resulting upstream bit rate
+    - time-to-final: from the end of the audio to the last final transcript
+    - the transcript, to spot recognition differences
+
+All runs share one speech client, so only the first pays for connecting.
+
+Example usage:
+    python src/speech_upload_benchmark.py --input_file recording.wav
+    python src/speech_upload_benchmark.py --input_file recording.wav --encodings LINEAR16 OGG_OPUS --chunks_per_request 1 3 --runs 5
+"""
+
+import argparse
+import threading
+import time
+from typing import List, Tuple
+import numpy as np
+from google.cloud import speech
+from dotenv import load_dotenv
+from audio_source_lib import FileSource
+from google_cloud_speech_lib import SpeechRecognizer
+
+
+def run(
+    client: speech.SpeechClient,
+    input_file: str,
+    encoding: str,
+    chunks_per_request: int,
+) -> Tuple[int, float, float, str]:
+    """Return (bytes sent, audio seconds, time-to-final, transcript) for one run."""
+    recognizer = SpeechRecognizer(
+        source=FileSource(input_file, sample_rate=16000),
+        client=client,
+        encoding=encoding,
+        chunks_per_request=chunks_per_request,
+    )
+    audio_end = None
+
+    def wait_for_end():
+        nonlocal audio_end
+        recognizer.audio_bus.wait()
+        audio_end = time.monotonic()
+
+    finals: List[str] = []
+    last_final = None
+    with recognizer:
+        threading.Thread(target=wait_for_end, daemon=True).start()
+        for transcript, is_final in recognizer.recognize_stream():
+            if is_final:
+                finals.append(transcript.strip())
+                last_final = time.monotonic()
+
+    upload = recognizer.last_upload
+    time_to_final = (
+        last_final - audio_end
+        if last_final is not None and audio_end is not None
+        else float("nan")
+    )
+    return (
+        upload["bytes_sent"],
+        upload["audio_seconds"],
+        time_to_final,
+        " ".join(finals),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compressed speech upload")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        required=True,
+        help="WAV or raw 16 kHz PCM file with speech",
+    )
+    parser.add_argument(
+        "--encodings",
+        type=str,
+        nargs="+",
+        default=["LINEAR16", "FLAC", "OGG_OPUS"],
+        help="Encodings to compare",
+    )
+    parser.add_argument(
+        "--chunks_per_request",
+        type=int,
+        nargs="+",
+        default=[1, 2],
+        help="100 ms chunks aggregated into each request",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs per configuration")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = speech.SpeechClient()
+
+    print(f"\nStreaming {args.input_file}, {args.runs} runs per configuration:")
+    print(
+        f"{'encoding':>9} {'chunks':>6} {'bytes':>9} {'kbit/s':>7} "
+        f"{'final ms':>9} {'max ms':>7}  transcript"
+    )
+    for encoding in args.encodings:
+        for chunks_per_request in args.chunks_per_request:
+            results = [
+                run(client, args.input_file, encoding, chunks_per_request)
+                for _ in range(args.runs)
+            ]
+            sent = np.mean([result[0] for result in results])
+            seconds = np.mean([result[1] for result in results])
+            latencies = [result[2] * 1000 for result in results]
+            print(
+                f"{encoding:>9} {chunks_per_request:>6} {sent:>9.0f} "
+                f"{sent * 8 / seconds / 1000:>7.1f} {np.mean(latencies):>9.0f} "
+                f"{np.max(latencies):>7.0f}  {results[-1][3]}"
+            )
+
+
+if __name__ == "__main__":
+    main()
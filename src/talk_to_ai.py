@@ -14,23 +14,53 @@ Usage:
 Optional Arguments:
     --device DEVICE_INDEX         : Index of the audio input device to use.
     --latency SECONDS             : Audio stream latency (default: 0.1).
+    --no_shared_capture           : Open separate input streams for wake word and STT.
+    --preroll SECONDS             : Audio replayed from before the command stream opened (default: 1.0).
+    --capture_rate HZ             : Open the microphone at this (native) rate and resample in-process.
+    --output_rate HZ              : Play speech at this (native) rate, resampled in-process.
+    --adaptive_latency            : Tune input latency and blocksize from overflow statistics.
+    --capture_process             : Capture the microphone in a separate process (shared capture only).
+    --endpointing                 : End each command locally as soon as you stop talking.
+    --speech_encoding ENCODING    : Upload audio as LINEAR16, FLAC or OGG_OPUS (default: LINEAR16).
+    --chunks_per_request N        : 100 ms audio chunks per speech request (default: 1).
+    --speech_endpoint HOST:PORT   : Speech-to-Text endpoint, e.g. a local fake_speech_server_cli.py.
+    --vosk_model MODEL            : Show Vosk partials at once, falling back to Vosk finals on slow networks.
+    --cloud_latency_budget SECONDS: Wait for the cloud final after the Vosk one (default: 0.5).
+    --speculation_hold SECONDS    : Send a command to Gemini once its interim transcript is this stable.
+    --energy_gate                 : Skip wake word inference on background noise.
+    --detector_process            : Run wake word detection in a separate process (needs --capture_process).
+    --room INPUT:OUTPUT           : Serve a room with its own input and output device; repeat per room.
     --gemini_model MODEL_NAME     : Gemini model to use (default: gemini-2.5-flash-preview-05-20).
 
 Example:
     python src/talk_to_ai.py --wake_keyword "bumblebee" --device 1
+
+    # Two rooms served by one process:
+    python src/talk_to_ai.py --wake_keyword "bumblebee" --room 1:3 --room 2:4
 """
 
 import os
 import argparse
+import contextlib
 import threading
 import re
 import logging
-from typing import Optional, NoReturn, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Callable, List, Tuple
 import google.generativeai as genai
+import pvporcupine
+import vosk
 from dotenv import load_dotenv
+from google.cloud import texttospeech
+from audio_bus_lib import AudioBus
+from shared_audio_bus_lib import SharedAudioBus
+from audio_device_lib import device_registry
 from wake_word_detector_lib import WakeWordDetector
-from google_cloud_speech_lib import SpeechRecognizer
+from process_wake_word_detector_lib import ProcessWakeWordDetector
+from google_cloud_speech_lib import SpeechRecognizer, create_speech_client
+from hybrid_speech_lib import HybridRecognizer
 from google_cloud_tts_lib import TextToSpeech
+from speculative_chat_lib import SpeculativeChat
+from vosk_model_lib import vosk_models
 import time
 
 
@@ -45,22 +75,35 @@ This setup may have the following limitations:
 """
 
 
-class AICompanion:
+class SharedResources:
+    """Models and clients loaded once and shared by every room.
+
+    Each room still needs its own Porcupine handle, audio streams and Gemini
+    chat, since those hold per-conversation state. The keyword model files,
+    the Gemini model, the optional Vosk model, and the gRPC channels behind
+    the Speech-to-Text and Text-to-Speech clients are the same for all rooms.
+    """
+
     def __init__(
         self,
         wake_keyword: str,
-        device: Optional[Union[int, str, Dict[str, Any]]] = None,
-        latency: float = 0.1,
         model_name: str = "gemini-2.5-flash-preview-05-20",
+        speech_endpoint: Optional[str] = None,
+        vosk_model: Optional[str] = None,
     ) -> None:
-        """Initialize the AI companion.
+        """Load the shared resources.
 
         Args:
-            wake_keyword (str): Wake keyword to listen for
-            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
-            latency (float): Audio stream latency in seconds
+            wake_keyword (str): Built-in wake keyword to listen for
             model_name (str): Name of the Gemini model to use
+            speech_endpoint (str, optional): host:port of the Speech-to-Text
+                service, e.g. a local `FakeSpeechServer`
+            vosk_model (str, optional): Directory or name of a Vosk model to
+                recognize commands locally alongside the Speech-to-Text service
         """
+        if vosk_model:
+            # Load the Vosk model while the clients below are set up.
+            vosk_models.preload([vosk_model])
         load_dotenv()
 
         # Initialize Gemini
@@ -73,36 +116,282 @@ class AICompanion:
             model_name,
             system_instruction=_SYSTEM_INSTRUCTIONS,
         )
+
+        if wake_keyword not in pvporcupine.KEYWORD_PATHS:
+            raise ValueError(
+                f"Unknown wake keyword {wake_keyword!r}, "
+                f"choose one of {sorted(pvporcupine.KEYWORDS)}"
+            )
+        self.wake_keyword = wake_keyword
+        self.keyword_paths: List[str] = [pvporcupine.KEYWORD_PATHS[wake_keyword]]
+        self.speech_client = create_speech_client(speech_endpoint)
+        self.tts_client = texttospeech.TextToSpeechClient()
+        self.vosk_model: Optional[vosk.Model] = None
+        if vosk_model:
+            self.vosk_model = vosk_models.get(vosk_model)
+            logging.info(f"Vosk models: {vosk_models.footprint()}")
+
+
+class AICompanion:
+    def __init__(
+        self,
+        wake_keyword: str,
+        device: Optional[Union[int, str, Dict[str, Any]]] = None,
+        latency: float = 0.1,
+        model_name: str = "gemini-2.5-flash-preview-05-20",
+        shared_capture: bool = True,
+        preroll: float = 1.0,
+        capture_rate: Optional[int] = None,
+        output_rate: Optional[int] = None,
+        adaptive_latency: bool = False,
+        capture_process: bool = False,
+        detector_process: bool = False,
+        energy_gate: bool = False,
+        endpointing: bool = False,
+        speech_encoding: str = "LINEAR16",
+        chunks_per_request: int = 1,
+        speech_endpoint: Optional[str] = None,
+        vosk_model: Optional[str] = None,
+        cloud_latency_budget: float = 0.5,
+        speculation_hold: Optional[float] = None,
+        output_device: Optional[int] = None,
+        resources: Optional[SharedResources] = None,
+    ) -> None:
+        """Initialize the AI companion.
+
+        Args:
+            wake_keyword (str): Wake keyword to listen for
+            device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
+            latency (float): Audio stream latency in seconds
+            model_name (str): Name of the Gemini model to use
+            shared_capture (bool): Capture the microphone once and share it between
+                the wake word detector and speech recognition
+            preroll (float): Seconds of audio captured after the wake word that are
+                replayed to speech recognition; requires shared capture
+            capture_rate (int, optional): Native microphone rate to capture at and
+                resample from; by default the microphone is opened at 16 kHz
+            output_rate (int, optional): Native speaker rate to resample speech to
+            adaptive_latency (bool): Tune input latency and blocksize at runtime,
+                starting from `latency`
+            capture_process (bool): Run the shared capture stream in a separate
+                process, so the GIL held by this one cannot delay it
+            detector_process (bool): Run wake word detection in a separate process
+                reading the shared capture ring; requires `capture_process`
+            energy_gate (bool): Skip wake word inference on frames that are
+                clearly background noise, to save CPU while the room is quiet
+            endpointing (bool): Detect the end of each command locally instead of
+                waiting for the speech service to finalize it
+            speech_encoding (str): Encoding of the audio uploaded to the speech
+                service; "FLAC" or "OGG_OPUS" save bandwidth on slow uplinks
+            chunks_per_request (int): 100 ms audio chunks sent per speech request
+            speech_endpoint (str, optional): host:port of the Speech-to-Text
+                service, e.g. a local fake server; ignored with `resources`
+            vosk_model (str, optional): Name of a Vosk model that shows partial
+                transcripts without a network round trip and stands in for late
+                cloud finals; ignored with `resources`
+            cloud_latency_budget (float): Seconds to wait for the cloud final
+                after the Vosk final, with a Vosk model
+            speculation_hold (float, optional): Send a command to Gemini once its
+                interim transcript has not changed for this many seconds, and
+                keep the response if the final transcript matches
+            output_device (int, optional): Audio output device index for speech
+            resources (SharedResources, optional): Models and clients shared with
+                other rooms; loaded for this companion alone by default
+        """
+        if resources is None:
+            resources = SharedResources(
+                wake_keyword, model_name, speech_endpoint, vosk_model
+            )
+        self.resources = resources
+        self.stopped = threading.Event()
+
+        self.model: genai.GenerativeModel = resources.model
         self.chat: genai.ChatSession = self.model.start_chat(history=[])
+        self.speculative_chat: Optional[SpeculativeChat] = (
+            SpeculativeChat(self.chat, hold=speculation_hold)
+            if speculation_hold is not None
+            else None
+        )
 
-        # Initialize wake word detector
         access_key: Optional[str] = os.getenv("PICOVOICE_ACCESS_KEY")
-        if not api_key:
+        if not access_key:
             raise ValueError("PICOVOICE_ACCESS_KEY not found in environment variables")
-        self.wake_detector = WakeWordDetector(
-            access_key=access_key,
-            keywords=[wake_keyword],
-            sensitivities=[0.7],
-            callback=self.on_wake_word,
-            device=device,
-            latency=latency,
+        if detector_process and not (shared_capture and capture_process):
+            raise ValueError("detector_process requires capture_process")
+        self.access_key = access_key
+        self.wake_keyword = wake_keyword
+        self.latency = latency
+        self.shared_capture = shared_capture
+        self.capture_rate = capture_rate
+        self.adaptive_latency = adaptive_latency
+        self.capture_process = capture_process
+        self.detector_process = detector_process
+        self.energy_gate = energy_gate
+        self.cloud_latency_budget = cloud_latency_budget
+        self.speech_options: Dict[str, Any] = dict(
+            preroll=preroll if shared_capture else 0.0,
+            persistent=True,
+            capture_rate=capture_rate,
+            client=resources.speech_client,
+            endpointing=endpointing,
+            encoding=speech_encoding,
+            chunks_per_request=chunks_per_request,
         )
 
-        # Initialize speech recognition
-        device_index = device if isinstance(device, int) else None
-        self.speech_recognizer = SpeechRecognizer(device_index=device_index)
+        # Remember the devices by name, since their indexes can change when
+        # PortAudio re-enumerates them after a hotplug event.
+        self.device = device
+        self.input_name: Optional[str] = (
+            device_registry.get(device_registry.resolve_input(device)).name
+            if device is not None
+            else None
+        )
+        self.output_name: Optional[str] = (
+            device_registry.get(output_device).name if output_device is not None else None
+        )
+        self._devices_changed = threading.Event()
+        self._audio_released = threading.Event()
+        self._audio_open = False
         self.listening_for_command = False
         self.command_thread: Optional[threading.Thread] = None
 
         # Initialize Text-to-Speech
-        self.tts = TextToSpeech()
+        self.tts = TextToSpeech(
+            output_rate=output_rate,
+            output_device_index=output_device,
+            client=resources.tts_client,
+        )
+        self._open_audio()
+
+    def _open_audio(self) -> None:
+        """
+        Create the capture bus, wake word detector and speech recognizer.
+
+        If any of them fails to open, those already opened are closed again.
+        """
+        opened: List[Callable[[], None]] = []
+        try:
+            self._create_audio(opened)
+        except Exception:
+            for close in reversed(opened):
+                try:
+                    close()
+                except Exception as e:
+                    logging.warning(f"Error closing audio after a failed open: {e}")
+            raise
+        self._audio_open = True
+
+    def _create_audio(self, opened: List[Callable[[], None]]) -> None:
+        """Build the pipeline for `_open_audio`, adding the close of each part to `opened`."""
+        device = self.device
+        if self.input_name is not None:
+            device = device_registry.index_of(self.input_name)
+
+        # Initialize the shared capture bus
+        self.audio_bus: Optional[AudioBus] = (
+            (SharedAudioBus if self.capture_process else AudioBus)(
+                device=device,
+                latency=self.latency,
+                capture_rate=self.capture_rate,
+                adaptive_latency=self.adaptive_latency,
+            )
+            if self.shared_capture
+            else None
+        )
+        if self.audio_bus is not None:
+            opened.append(self.audio_bus.close)
+
+        # Initialize wake word detector
+        if self.detector_process:
+            self.wake_detector: Union[
+                WakeWordDetector, ProcessWakeWordDetector
+            ] = ProcessWakeWordDetector(
+                access_key=self.access_key,
+                keywords=[self.wake_keyword],
+                keyword_paths=self.resources.keyword_paths,
+                sensitivities=[0.7],
+                callback=self.on_wake_word,
+                audio_bus=self.audio_bus,
+                energy_gate=self.energy_gate,
+            )
+        else:
+            self.wake_detector = WakeWordDetector(
+                access_key=self.access_key,
+                keywords=[self.wake_keyword],
+                keyword_paths=self.resources.keyword_paths,
+                sensitivities=[0.7],
+                callback=self.on_wake_word,
+                device=device,
+                latency=self.latency,
+                audio_bus=self.audio_bus,
+                adaptive_latency=self.adaptive_latency,
+                threaded=True,
+                energy_gate=self.energy_gate,
+            )
+        opened.append(self.wake_detector.close)
+
+        # Initialize speech recognition
+        speech_options = dict(
+            self.speech_options,
+            device_index=device if isinstance(device, int) else None,
+            audio_bus=self.audio_bus,
+        )
+        self.speech_recognizer: SpeechRecognizer = (
+            HybridRecognizer(
+                model=self.resources.vosk_model,
+                latency_budget=self.cloud_latency_budget,
+                **speech_options,
+            )
+            if self.resources.vosk_model is not None
+            else SpeechRecognizer(**speech_options)
+        )
+        opened.append(self.speech_recognizer.close)
+
+        if self.output_name is not None:
+            self.tts.output_device_index = device_registry.index_of(
+                self.output_name, output=True
+            )
+
+    def _close_audio(self) -> None:
+        """End any conversation and close every stream of the capture pipeline, once."""
+        if not self._audio_open:
+            return
+        self._audio_open = False
+        self._end_conversation()
+        self.speech_recognizer.close()
+        self.wake_detector.close()
+        if self.audio_bus is not None:
+            self.audio_bus.close()
+
+    def _release_audio(self) -> None:
+        """
+        Hotplug listener: have `run` close all streams before PortAudio is
+        restarted; `run` reopens them on the re-enumerated devices.
+        """
+        self._audio_released.clear()
+        self._devices_changed.set()
+        if not self._audio_released.wait(timeout=10.0):
+            logging.warning("Audio streams were not closed in time for the device refresh")
 
     def on_wake_word(self, keyword: str) -> None:
         """Called when wake word is detected."""
-        if not self.listening_for_command:
+        if (
+            not self.listening_for_command
+            and not self.stopped.is_set()
+            and not self._devices_changed.is_set()
+        ):
             logging.info("Wake word detected! Listening for your command...")
             self.listening_for_command = True
-            self.command_thread = threading.Thread(target=self.listen_for_command)
+            if self.wake_detector.last_detection_position is not None:
+                self.speech_recognizer.replay_from(
+                    self.wake_detector.last_detection_position
+                )
+            # Set up the first stream while the command thread starts.
+            self.speech_recognizer.prewarm()
+            self.command_thread = threading.Thread(
+                target=self.listen_for_command,
+                name=f"{threading.current_thread().name}-command",
+            )
             self.command_thread.start()
 
     def listen_for_command(self) -> None:
@@ -122,22 +411,38 @@ class AICompanion:
                             print(f"\r{' ' * 80}\r", end="")
                             print(f"You: {command_text}")
                             logging.info(f"You: {command_text}")
+                            if isinstance(self.speech_recognizer, HybridRecognizer):
+                                logging.info(
+                                    f"Final from: {self.speech_recognizer.last_final}"
+                                )
+                            if self.speech_recognizer.last_endpoint is not None:
+                                logging.info(
+                                    f"Endpointing: {self.speech_recognizer.last_endpoint}"
+                                )
                             break
                         elif not is_final and transcript.strip():
                             print(
                                 f"\rYou (thinking...): {transcript}", end="", flush=True
                             )
+                            if self.speculative_chat is not None:
+                                self.speculative_chat.update(transcript)
 
                 if command_text:
                     if command_text.lower().strip() in ["goodbye", "exit", "stop"]:
+                        if self.speculative_chat is not None:
+                            self.speculative_chat.cancel()
                         logging.info("Goodbye.")
                         self.tts.speak("Goodbye!")
                         self.tts.wait()
                         break
 
-                    response: genai.GenerateContentResponse = self.chat.send_message(
-                        command_text, stream=True
-                    )
+                    if self.speculative_chat is not None:
+                        response: genai.GenerateContentResponse = (
+                            self.speculative_chat.send(command_text)
+                        )
+                        self.chat = self.speculative_chat.chat
+                    else:
+                        response = self.chat.send_message(command_text, stream=True)
 
                     print("\nAI: ", end="")
                     response_text: str = ""
@@ -162,35 +467,155 @@ class AICompanion:
                     logging.info(f"AI: {response_text}")
                     print()
                 else:
+                    if self.speculative_chat is not None:
+                        self.speculative_chat.cancel()
                     logging.warning("Did not catch that. Please try again.")
 
         except Exception as e:
             logging.error(f"An error occurred during the conversation: {e}", exc_info=True)
         finally:
+            if self.speculative_chat is not None:
+                self.speculative_chat.cancel()
             self.listening_for_command = False
             logging.info("Conversation ended. Say the wake word to start again.")
 
-    def run(self) -> NoReturn:
-        """Run the AI companion."""
+    def run(self) -> None:
+        """
+        Run the AI companion until interrupted or `stop` is called.
+
+        When an audio device is plugged in or removed, or the audio pipeline
+        fails, every stream is closed and the pipeline is rebuilt on the input
+        device as enumerated now, so a re-plugged microphone is picked up.
+        """
         logging.info("AI Companion is ready! Say the wake word to begin...")
-        while True:
-            try:
-                with self.wake_detector, self.tts:
-                    while True:
-                        time.sleep(0.1)
-            except KeyboardInterrupt:
-                logging.info("Shutting down AI Companion...")
-                break
-            except Exception as e:
-                logging.error(f"An unexpected error occurred in the main loop: {e}", exc_info=True)
-                logging.warning("Attempting to recover...")
-                time.sleep(0.5)
+        device_registry.add_listener(self._release_audio)
+        device_registry.watch()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    if not self._audio_open:
+                        self._open_audio()
+                    with (
+                        self.audio_bus or contextlib.nullcontext()
+                    ), self.wake_detector, self.tts:
+                        try:
+                            while not self.stopped.wait(0.1):
+                                if self._devices_changed.is_set():
+                                    break
+                        finally:
+                            # Finish the conversation while its audio and speech
+                            # output are still open.
+                            self._end_conversation()
+                except KeyboardInterrupt:
+                    self.stopped.set()
+                except Exception as e:
+                    logging.error(f"An unexpected error occurred in the main loop: {e}", exc_info=True)
+                    logging.warning("Attempting to recover...")
+                    device_registry.invalidate()
+                    time.sleep(0.5)
+                if self.stopped.is_set():
+                    break
+
+                self._close_audio()
+                if self._devices_changed.is_set():
+                    # PortAudio restarts once every listener has closed its streams.
+                    self._audio_released.set()
+                    device_registry.wait_ready()
+                    self._devices_changed.clear()
+                    logging.info("Audio devices changed, reopening audio streams")
+        finally:
+            device_registry.remove_listener(self._release_audio)
+            self._audio_released.set()
+
+        logging.info("Shutting down AI Companion...")
+        logging.info(f"Wake word detector: {self.wake_detector.stats()}")
+        if self.speculative_chat is not None:
+            logging.info(f"Speculative requests: {self.speculative_chat.stats()}")
+            self.speculative_chat.close()
+        self._close_audio()
+
+    def _end_conversation(self) -> None:
+        """
+        Stop listening for commands and wait for the command thread to exit.
+
+        The recognizer is cancelled until the thread is gone, so no stream is
+        still reading audio when the recognizer is closed.
+        """
+        self.listening_for_command = False
+        while self.command_thread is not None and self.command_thread.is_alive():
+            self.speech_recognizer.cancel()
+            self.command_thread.join(0.1)
+        self.command_thread = None
+
+    def stop(self) -> None:
+        """Ask `run` to shut the companion down."""
+        self.stopped.set()
+
+
+def run_rooms(
+    wake_keyword: str,
+    rooms: List[Tuple[int, Optional[int]]],
+    model_name: str = "gemini-2.5-flash-preview-05-20",
+    **kwargs: Any,
+) -> None:
+    """
+    Serve several rooms from one process, each with its own pipeline.
+
+    Args:
+        wake_keyword (str): Wake keyword to listen for
+        rooms (List[Tuple[int, Optional[int]]]): (input, output) device index
+            pairs, one per room
+        model_name (str): Name of the Gemini model to use
+        **kwargs: Further `AICompanion` arguments applied to every room
+    """
+    resources = SharedResources(
+        wake_keyword,
+        model_name,
+        kwargs.get("speech_endpoint"),
+        kwargs.get("vosk_model"),
+    )
+    companions = [
+        AICompanion(
+            wake_keyword,
+            device=input_device,
+            output_device=output_device,
+            model_name=model_name,
+            resources=resources,
+            **kwargs,
+        )
+        for input_device, output_device in rooms
+    ]
+    threads = [
+        threading.Thread(target=companion.run, name=f"room{i + 1}")
+        for i, companion in enumerate(companions)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for companion in companions:
+            companion.stop()
+        for thread in threads:
+            thread.join()
+
+
+def parse_room(spec: str) -> Tuple[int, Optional[int]]:
+    """Parse an `INPUT[:OUTPUT]` device index pair."""
+    try:
+        input_device, _, output_device = spec.partition(":")
+        return int(input_device), int(output_device) if output_device else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid room {spec!r}, expected INPUT:OUTPUT")
 
 
 def list_audio_devices() -> None:
     """List all available audio input devices."""
     print("\nListing all audio input devices:")
-    WakeWordDetector.list_audio_devices()
+    device_registry.print_input_devices()
 
 
 def main() -> None:
@@ -214,6 +639,93 @@ def main() -> None:
     optional_args.add_argument(
         "--latency", type=float, default=0.1, help="Audio stream latency in seconds"
     )
+    optional_args.add_argument(
+        "--no_shared_capture",
+        action="store_true",
+        help="Open separate input streams instead of sharing one capture stream",
+    )
+    optional_args.add_argument(
+        "--preroll",
+        type=float,
+        default=1.0,
+        help="Seconds of audio after the wake word replayed to speech recognition",
+    )
+    optional_args.add_argument(
+        "--capture_rate",
+        type=int,
+        help="Native microphone sample rate to capture at and resample from",
+    )
+    optional_args.add_argument(
+        "--output_rate",
+        type=int,
+        help="Native speaker sample rate to resample speech to",
+    )
+    optional_args.add_argument(
+        "--adaptive_latency",
+        action="store_true",
+        help="Tune input latency and blocksize at runtime from overflow statistics",
+    )
+    optional_args.add_argument(
+        "--capture_process",
+        action="store_true",
+        help="Capture the microphone in a separate process writing to shared memory",
+    )
+    optional_args.add_argument(
+        "--endpointing",
+        action="store_true",
+        help="End each command locally as soon as you stop talking",
+    )
+    optional_args.add_argument(
+        "--speech_encoding",
+        type=str,
+        choices=["LINEAR16", "FLAC", "OGG_OPUS"],
+        default="LINEAR16",
+        help="Encoding of the audio uploaded for speech recognition (default: %(default)s)",
+    )
+    optional_args.add_argument(
+        "--chunks_per_request",
+        type=int,
+        default=1,
+        help="100 ms audio chunks sent per speech request (default: %(default)s)",
+    )
+    optional_args.add_argument(
+        "--speech_endpoint",
+        type=str,
+        help="host:port of the Speech-to-Text service, e.g. a local fake server",
+    )
+    optional_args.add_argument(
+        "--vosk_model",
+        type=str,
+        help="Vosk model showing partial transcripts at once and standing in for late cloud finals",
+    )
+    optional_args.add_argument(
+        "--cloud_latency_budget",
+        type=float,
+        default=0.5,
+        help="Seconds to wait for the cloud final after the Vosk final (default: %(default)s)",
+    )
+    optional_args.add_argument(
+        "--speculation_hold",
+        type=float,
+        help="Send a command to Gemini once its interim transcript is stable for this many seconds",
+    )
+    optional_args.add_argument(
+        "--energy_gate",
+        action="store_true",
+        help="Skip wake word inference on frames that are just background noise",
+    )
+    optional_args.add_argument(
+        "--detector_process",
+        action="store_true",
+        help="Run wake word detection in a separate process (requires --capture_process)",
+    )
+    optional_args.add_argument(
+        "--room",
+        type=parse_room,
+        action="append",
+        metavar="INPUT:OUTPUT",
+        help="Serve a room with its own input and output device index; repeat for each room",
+    )
     optional_args.add_argument(
         "--list-devices",
         action="store_true",
@@ -240,11 +752,38 @@ def main() -> None:
             )
         return
 
+    options = dict(
+        latency=args.latency,
+        shared_capture=not args.no_shared_capture,
+        preroll=args.preroll,
+        capture_rate=args.capture_rate,
+        output_rate=args.output_rate,
+        adaptive_latency=args.adaptive_latency,
+        capture_process=args.capture_process,
+        detector_process=args.detector_process,
+        energy_gate=args.energy_gate,
+        endpointing=args.endpointing,
+        speech_encoding=args.speech_encoding,
+        chunks_per_request=args.chunks_per_request,
+        speech_endpoint=args.speech_endpoint,
+        vosk_model=args.vosk_model,
+        cloud_latency_budget=args.cloud_latency_budget,
+        speculation_hold=args.speculation_hold,
+    )
+    if args.room:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(threadName)s - %(levelname)s - %(message)s",
+            force=True,
+        )
+        run_rooms(args.wake_keyword, args.room, args.gemini_model, **options)
+        return
+
     companion = AICompanion(
         wake_keyword=args.wake_keyword,
         device=args.device,
-        latency=args.latency,
         model_name=args.gemini_model,
+        **options,
     )
     companion.run()
 
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Sequence
+
+
+class EnergyGate:
+    """Cheap voice activity gate for int16 audio frames.
+
+    Each frame is reduced to its RMS energy and spectral flatness, a few
+    vectorized operations per frame. A running estimate of the noise floor
+    follows the energy of frames judged silent. The gate opens when a frame
+    is clearly louder than the floor, or somewhat louder and tonal (low
+    flatness) like voiced speech. It stays open until the energy has been
+    back near the floor for `hangover_frames` frames.
+
+    `process` uses the gate to decide which frames need inference. The last
+    `lookback_frames` skipped frames are returned again when the gate opens,
+    so the onset of a word is never clipped.
+    """
+
+    def __init__(
+        self,
+        frame_length: int,
+        lookback_frames: int = 8,
+        open_ratio: float = 3.0,
+        tonal_ratio: float = 1.8,
+        close_ratio: float = 1.5,
+        hangover_frames: int = 16,
+        flatness_threshold: float = 0.3,
+        min_floor: float = 30.0,
+        adapt_rate: float = 0.02,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            frame_length (int): Samples per frame
+            lookback_frames (int): Skipped frames replayed when the gate opens,
+                at least 1
+            open_ratio (float): Energy above the noise floor, as a ratio of RMS,
+                that opens the gate on its own
+            tonal_ratio (float): Lower energy ratio that opens the gate for
+                tonal frames, with flatness below `flatness_threshold`
+            close_ratio (float): Energy ratio below which a frame counts as silent
+            hangover_frames (int): Silent frames before the gate closes again
+            flatness_threshold (float): Spectral flatness (0 for a pure tone, 1
+                for white noise) below which a frame counts as tonal
+            min_floor (float): Lowest noise floor RMS, so digital silence does
+                not make every sound open the gate
+            adapt_rate (float): How quickly the noise floor rises to follow
+                louder background noise; it falls ten times faster
+        """
+        if lookback_frames < 1:
+            raise ValueError("lookback_frames must be at least 1")
+        self.frame_length = frame_length
+        self.lookback_frames = lookback_frames
+        self.open_ratio = open_ratio
+        self.tonal_ratio = tonal_ratio
+        self.close_ratio = close_ratio
+        self.hangover_frames = hangover_frames
+        self.flatness_threshold = flatness_threshold
+        self.min_floor = min_floor
+        self.adapt_rate = adapt_rate
+        self._lookback = np.zeros((lookback_frames, frame_length), dtype=np.int16)
+        self.reset()
+
+    def reset(self, keep_noise_floor: bool = False) -> None:
+        """Forget the gate state and held frames, and unless kept the noise floor."""
+        if not keep_noise_floor:
+            self.noise_floor = self.min_floor
+        self.is_open = False
+        self.last_ratio = 0.0
+        self.frames = 0
+        self.skipped_frames = 0
+        self._silent_frames = 0
+        self._held = 0
+        self._next_slot = 0
+
+    @staticmethod
+    def flatness(pcm: np.ndarray) -> float:
+        """Spectral flatness: geometric over arithmetic mean of the power spectrum."""
+        power = np.abs(np.fft.rfft(pcm.astype(np.float32))) ** 2 + 1e-10
+        return float(np.exp(np.mean(np.log(power))) / np.mean(power))
+
+    def update(self, pcm: np.ndarray) -> bool:
+        """
+        Account for one frame and return whether the gate is open after it.
+
+        Args:
+            pcm (np.ndarray): One frame of int16 samples
+        """
+        samples = pcm.astype(np.float32)
+        rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+        ratio = rms / self.noise_floor
+        self.last_ratio = ratio
+
+        if ratio >= self.open_ratio or (
+            ratio >= self.tonal_ratio
+            and self.flatness(samples) < self.flatness_threshold
+        ):
+            self.is_open = True
+            self._silent_frames = 0
+            return True
+
+        if ratio < self.close_ratio or not self.is_open:
+            # Background noise; let the floor follow it.
+            rate = self.adapt_rate if rms > self.noise_floor else self.adapt_rate * 10
+            self.noise_floor = max(
+                self.min_floor, self.noise_floor + (rms - self.noise_floor) * rate
+            )
+        if ratio < self.close_ratio:
+            self._silent_frames += 1
+            if self._silent_frames >= self.hangover_frames:
+                self.is_open = False
+        return self.is_open
+
+    def process(self, pcm: np.ndarray) -> Sequence[np.ndarray]:
+        """
+        Gate one frame.
+
+        Args:
+            pcm (np.ndarray): One frame of int16 samples
+
+        Returns:
+            The frames that need inference, oldest first: none while the gate
+            is closed, the held look-back frames and `pcm` when it opens, and
+            just `pcm` while it stays open.
+        """
+        self.frames += 1
+        was_open = self.is_open
+        if not self.update(pcm):
+            self.skipped_frames += 1
+            self._lookback[self._next_slot] = pcm
+            self._next_slot = (self._next_slot + 1) % self.lookback_frames
+            self._held = min(self._held + 1, self.lookback_frames)
+            return ()
+        if was_open or self._held == 0:
+            return (pcm,)
+
+        # The gate just opened: replay the held frames before this one. They
+        # were counted as skipped, so take them back out.
+        start = self._next_slot - self._held
+        held = [
+            self._lookback[i % self.lookback_frames]
+            for i in range(start, self._next_slot)
+        ]
+        self.skipped_frames -= self._held
+        self._held = 0
+        return held + [pcm]
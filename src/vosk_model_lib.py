@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional, Union
+from vosk import MODEL_DIRS, Model
+
+
+def _resident_bytes() -> Optional[int]:
+    """Resident memory of this process, where /proc offers it."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _directory_bytes(path: str) -> int:
+    """Total size of the files below `path`."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class VoskModelCache:
+    """Process-wide cache of loaded Vosk models.
+
+    Loading a model takes seconds and hundreds of MB, and a model name that
+    is not found locally is downloaded, so every model is loaded once and
+    shared by all `KaldiRecognizer`s. Models are keyed by their real path
+    when given a model directory, or by name otherwise. `preload` loads
+    models in the background at startup; `get` waits for such a load instead
+    of starting another one. Loads run one at a time, so `footprint` can
+    report the resident memory each model added.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._models: Dict[str, Future] = {}
+        self._footprint: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _key(model: str) -> str:
+        return os.path.realpath(model) if os.path.isdir(model) else model
+
+    @staticmethod
+    def _path(key: str) -> Optional[str]:
+        """The directory of a model, looked up by name as Vosk does."""
+        if os.path.isdir(key):
+            return key
+        for directory in MODEL_DIRS:
+            if directory is not None and os.path.isdir(os.path.join(directory, key)):
+                return os.path.join(directory, key)
+        return None
+
+    def _load(self, key: str) -> Model:
+        with self._load_lock:
+            started = time.monotonic()
+            before = _resident_bytes()
+            model = (
+                Model(model_path=key) if os.path.isdir(key) else Model(model_name=key)
+            )
+            after = _resident_bytes()
+            elapsed = time.monotonic() - started
+        path = self._path(key)
+        footprint = {
+            "load_seconds": elapsed,
+            "resident_mb": (after - before) / 1e6 if before and after else float("nan"),
+            "disk_mb": _directory_bytes(path) / 1e6 if path else float("nan"),
+        }
+        with self._lock:
+            self._footprint[key] = footprint
+        print(
+            f"Loaded Vosk model {key} in {elapsed:.1f}s, "
+            f"{footprint['resident_mb']:.0f} MB resident"
+        )
+        return model
+
+    def get(self, model: Union[str, Model]) -> Model:
+        """
+        Return the loaded model, loading it on first use.
+
+        Args:
+            model (Union[str, Model]): Vosk model directory or name; an already
+                loaded model is returned as is
+
+        Returns:
+            Model: The shared model
+        """
+        if isinstance(model, Model):
+            return model
+        key = self._key(model)
+        with self._lock:
+            future = self._models.get(key)
+            owner = future is None
+            if owner:
+                future = self._models[key] = Future()
+        if owner:
+            try:
+                future.set_result(self._load(key))
+            except BaseException as e:
+                with self._lock:
+                    del self._models[key]
+                future.set_exception(e)
+        return future.result()
+
+    def preload(self, models: Iterable[str]) -> threading.Thread:
+        """Load `models` on a background thread, e.g. while the rest of the app starts."""
+
+        def load():
+            for model in models:
+                try:
+                    self.get(model)
+                except Exception as e:
+                    print(f"Could not preload Vosk model {model}: {e}")
+
+        thread = threading.Thread(target=load, name="vosk-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def footprint(self) -> Dict[str, Dict[str, float]]:
+        """Per loaded model: seconds to load, resident MB added and MB on disk."""
+        with self._lock:
+            return {key: dict(footprint) for key, footprint in self._footprint.items()}
+
+
+vosk_models = VoskModelCache()
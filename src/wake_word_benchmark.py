@@ -0,0 +1,288 @@
+"""
+Benchmarks of the wake word detector.
+
+By default, feeds synthetic int16 blocks to Porcupine the way the PortAudio
+callback does. It compares the old frame path (`flatten().astype()`
+followed by `Porcupine.process`) with the zero-copy path used by
+`WakeWordDetector`. Reports the time per callback and the memory allocated
+per callback, as traced by tracemalloc.
+
+With --positives and/or --background, runs `WakeWordDetector` over folders
+of WAV files instead, once per sensitivity, and reports:
+    - miss rate on the positives
+    - detection latency, from the labeled keyword end to the detection
+    - false accepts per hour of background audio
+    - CPU microseconds per frame, and with --energy_gate the share of
+      frames the gate kept from Porcupine
+
+Each positive WAV file needs a sidecar JSON file with the same name, giving
+the spoken keyword and the time in seconds at which it ends, for example
+`hey.wav` and `hey.json` containing {"keyword": "bumblebee", "end": 1.85}.
+Background files contain no keywords.
+
+Example usage:
+    python src/wake_word_benchmark.py
+    python src/wake_word_benchmark.py --callbacks 5000 --frames_per_block 2
+
+    # Choosing a sensitivity from recorded corpora:
+    python src/wake_word_benchmark.py --positives corpus/positive --background corpus/background
+    python src/wake_word_benchmark.py --background corpus/background --energy_gate
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pvporcupine
+from dotenv import load_dotenv
+from audio_source_lib import FileSource
+from wake_word_detector_lib import WakeWordDetector, frame_processor
+
+
+def copying_callback(porcupine: pvporcupine.Porcupine, indata: np.ndarray) -> None:
+    """The frame path before the zero-copy change."""
+    pcm = indata.flatten().astype(np.int16)
+    frame_length = porcupine.frame_length
+    for offset in range(0, len(pcm), frame_length):
+        porcupine.process(pcm[offset : offset + frame_length])
+
+
+def zero_copy_callback(process, frame_length: int, indata: np.ndarray) -> None:
+    """The frame path of `WakeWordDetector._audio_callback`."""
+    pcm = indata.reshape(-1)
+    for offset in range(0, len(pcm), frame_length):
+        process(pcm[offset : offset + frame_length])
+
+
+def measure(callback, blocks) -> tuple:
+    """Return (microseconds, bytes allocated) per callback."""
+    started = time.perf_counter()
+    for indata in blocks:
+        callback(indata)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    allocated = 0
+    for indata in blocks:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        callback(indata)
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed / len(blocks) * 1e6, allocated / len(blocks)
+
+
+def benchmark_callback(access_key: str, callbacks: int, frames_per_block: int) -> None:
+    """Compare the copying and zero-copy callback paths."""
+    porcupine = pvporcupine.create(access_key=access_key, keywords=["bumblebee"])
+    try:
+        frame_length = porcupine.frame_length
+        rng = np.random.default_rng(0)
+        blocks = [
+            rng.integers(-8000, 8000, (frame_length * frames_per_block, 1), dtype=np.int16)
+            for _ in range(callbacks)
+        ]
+        process = frame_processor(porcupine)
+
+        print(
+            f"\n{callbacks} callbacks of {frames_per_block} x {frame_length} samples:"
+        )
+        print(f"{'path':>12} {'us/callback':>12} {'bytes/callback':>15}")
+        for name, callback in (
+            ("copying", lambda indata: copying_callback(porcupine, indata)),
+            ("zero-copy", lambda indata: zero_copy_callback(process, frame_length, indata)),
+        ):
+            micros, allocated = measure(callback, blocks)
+            print(f"{name:>12} {micros:>12.1f} {allocated:>15.0f}")
+    finally:
+        porcupine.delete()
+
+
+class CorpusResult(NamedTuple):
+    """Detections in one file: (keyword, seconds into the file) pairs, and CPU use."""
+
+    detections: List[Tuple[str, float]]
+    duration: float
+    frames: int
+    skipped_frames: int
+    cpu_seconds: float
+
+
+def scan_file(
+    access_key: str,
+    keywords: List[str],
+    sensitivity: float,
+    path: str,
+    energy_gate: bool = False,
+) -> CorpusResult:
+    """Run a wake word detector over a WAV file as fast as possible."""
+    source = FileSource(path, realtime=False)
+    detections: List[Tuple[str, float]] = []
+
+    detector = WakeWordDetector(
+        access_key=access_key,
+        keywords=keywords,
+        sensitivities=[sensitivity] * len(keywords),
+        callback=lambda keyword: detections.append(
+            (keyword, detector.last_detection_position / detector.porcupine.sample_rate)
+        ),
+        source=source,
+        energy_gate=energy_gate,
+    )
+    with detector:
+        detector.wait()
+    stats = detector.stats()
+    if not stats["frames_read"]:
+        raise RuntimeError(f"The wake word detector read no frames from {path}")
+    return CorpusResult(
+        detections,
+        source.duration,
+        stats["frames_read"],
+        stats["skipped_frames"],
+        stats["cpu_seconds"],
+    )
+
+
+def load_label(path: str) -> Dict:
+    """Read the sidecar JSON label of a positive WAV file."""
+    with open(os.path.splitext(path)[0] + ".json") as label_file:
+        return json.load(label_file)
+
+
+def benchmark_corpus(
+    access_key: str,
+    positives: Optional[str],
+    background: Optional[str],
+    sensitivities: List[float],
+    max_latency: float,
+    energy_gate: bool = False,
+) -> None:
+    """Report miss rate, latency, false accepts and CPU per sensitivity."""
+    positive_files = (
+        sorted(glob.glob(os.path.join(positives, "*.wav"))) if positives else []
+    )
+    background_files = (
+        sorted(glob.glob(os.path.join(background, "*.wav"))) if background else []
+    )
+    labels = {path: load_label(path) for path in positive_files}
+    keywords = sorted({label["keyword"] for label in labels.values()}) or ["bumblebee"]
+
+    print(
+        f"\n{len(positive_files)} positive and {len(background_files)} background "
+        f"files, keywords: {', '.join(keywords)}"
+    )
+    print(
+        f"{'sensitivity':>11} {'miss %':>7} {'latency ms':>11} {'max ms':>7} "
+        f"{'FA/hour':>8} {'us/frame':>9} {'skipped %':>10}"
+    )
+    for sensitivity in sensitivities:
+        misses = 0
+        latencies: List[float] = []
+        false_accepts = 0
+        background_seconds = 0.0
+        frames = 0
+        skipped_frames = 0
+        cpu_seconds = 0.0
+
+        for path in positive_files:
+            label = labels[path]
+            result = scan_file(access_key, keywords, sensitivity, path, energy_gate)
+            frames += result.frames
+            skipped_frames += result.skipped_frames
+            cpu_seconds += result.cpu_seconds
+            hits = [
+                at - label["end"]
+                for keyword, at in result.detections
+                if keyword == label["keyword"]
+                and -max_latency <= at - label["end"] <= max_latency
+            ]
+            if hits:
+                latencies.append(min(hits, key=abs))
+            else:
+                misses += 1
+
+        for path in background_files:
+            result = scan_file(access_key, keywords, sensitivity, path, energy_gate)
+            frames += result.frames
+            skipped_frames += result.skipped_frames
+            cpu_seconds += result.cpu_seconds
+            false_accepts += len(result.detections)
+            background_seconds += result.duration
+
+        miss_rate = misses / len(positive_files) * 100 if positive_files else float("nan")
+        latency = np.mean(latencies) * 1000 if latencies else float("nan")
+        worst = np.max(latencies) * 1000 if latencies else float("nan")
+        fa_per_hour = (
+            false_accepts / background_seconds * 3600 if background_seconds else float("nan")
+        )
+        micros = cpu_seconds / frames * 1e6 if frames else float("nan")
+        skipped = skipped_frames / frames * 100 if frames else float("nan")
+        print(
+            f"{sensitivity:>11.2f} {miss_rate:>7.1f} {latency:>11.0f} {worst:>7.0f} "
+            f"{fa_per_hour:>8.2f} {micros:>9.1f} {skipped:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wake word detector")
+    parser.add_argument(
+        "--callbacks", type=int, default=2000, help="Number of callbacks to time"
+    )
+    parser.add_argument(
+        "--frames_per_block",
+        type=int,
+        default=1,
+        help="Porcupine frames per audio callback",
+    )
+    parser.add_argument(
+        "--positives",
+        type=str,
+        help="Folder of WAV files containing a keyword, with sidecar JSON labels",
+    )
+    parser.add_argument(
+        "--background", type=str, help="Folder of WAV files without keywords"
+    )
+    parser.add_argument(
+        "--sensitivities",
+        type=float,
+        nargs="+",
+        default=[0.5, 0.6, 0.7, 0.8, 0.9],
+        help="Sensitivities to evaluate the corpora at",
+    )
+    parser.add_argument(
+        "--max_latency",
+        type=float,
+        default=2.0,
+        help="Seconds from the labeled keyword end within which a detection counts",
+    )
+    parser.add_argument(
+        "--energy_gate",
+        action="store_true",
+        help="Skip Porcupine on background noise frames in corpus mode",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    access_key = os.getenv("PICOVOICE_ACCESS_KEY")
+    if not access_key:
+        raise ValueError("Please set the PICOVOICE_ACCESS_KEY environment variable")
+
+    if args.positives or args.background:
+        benchmark_corpus(
+            access_key,
+            args.positives,
+            args.background,
+            args.sensitivities,
+            args.max_latency,
+            args.energy_gate,
+        )
+    else:
+        benchmark_callback(access_key, args.callbacks, args.frames_per_block)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,33 @@ Wake word detector command line interface using Picovoice.
 
 Example usage:
     python src/wake_word_detector_cli.py
+
+    # Scanning a recording as fast as possible:
+    python src/wake_word_detector_cli.py --input_file recording.wav --flat_out
 """
 
+import argparse
 import time
 import os
 from dotenv import load_dotenv
+from audio_source_lib import FileSource
 from wake_word_detector_lib import WakeWordDetector
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Wake word detection using Porcupine")
+    parser.add_argument(
+        "--input_file",
+        type=str,
+        help="WAV or raw 16 kHz PCM file to read instead of the microphone",
+    )
+    parser.add_argument(
+        "--flat_out",
+        action="store_true",
+        help="Process the input file as fast as possible instead of in real time",
+    )
+    args = parser.parse_args()
+
     # Load environment variables
     load_dotenv()
 
@@ -31,13 +49,31 @@ def main():
         # Initialize with some example keywords (you can choose from the available keywords)
         keywords = ["picovoice", "bumblebee"]
 
+        source = None
+        if args.input_file:
+            source = FileSource(
+                args.input_file, sample_rate=16000, realtime=not args.flat_out
+            )
+
         # Create detector with custom callback and higher sensitivity
         with WakeWordDetector(
             access_key=ACCESS_KEY,
             keywords=keywords,
             sensitivities=[0.7] * len(keywords),
             callback=on_wake_word,
+            source=source,
         ) as detector:
+            if source is not None:
+                print(f"\n📄 Scanning {args.input_file} for wake words...")
+                started = time.monotonic()
+                detector.wait()
+                elapsed = time.monotonic() - started
+                print(
+                    f"Processed {source.duration:.1f}s of audio in {elapsed:.1f}s "
+                    f"({source.duration / max(elapsed, 1e-9):.1f}x real time)"
+                )
+                return
+
             print("\n🎤 Listening for wake words... (Press Ctrl+C to exit)")
             print(f"Try saying one of: {', '.join(keywords)}")
 
@@ -1,8 +1,66 @@
+import collections
+import ctypes
+import queue
 import pvporcupine
 import sounddevice as sd
 import numpy as np
 from typing import Callable, Optional, List, Dict, Any, Union
+import threading
 import time as time_lib
+from concurrent.futures import Future, ThreadPoolExecutor
+from audio_device_lib import device_registry
+from audio_bus_lib import AudioBus, AudioBusReader
+from audio_source_lib import AudioSource
+from latency_controller_lib import AdaptiveLatencyController
+from vad_lib import EnergyGate
+
+
+def frame_processor(porcupine: pvporcupine.Porcupine) -> Callable[[np.ndarray], int]:
+    """
+    Return a function that runs Porcupine on an int16 frame without copying it.
+
+    `Porcupine.process` unpacks every frame into a new ctypes array, one Python
+    int per sample. The returned function instead passes the frame's own
+    buffer to the native library. Frames it cannot pass as they are (wrong
+    length, dtype or layout) go through `Porcupine.process`. A native error
+    raises the same exception `Porcupine.process` would; the frame is not
+    processed a second time.
+
+    This depends on the private `_process_func`, `_handle`,
+    `PicovoiceStatuses`, `_PICOVOICE_STATUS_TO_EXCEPTION` and
+    `_get_error_stack` of pvporcupine 3.0.2, the version pinned in
+    requirements.txt. If any of them is missing, `Porcupine.process` is
+    returned instead.
+    """
+    try:
+        process_func = porcupine._process_func
+        handle = porcupine._handle
+        success = porcupine.PicovoiceStatuses.SUCCESS
+        status_errors = porcupine._PICOVOICE_STATUS_TO_EXCEPTION
+        error_stack = porcupine._get_error_stack
+    except AttributeError:
+        return porcupine.process
+
+    frame_length = porcupine.frame_length
+    short_pointer = ctypes.POINTER(ctypes.c_short)
+    result = ctypes.c_int()
+    result_ref = ctypes.byref(result)
+
+    def process(pcm: np.ndarray) -> int:
+        if (
+            len(pcm) != frame_length
+            or pcm.dtype != np.int16
+            or not pcm.flags.c_contiguous
+        ):
+            return porcupine.process(pcm)
+        status = process_func(handle, pcm.ctypes.data_as(short_pointer), result_ref)
+        if status != success:
+            raise status_errors.get(status, pvporcupine.PorcupineError)(
+                message="Processing failed", message_stack=error_stack()
+            )
+        return result.value
+
+    return process
 
 
 class WakeWordDetector:
@@ -14,6 +72,13 @@ class WakeWordDetector:
         callback: Optional[Callable[[str], None]] = None,
         device: Optional[Union[int, str, Dict[str, Any]]] = None,
         latency: float = 0.1,
+        audio_bus: Optional[AudioBus] = None,
+        source: Optional[AudioSource] = None,
+        adaptive_latency: bool = False,
+        keyword_paths: Optional[List[str]] = None,
+        threaded: bool = False,
+        queue_frames: int = 64,
+        energy_gate: bool = False,
     ):
         """
         Initialize the wake word detector.
@@ -25,70 +90,249 @@ class WakeWordDetector:
             callback (Callable[[str], None], optional): Function to call when wake word is detected
             device (Union[int, str, dict], optional): Audio input device (index, name, or dict)
             latency (float): Audio stream latency in seconds
+            audio_bus (AudioBus, optional): Shared capture bus to read from instead
+                of opening a dedicated input stream
+            source (AudioSource, optional): Audio source, e.g. a file, to read from
+                through a private audio bus instead of a microphone
+            adaptive_latency (bool): Tune the dedicated input stream's latency and
+                blocksize at runtime from overflow statistics
+            keyword_paths (List[str], optional): Keyword model files, one per
+                keyword, e.g. resolved once and shared by several detectors.
+                By default the built-in models named by `keywords` are used.
+            threaded (bool): Keep the audio callback down to copying frames into
+                a preallocated buffer; Porcupine runs on a worker thread and
+                `callback` on an executor, so neither can cause input overflows
+            queue_frames (int): Frames the threaded buffer holds before new
+                frames are dropped
+            energy_gate (bool): Skip Porcupine on frames that are clearly just
+                background noise, see `EnergyGate`
         """
         if sensitivities is None:
             sensitivities = [0.5] * len(keywords)
 
+        self.access_key = access_key
         self.keywords = keywords
+        self.sensitivities = sensitivities
         self.callback = callback or (lambda x: print(f"Wake word detected: {x}"))
-        self.device = self._get_device_id(device)
+        self.audio_bus = audio_bus
+        self.owns_bus = False
+        if source is not None:
+            self.device = source.device
+        elif audio_bus is not None:
+            self.device = audio_bus.device
+        else:
+            self.device = device_registry.resolve_input(device)
+        self.reader: Optional[AudioBusReader] = None
+        self.reader_thread: Optional[threading.Thread] = None
+        self.last_detection_position: Optional[int] = None
+        self.threaded = threaded
+        self.queue_frames = queue_frames
+        self.dropped_frames = 0
+        self.detections = 0
+        # Frames read from the bus, and the CPU time spent processing them.
+        self.frames_read = 0
+        self.cpu_seconds = 0.0
+        self.detection_latencies: collections.deque = collections.deque(maxlen=100)
+        self._frame_queue: "queue.SimpleQueue[Optional[int]]" = queue.SimpleQueue()
+        self._worker_thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.error_count = 0
         self.last_error_time = 0
         self.MAX_ERRORS = 5
         self.ERROR_RESET_TIME = 60  # seconds
+        self.latency = latency
+        self.controller: Optional[AdaptiveLatencyController] = None
+        self._stream_lock = threading.Lock()
+        self._porcupine_lock = threading.Lock()
+        # Set by `close` under `_porcupine_lock`; a later swap discards its handle.
+        self._closed = False
+        self._running = False
 
         try:
-            self.porcupine = pvporcupine.create(
-                access_key=access_key, keywords=keywords, sensitivities=sensitivities
+            self.porcupine = self._create_porcupine(keywords, sensitivities, keyword_paths)
+            self._process = frame_processor(self.porcupine)
+            self.gate: Optional[EnergyGate] = (
+                EnergyGate(self.porcupine.frame_length) if energy_gate else None
             )
+            if threaded:
+                self._frames = np.zeros(
+                    (queue_frames, self.porcupine.frame_length), dtype=np.int16
+                )
+                self._frame_times = np.zeros(queue_frames)
+                self._frames_queued = 0
+
+            if source is not None and audio_bus is None:
+                audio_bus = AudioBus(
+                    source=source, sample_rate=self.porcupine.sample_rate
+                )
+                self.audio_bus = audio_bus
+                self.owns_bus = True
+
+            if audio_bus is not None:
+                if audio_bus.sample_rate != self.porcupine.sample_rate:
+                    raise ValueError(
+                        f"Audio bus sample rate {audio_bus.sample_rate} does not match "
+                        f"Porcupine sample rate {self.porcupine.sample_rate}"
+                    )
+                print("\nWake word detector reading from shared audio bus")
+                print(f"Frame length: {self.porcupine.frame_length}")
+                return
 
             # Print audio device info for debugging
             print("\nAudio Device Configuration:")
-            print(f"Using device: {sd.query_devices(self.device)}")
+            print(f"Using device: {device_registry.get(self.device)}")
             print(f"Sample rate: {self.porcupine.sample_rate}")
             print(f"Frame length: {self.porcupine.frame_length}")
             print(f"Latency: {latency}s")
 
-            self.audio_stream = sd.InputStream(
-                samplerate=self.porcupine.sample_rate,
-                device=self.device,
-                channels=1,
-                dtype=np.int16,
-                blocksize=self.porcupine.frame_length,
-                callback=self._audio_callback,
-                latency=latency,
-            )
+            self.blocksize = self.porcupine.frame_length
+            if adaptive_latency:
+                self.controller = AdaptiveLatencyController(
+                    self._restart,
+                    sample_rate=self.porcupine.sample_rate,
+                    latency=latency,
+                    blocksize=self.blocksize,
+                    device_key=f"wake:{self.device}",
+                    block_multiple=self.porcupine.frame_length,
+                )
+                self.latency = self.controller.latency
+                self.blocksize = self.controller.blocksize
+            self._open_stream()
 
         except Exception as e:
             raise RuntimeError(f"Failed to initialize wake word detector: {str(e)}")
 
-    def _get_device_id(
-        self, device: Optional[Union[int, str, Dict[str, Any]]] = None
-    ) -> int:
-        """Get the device ID for the audio input device."""
-        try:
-            if device is None:
-                # Try to find a working input device
-                devices = sd.query_devices()
-                for i, dev in enumerate(devices):
-                    if dev["max_input_channels"] > 0:
-                        print(f"Selected input device {i}: {dev['name']}")
-                        return i
-                raise RuntimeError("No working input device found")
-            elif isinstance(device, (int, str)):
-                return sd.query_devices(device).get("index", 0)
-            elif isinstance(device, dict):
-                return device.get("index", 0)
-            else:
-                raise ValueError(f"Invalid device specification: {device}")
-        except Exception as e:
-            print(f"Error selecting audio device: {e}")
-            print("Available devices:")
-            print(sd.query_devices())
-            raise
+    def _create_porcupine(
+        self,
+        keywords: List[str],
+        sensitivities: List[float],
+        keyword_paths: Optional[List[str]] = None,
+    ) -> pvporcupine.Porcupine:
+        """Create a Porcupine handle for the given keywords."""
+        if keyword_paths is not None:
+            return pvporcupine.create(
+                access_key=self.access_key,
+                keyword_paths=keyword_paths,
+                sensitivities=sensitivities,
+            )
+        return pvporcupine.create(
+            access_key=self.access_key, keywords=keywords, sensitivities=sensitivities
+        )
+
+    def reconfigure(
+        self,
+        keywords: List[str],
+        sensitivities: Optional[List[float]] = None,
+        keyword_paths: Optional[List[str]] = None,
+    ) -> "Future[None]":
+        """
+        Switch to new keywords and sensitivities while audio keeps flowing.
+
+        The new Porcupine handle is created on a background thread, which
+        takes a while, and swapped in between two frames. Until then the old
+        keywords stay active, so detection never pauses.
+
+        Args:
+            keywords (List[str]): Keywords to detect from now on
+            sensitivities (List[float], optional): Detection sensitivity for each keyword (0-1)
+            keyword_paths (List[str], optional): Keyword model files, one per keyword
+
+        Returns:
+            Future: Resolves once the new keywords are active, or holds the
+            error if the handle could not be created or the detector was
+            closed before it was ready.
+        """
+        if sensitivities is None:
+            sensitivities = [0.5] * len(keywords)
+        future: "Future[None]" = Future()
+
+        def swap() -> None:
+            try:
+                porcupine = self._create_porcupine(keywords, sensitivities, keyword_paths)
+                process = frame_processor(porcupine)
+                with self._porcupine_lock:
+                    closed = self._closed
+                    if not closed:
+                        old = self.porcupine
+                        self.porcupine = porcupine
+                        self._process = process
+                        self.keywords = keywords
+                        self.sensitivities = sensitivities
+                if closed:
+                    porcupine.delete()
+                    raise RuntimeError("the detector was closed")
+                old.delete()
+                print(f"Wake word detector now listening for: {', '.join(keywords)}")
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(
+                    RuntimeError(f"Failed to reconfigure wake word detector: {str(e)}")
+                )
+
+        threading.Thread(target=swap, daemon=True).start()
+        return future
+
+    def _open_stream(self) -> None:
+        """Create the dedicated input stream with the current latency and blocksize."""
+        self.audio_stream = sd.InputStream(
+            samplerate=self.porcupine.sample_rate,
+            device=self.device,
+            channels=1,
+            dtype=np.int16,
+            blocksize=self.blocksize,
+            callback=self._audio_callback,
+            latency=self.latency,
+        )
+
+    def _restart(self, latency: float, blocksize: int) -> None:
+        """Reopen the input stream with settings chosen by the latency controller."""
+        with self._stream_lock:
+            self.latency = latency
+            self.blocksize = blocksize
+            self.audio_stream.stop()
+            self.audio_stream.close()
+            self._open_stream()
+            if self._running:
+                self.audio_stream.start()
 
     def _audio_callback(self, indata, frames, time, status):
         """Handle audio input data."""
+        started = time_lib.perf_counter()
+
+        if not self._check_status(status):
+            pcm = indata.reshape(-1)
+            frame_length = self.porcupine.frame_length
+            for offset in range(0, frames, frame_length):
+                if self.threaded:
+                    self._enqueue_frame(pcm[offset : offset + frame_length])
+                else:
+                    self._process_frame(pcm[offset : offset + frame_length])
+
+        if self.controller is not None:
+            self.controller.record(status, time_lib.perf_counter() - started)
+
+    def _enqueue_frame(self, pcm: np.ndarray) -> None:
+        """Copy a frame into the preallocated buffer for the worker thread."""
+        # One slot stays reserved for the frame the worker is processing.
+        if self._frame_queue.qsize() >= self.queue_frames - 1:
+            self.dropped_frames += 1
+            return
+        slot = self._frames_queued % self.queue_frames
+        self._frames[slot] = pcm
+        self._frame_times[slot] = time_lib.monotonic()
+        self._frames_queued += 1
+        self._frame_queue.put(slot)
+
+    def _run_worker(self) -> None:
+        """Run Porcupine on frames queued by the audio callback."""
+        while True:
+            slot = self._frame_queue.get()
+            if slot is None:
+                break
+            self._process_frame(self._frames[slot], float(self._frame_times[slot]))
+
+    def _check_status(self, status) -> bool:
+        """Report stream errors; returns True if the block should be dropped."""
         current_time = time_lib.time()
 
         if status:
@@ -102,40 +346,176 @@ class WakeWordDetector:
                     print(
                         "\nToo many input overflows. Try increasing latency or using a different audio device."
                     )
-                    return
+                    return True
             print(f"Audio callback status: {status}")
+            return True
+        return False
+
+    def _process_frame(self, pcm: np.ndarray, captured: Optional[float] = None) -> None:
+        """Run Porcupine on one frame, unless the energy gate skips it."""
+        if self.gate is None:
+            self._detect(pcm, captured)
             return
+        for frame in self.gate.process(pcm):
+            self._detect(frame, captured)
 
+    def _detect(self, pcm: np.ndarray, captured: Optional[float]) -> None:
+        """Run Porcupine on one frame and fire the callback on a detection."""
         try:
-            pcm = indata.flatten().astype(np.int16)
-            keyword_index = self.porcupine.process(pcm)
+            with self._porcupine_lock:
+                keyword_index = self._process(pcm)
+                if keyword_index >= 0:
+                    detected_keyword = self.keywords[keyword_index]
 
             if keyword_index >= 0:
-                detected_keyword = self.keywords[keyword_index]
-                self.callback(detected_keyword)
+                if self.reader is not None:
+                    self.last_detection_position = self.reader.cursor
+                if self._executor is not None:
+                    self._executor.submit(self._dispatch, detected_keyword, captured)
+                else:
+                    self.callback(detected_keyword)
         except Exception as e:
             print(f"Error processing audio data: {e}")
 
+    def _dispatch(self, keyword: str, captured: Optional[float]) -> None:
+        """Call the user callback from the executor and record the latency."""
+        self.detections += 1
+        if captured is not None:
+            self.detection_latencies.append(time_lib.monotonic() - captured)
+        try:
+            self.callback(keyword)
+        except Exception as e:
+            print(f"Error in wake word callback: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Detector statistics.
+
+        Returns:
+            dict: Frames skipped by the energy gate, and in threaded mode the
+            detections, dropped frames and the mean and maximum latency in
+            seconds from capturing the frame that completed a keyword to
+            calling `callback`, over the last 100 detections. On the bus, the
+            capture time comes from `AudioBus.capture_time`; sources that run
+            faster than real time have none and add no latency. On the bus,
+            also the frames read and the CPU seconds spent processing them.
+        """
+        latencies = list(self.detection_latencies)
+        return {
+            "frames": self.gate.frames if self.gate else 0,
+            "skipped_frames": self.gate.skipped_frames if self.gate else 0,
+            "dropped_frames": self.dropped_frames,
+            "detections": self.detections,
+            "frames_read": self.frames_read,
+            "cpu_seconds": self.cpu_seconds,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency": max(latencies, default=0.0),
+        }
+
+    def _read_bus(self, reader: AudioBusReader) -> None:
+        """Feed frames from the shared audio bus to Porcupine."""
+        frame_length = self.porcupine.frame_length
+        while not reader.closed:
+            pcm = reader.read(frame_length, timeout=0.5)
+            if pcm is None:
+                if reader.closed or self.audio_bus.closed:
+                    break
+                continue
+            started = time_lib.thread_time()
+            self._process_frame(pcm, self.audio_bus.capture_time(reader.cursor))
+            self.cpu_seconds += time_lib.thread_time() - started
+            self.frames_read += 1
+
     def start(self):
         """Start listening for wake words."""
-        self.audio_stream.start()
+        if self.threaded:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="wake-word-callback"
+            )
+            if self.audio_bus is None:
+                self._worker_thread = threading.Thread(
+                    target=self._run_worker, daemon=True
+                )
+                self._worker_thread.start()
+
+        if self.audio_bus is None:
+            with self._stream_lock:
+                self._running = True
+                self.audio_stream.start()
+            if self.controller is not None:
+                self.controller.start()
+            return
+
+        self.reader = self.audio_bus.reader()
+        self.reader_thread = threading.Thread(
+            target=self._read_bus, args=(self.reader,), daemon=True
+        )
+        self.reader_thread.start()
+        if self.owns_bus:
+            self.audio_bus.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a finite audio source has been fully processed.
+
+        Returns:
+            bool: True once all audio has been processed, False on timeout.
+        """
+        if self.reader_thread is None:
+            return True
+        self.reader_thread.join(timeout)
+        return not self.reader_thread.is_alive()
 
     def stop(self):
         """Stop listening for wake words."""
+        if self.controller is not None:
+            self.controller.stop()
         try:
             if hasattr(self, "audio_stream"):
-                self.audio_stream.stop()
+                with self._stream_lock:
+                    self._running = False
+                    self.audio_stream.stop()
         except Exception as e:
             print(f"Error stopping audio stream: {e}")
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        if self.owns_bus:
+            self.audio_bus.stop()
+        if self.reader_thread is not None:
+            self.reader_thread.join()
+            self.reader_thread = None
+        if self._worker_thread is not None:
+            self._frame_queue.put(None)
+            self._worker_thread.join()
+            self._worker_thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
     def __enter__(self):
         self.start()
         return self
 
+    def close(self):
+        """Close the dedicated input stream and free Porcupine; the detector cannot be restarted."""
+        if hasattr(self, "audio_stream"):
+            with self._stream_lock:
+                try:
+                    self.audio_stream.close()
+                except Exception as e:
+                    print(f"Error closing audio stream: {e}")
+                del self.audio_stream
+        if self.owns_bus:
+            self.audio_bus.close()
+        with self._porcupine_lock:
+            if not self._closed and hasattr(self, "porcupine"):
+                self.porcupine.delete()
+            self._closed = True
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
-        if hasattr(self, "porcupine"):
-            self.porcupine.delete()
+        self.close()
 
     @staticmethod
     def list_keywords():
@@ -145,13 +525,4 @@ class WakeWordDetector:
     @staticmethod
     def list_audio_devices():
         """List all available audio input devices with detailed information."""
-        devices = sd.query_devices()
-        input_devices = []
-        print("\nAvailable Audio Input Devices:")
-        for i, dev in enumerate(devices):
-            if dev["max_input_channels"] > 0:
-                print(f"\nDevice {i}: {dev['name']}")
-                print(f"  Channels: {dev['max_input_channels']}")
-                print(f"  Sample rates: {dev['default_samplerate']}")
-                input_devices.append(i)
-        return input_devices
+        return device_registry.print_input_devices()